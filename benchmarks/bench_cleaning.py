@@ -0,0 +1,90 @@
+# cleaning_pipeline against the notebook's cleaning cells run on the whole frame in memory, on a
+# synthetic dirty extract, then the pipeline's peak memory as the row count grows.
+# Run from the repository root:  python -m benchmarks.bench_cleaning --rows 20000 --sizes 250000 1000000
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import cleaning_pipeline
+from benchmarks.synthetic import synthetic_raw
+from cleaning_pipeline import COERCE_COLS, GENDER_MAP, MEAN_FILL_COLS, OUTLIER_COLS, TEXT_NUMERIC_COLS
+
+
+def notebook_reference(raw_path: str, output_path: str):
+    # main.ipynb cells 3-24 on the whole file (assignments instead of inplace fillna)
+    df = pd.read_csv(raw_path, dtype={col: str for col in TEXT_NUMERIC_COLS})
+    for col in COERCE_COLS:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    for col in MEAN_FILL_COLS:
+        df[col] = df[col].fillna(df[col].mean())
+    df['education'] = df['education'].fillna(df['education'].astype('category').mode()[0])
+    df['monthly_salary'] = df.groupby('employment_type')['monthly_salary'].transform(
+        lambda x: x.fillna(x.median()))
+    df['bank_balance'] = df.groupby(pd.cut(df['monthly_salary'], bins=5), observed=False)['bank_balance'].transform(
+        lambda x: x.fillna(x.median()))
+    df['emergency_fund'] = df.groupby('family_size')['emergency_fund'].transform(
+        lambda x: x.fillna(x.median()))
+    df = df.drop_duplicates()
+
+    df['gender'] = df['gender'].str.strip().str.upper().map(GENDER_MAP)
+    for col in OUTLIER_COLS:
+        q1, q3 = df[col].quantile(0.25), df[col].quantile(0.75)
+        iqr = q3 - q1
+        df[col] = np.where(df[col] > q3 + 1.5 * iqr, q3 + 1.5 * iqr, df[col])
+        df[col] = np.where(df[col] < q1 - 1.5 * iqr, q1 - 1.5 * iqr, df[col])
+    df['credit_score'] = df['credit_score'].clip(lower=300, upper=850)
+    df = df.drop_duplicates()
+    df.to_csv(output_path, index=False)
+
+
+def check_equivalence(rows: int, tmp: str):
+    # Small chunks, spill blocks and dedupe buckets so every out-of-core path is exercised
+    raw_path, reference_path = os.path.join(tmp, "raw.csv"), os.path.join(tmp, "reference.csv")
+    synthetic_raw(rows, seed=3).to_csv(raw_path, index=False)
+    notebook_reference(raw_path, reference_path)
+    output_path = os.path.join(tmp, "pipeline.csv")
+    report = cleaning_pipeline.run(raw_path, output_path, chunksize=max(rows // 7, 1), workers=2,
+                                   bucket_rows=max(rows // 5, 1))
+    assert cleaning_pipeline.check(output_path, reference_path)
+    assert report["rows_out"] < report["rows_in"]
+    assert not [name for name in os.listdir(tmp) if "spill" in name], "spill directory left behind"
+    print(f"{report['rows_in']:,} rows in, {report['rows_out']:,} rows out, same as the notebook cells")
+
+
+def peak_memory(rows: int, tmp: str):
+    # Largest resident set of the pipeline's processes (driver or worker), in a fresh interpreter
+    raw_path = os.path.join(tmp, f"raw-{rows}.csv")
+    synthetic_raw(rows, seed=4).to_csv(raw_path, index=False)
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "cleaning_pipeline.py", "--input", raw_path,
+                    "--output", os.path.join(tmp, "out.csv")], check=True, stdout=subprocess.DEVNULL)
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    print(f"{rows:>10,} rows ({os.path.getsize(raw_path) / 2**20:6.0f} MiB raw) | {elapsed:6.1f} s | "
+          f"peak RSS so far {peak_mb:6.0f} MiB")
+    os.remove(raw_path)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20_000, help="rows for the equivalence check")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[250_000, 1_000_000],
+                        help="row counts for the memory runs, ascending")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        check_equivalence(args.rows, tmp)
+    for rows in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            peak_memory(rows, tmp)
+
+
+if __name__ == "__main__":
+    main()
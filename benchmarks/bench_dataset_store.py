@@ -0,0 +1,66 @@
+# Cold load time and peak RSS: CSV parsing vs the memory-mapped Arrow store.
+# Run from the repository root after `python dataset_store.py`:
+#   python -m benchmarks.bench_dataset_store
+import argparse
+import json
+import subprocess
+import sys
+
+from dataset_store import DATASETS, is_fresh
+
+# Runs in a fresh interpreter so each measurement is a cold, single-page-like load
+# RssAnon is the private memory a page process pays for; mapped Arrow pages are shared file cache
+PROBE = """
+import json, sys, time
+import pandas as pd
+import pyarrow
+from dataset_store import DATASETS, load_dataset
+
+def rss_kib(field):
+    return [int(l.split()[1]) for l in open("/proc/self/status") if l.startswith(field + ":")][0]
+
+name, method, columns = sys.argv[1], sys.argv[2], json.loads(sys.argv[3])
+base = rss_kib("RssAnon")
+t = time.perf_counter()
+if method == "csv":
+    df = pd.read_csv(DATASETS[name], low_memory=False)
+    if columns:
+        df = df[[c for c in columns if c in df.columns]]
+else:
+    df = load_dataset(name, columns=columns)
+seconds = time.perf_counter() - t
+print(json.dumps({"seconds": seconds, "rss_mib": (rss_kib("RssAnon") - base) / 1024,
+                  "shape": list(df.shape)}))
+"""
+
+# A typical page request: the EDA charts only need these columns
+EDA_SUBSET = ["emi_scenario", "emi_eligibility", "monthly_salary", "credit_score", "dti", "gender"]
+
+
+def run(name: str, method: str, columns=None):
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE, name, method, json.dumps(columns)],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("names", nargs="*")
+    args = parser.parse_args()
+
+    for name in args.names or DATASETS:
+        if not is_fresh(name):
+            print(f"{name}: no up-to-date Arrow file, run `python dataset_store.py {name}` first")
+            continue
+        cases = [("csv", None), ("arrow", None), ("csv", EDA_SUBSET), ("arrow", EDA_SUBSET)]
+        for method, columns in cases:
+            result = run(name, method, columns)
+            label = "all columns" if columns is None else f"{len(columns)} columns"
+            print(f"{name:8s} {method:6s} {label:12s} {result['seconds'] * 1000:8.1f} ms  "
+                  f"+{result['rss_mib']:7.1f} MiB private RSS  shape={tuple(result['shape'])}")
+
+
+if __name__ == "__main__":
+    main()
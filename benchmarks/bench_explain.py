@@ -0,0 +1,70 @@
+# Latency budget for TreeSHAP explanations: single applicants (p50/p99, next to score_one)
+# and batches (rows/s). Checks additivity first: contributions must sum to the raw margin.
+# Run from the repository root:  python -m benchmarks.bench_explain --budget-ms 50
+import argparse
+import time
+
+import numpy as np
+
+import explain
+from benchmarks.synthetic import synthetic_applicants
+from model_registry import get_artifacts
+from scoring import prepare_batch, score_batch, score_one
+
+
+def check_additivity(X, tolerance: float = 1e-5):
+    # Relative to the margin's size: the regressor's margin is in rupees and float32 sums drift
+    import xgboost as xgb
+
+    for kind in explain.BOOSTERS:
+        booster = explain.get_booster(kind)
+        contribs = explain.contributions(booster, X)
+        margin = booster.predict(xgb.DMatrix(X.astype(np.float32)), output_margin=True)
+        error = (np.abs(contribs.sum(axis=-1) - margin) / np.maximum(np.abs(margin), 1)).max()
+        assert error < tolerance, f"{kind}: contributions off the margin by {error:g} (relative)"
+        print(f"Additivity ({kind}): max relative |sum(contributions) - margin| = {error:.2e}")
+
+
+def latencies_ms(fn, records):
+    times = []
+    for row in records:
+        start = time.perf_counter()
+        fn(row)
+        times.append((time.perf_counter() - start) * 1000)
+    return np.percentile(times, 50), np.percentile(times, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--single-rows", type=int, default=300)
+    parser.add_argument("--batch-size", type=int, default=explain.DEFAULT_BATCH_SIZE)
+    parser.add_argument("--budget-ms", type=float, default=50.0, help="p99 budget for one explanation")
+    args = parser.parse_args()
+
+    artifacts = get_artifacts()
+    df = synthetic_applicants(args.rows)
+    check_additivity(prepare_batch(df.head(2_000), artifacts))
+
+    records = df.head(args.single_rows).to_dict(orient="records")
+    explain.explain_one(records[0], artifacts)  # warm up the booster cache
+    score_p50, score_p99 = latencies_ms(lambda row: score_one(row, artifacts), records)
+    p50, p99 = latencies_ms(lambda row: explain.explain_one(row, artifacts), records)
+
+    start = time.perf_counter()
+    score_batch(df, artifacts)
+    score_elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    explain.explain_batch(df, artifacts, batch_size=args.batch_size)
+    explain_elapsed = time.perf_counter() - start
+
+    print(f"score_one:     p50 {score_p50:6.2f} ms  p99 {score_p99:6.2f} ms")
+    print(f"explain_one:   p50 {p50:6.2f} ms  p99 {p99:6.2f} ms  "
+          f"(budget {args.budget_ms:g} ms: {'ok' if p99 <= args.budget_ms else 'OVER'})")
+    print(f"score_batch:   {len(df) / score_elapsed:,.0f} rows/s")
+    print(f"explain_batch: {len(df) / explain_elapsed:,.0f} rows/s "
+          f"({len(df):,} rows, batch_size={args.batch_size:,})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# Feature engineering parity: the fused serving transform against the training encode
+# (engineer_features, get_dummies, scaler) on the same applicants, the single-row fast path
+# against the batch path, and timings against the old dict -> DataFrame -> reindex -> scaler path.
+# Run from the repository root:  python -m benchmarks.bench_features --rows 5000
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import synthetic_applicants
+from features import CAT_COLS, CATEGORICAL_MAP, NUMERIC_COLS, engineer_features, transform_for
+from model_registry import get_artifacts
+from scoring import prepare_batch, prepare_single
+
+# Serving's own copy before features.py (rent in total_expenses, emi_gap = -current_emi)
+LEGACY_EXPENSE_COLS = [
+    "school_fees", "college_fees", "travel_expenses",
+    "groceries_utilities", "other_monthly_expenses", "monthly_rent"
+]
+
+
+def legacy_prepare_single(user_input: dict, artifacts):
+    features = user_input.copy()
+    total_expenses = sum(features.get(col, 0) for col in LEGACY_EXPENSE_COLS)
+    features["total_expenses"] = total_expenses
+    features["savings_potential"] = features.get("monthly_salary", 0) - total_expenses
+    features["dti"] = features.get("current_emi_amount", 0) / max(features.get("monthly_salary", 1), 1)
+    features["expense_ratio"] = total_expenses / max(features.get("monthly_salary", 1), 1)
+    features["affordability_ratio"] = (
+        (features.get("bank_balance", 0) + features.get("emergency_fund", 0)) /
+        max(features.get("requested_amount", 1), 1)
+    )
+    features["salary_credit_interaction"] = features.get("monthly_salary", 0) * features.get("credit_score", 0)
+    features["emi_gap"] = 0 - features.get("current_emi_amount", 0)
+    features["balance_emi_gap"] = features.get("bank_balance", 0) - features.get("current_emi_amount", 0)
+    features["salary_missing"] = int(features.get("monthly_salary", 0) == 0)
+    features["balance_missing"] = int(features.get("bank_balance", 0) == 0)
+    features["fund_missing"] = int(features.get("emergency_fund", 0) == 0)
+    for cat_col, cat_values in CATEGORICAL_MAP.items():
+        for val in cat_values:
+            features[f"{cat_col}_{val}"] = int(features.get(cat_col, "") == val)
+
+    features_df = pd.DataFrame([features]).reindex(columns=artifacts.trained_features, fill_value=0)
+    features_df[NUMERIC_COLS] = artifacts.scaler.transform(features_df[NUMERIC_COLS])
+    return features_df
+
+
+def training_encode(df: pd.DataFrame, artifacts):
+    # train_runner.encode's steps, with the fitted scaler instead of a new fit
+    encoded = pd.get_dummies(engineer_features(df), columns=CAT_COLS, drop_first=True)
+    encoded[NUMERIC_COLS] = artifacts.scaler.transform(encoded[NUMERIC_COLS])
+    return encoded[artifacts.trained_features]
+
+
+def per_row_us(fn, records):
+    fn(records[0])
+    start = time.perf_counter()
+    for row in records:
+        fn(row)
+    return (time.perf_counter() - start) / len(records) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5_000)
+    parser.add_argument("--single-rows", type=int, default=500)
+    args = parser.parse_args()
+
+    artifacts = get_artifacts()
+    transform = transform_for(artifacts)
+    df = synthetic_applicants(args.rows, seed=5)
+
+    # The float32 matrix holds exactly the training frame's values cast to float32, so the
+    # models (which cast to float32 themselves) predict the same
+    served = prepare_batch(df, artifacts)
+    reference = training_encode(df, artifacts)
+    assert np.array_equal(served.to_numpy(), reference.to_numpy(dtype=np.float64).astype(np.float32))
+    for model in (artifacts.classification_model, artifacts.regression_model):
+        assert np.array_equal(np.asarray(model.predict(served)), np.asarray(model.predict(reference)))
+    print(f"Training parity: {args.rows:,} rows, features and predictions identical to "
+          f"engineer_features + get_dummies + scaler")
+
+    records = df.head(args.single_rows).to_dict(orient="records")
+    for i, row in enumerate(records):
+        assert np.array_equal(prepare_single(row, artifacts).to_numpy(), served.to_numpy()[[i]]), i
+    print(f"Single row: {len(records)} rows identical to the batch path")
+
+    legacy = pd.concat([legacy_prepare_single(row, artifacts) for row in records], ignore_index=True)
+    current = served.head(len(records)).reset_index(drop=True)
+    changed = (artifacts.classification_model.predict(legacy) != artifacts.classification_model.predict(current))
+    drift = np.abs(np.asarray(artifacts.regression_model.predict(legacy), dtype=float) -
+                   np.asarray(artifacts.regression_model.predict(current), dtype=float))
+    print(f"Old serving features: {int(np.sum(changed))}/{len(records)} eligibility labels differ, "
+          f"max_monthly_emi differs by {np.median(drift):,.1f} (median), {drift.max():,.1f} (max)")
+
+    print("Single row:")
+    for name, fn in [("legacy dict + reindex", lambda row: legacy_prepare_single(row, artifacts)),
+                     ("prepare_single", lambda row: prepare_single(row, artifacts)),
+                     ("matrix_one", transform.matrix_one)]:
+        print(f"  {name:22s} {per_row_us(fn, records):9.1f} us/row")
+
+    out = np.empty((len(df), len(transform.trained_features)), dtype=np.float32)
+    print(f"Batch ({len(df):,} rows):")
+    for name, fn in [("training encode", lambda: training_encode(df, artifacts)),
+                     ("prepare_batch", lambda: prepare_batch(df, artifacts)),
+                     ("matrix, reused out", lambda: transform.matrix(df, out=out))]:
+        fn()
+        seconds = []
+        for _ in range(3):
+            start = time.perf_counter()
+            fn()
+            seconds.append(time.perf_counter() - start)
+        print(f"  {name:22s} {len(df) / min(seconds):12,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# Figure cache: the EDA page's charts (from synthetic aggregates) drawn the old way on every view
+# (pyplot figure, st.pyplot's PNG at 200 dpi, downscaled and re-encoded to 1460 px for st.image,
+# figure left open) against figure_cache: a cold render, serial and in the worker pool, and a
+# repeat view served from the cache.
+# Run from the repository root:  python -m benchmarks.bench_figure_cache --rows 100000 --views 5
+import argparse
+import io
+import time
+from concurrent.futures import as_completed
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import seaborn as sns
+from PIL import Image
+
+import figure_cache
+from benchmarks.synthetic import synthetic_dataset
+from eda_aggregates import TARGET, compute_aggregates
+from figure_cache import Chart, FigureCache
+
+
+def eda_charts(agg: dict, version: str):
+    def counts(col):
+        def draw(ax):
+            data = agg["counts"][col].reset_index().melt(id_vars=col, var_name=TARGET, value_name="count")
+            sns.barplot(x=col, y="count", hue=TARGET, data=data, ax=ax)
+            ax.set_title(f"{col} vs EMI Eligibility")
+        return Chart(("bench.counts", col, version), draw, figsize=(10, 5))
+
+    def box(col, stats):
+        def draw(ax):
+            ax.bxp(stats, showfliers=False, showmeans=False, patch_artist=True)
+            ax.set_title(f"{col} vs EMI Eligibility")
+        return Chart(("bench.box", col, version), draw, figsize=(10, 5))
+
+    return [counts(col) for col in agg["counts"]] + [box(col, stats) for col, stats in agg["box_stats"].items()]
+
+
+def legacy_view(charts):
+    # What a rerun cost before: a new pyplot figure per chart, never closed
+    for chart in charts:
+        fig, ax = plt.subplots(figsize=chart.figsize)
+        chart.draw(ax)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", dpi=200, bbox_inches="tight")
+        image = Image.open(io.BytesIO(buffer.getvalue()))
+        if image.width > figure_cache.MAX_WIDTH:
+            image = image.resize((figure_cache.MAX_WIDTH, int(image.height * figure_cache.MAX_WIDTH / image.width)),
+                                 resample=Image.BILINEAR)
+            image.save(io.BytesIO(), format="PNG")
+
+
+def cached_view(charts, cache: FigureCache):
+    # Seconds to the first chart and to the last one
+    start = time.perf_counter()
+    futures = [cache.submit(chart) for chart in charts]
+    first = None
+    for future in as_completed(futures):
+        future.result()
+        first = first or time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--views", type=int, default=5)
+    args = parser.parse_args()
+
+    sns.set(style="whitegrid")
+    charts = eda_charts(compute_aggregates(synthetic_dataset(args.rows)), "synthetic")
+    print(f"{len(charts)} EDA charts")
+
+    for chart in charts:
+        width = Image.open(io.BytesIO(figure_cache.render(chart))).width
+        assert width <= figure_cache.MAX_WIDTH, (chart.key, width)
+    print(f"Rendered widths within {figure_cache.MAX_WIDTH} px (served by st.image without re-encoding)")
+
+    start = time.perf_counter()
+    for _ in range(args.views):
+        legacy_view(charts)
+    legacy = (time.perf_counter() - start) / args.views
+    print(f"Per view, pyplot each rerun: {legacy * 1000:9.1f} ms, {len(plt.get_fignums())} pyplot figures "
+          f"left open after {args.views} views")
+    plt.close("all")
+
+    for workers in sorted({1, figure_cache.WORKERS}):
+        first, total = cached_view(charts, FigureCache(workers=workers))
+        print(f"Cold, {workers} render thread(s):   {total * 1000:9.1f} ms (first chart after {first * 1000:.1f} ms)")
+
+    cache = FigureCache()
+    cached_view(charts, cache)
+    start = time.perf_counter()
+    for _ in range(args.views):
+        cached_view(charts, cache)
+    hit = (time.perf_counter() - start) / args.views
+    stats = cache.stats()
+    print(f"Per view, cached:             {hit * 1000:9.3f} ms ({stats['entries']} charts, "
+          f"{stats['bytes'] / 1024:,.0f} KiB, {stats['hits']} hits)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# Overhead of the instrumentation layer: a bare stage() call disabled and enabled, and
+# score_one with instrumentation off vs on, then the stage breakdown it recorded.
+# Run from the repository root:  python -m benchmarks.bench_instrumentation
+import argparse
+import time
+
+import numpy as np
+
+import instrumentation
+from benchmarks.synthetic import synthetic_applicants
+from model_registry import get_artifacts
+from scoring import score_one
+
+
+def stage_ns(n: int):
+    start = time.perf_counter()
+    for _ in range(n):
+        with instrumentation.stage("bench"):
+            pass
+    return (time.perf_counter() - start) / n * 1e9
+
+
+def score_ms(records, artifacts, repeats: int):
+    # Median over repeats of the mean per-row latency
+    runs = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for row in records:
+            score_one(row, artifacts)
+        runs.append((time.perf_counter() - start) / len(records) * 1000)
+    return float(np.median(runs))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--calls", type=int, default=1_000_000)
+    parser.add_argument("--prometheus", action="store_true", help="print the Prometheus export at the end")
+    args = parser.parse_args()
+
+    artifacts = get_artifacts()
+    records = synthetic_applicants(args.rows).to_dict(orient="records")
+    score_one(records[0], artifacts)
+
+    instrumentation.disable()
+    off_ns, off_ms = stage_ns(args.calls), score_ms(records, artifacts, args.repeats)
+    instrumentation.enable()
+    on_ns = stage_ns(args.calls)
+    instrumentation.reset()
+    on_ms = score_ms(records, artifacts, args.repeats)
+
+    print(f"stage() disabled: {off_ns:7.0f} ns/call   enabled: {on_ns:7.0f} ns/call")
+    print(f"score_one disabled: {off_ms:.3f} ms   enabled: {on_ms:.3f} ms "
+          f"({(on_ms / off_ms - 1) * 100:+.1f}%)")
+    print()
+    print(instrumentation.stage_table().drop(columns=["max_ms"]).to_string(index=False))
+    if args.prometheus:
+        print(instrumentation.prometheus_text())
+
+
+if __name__ == "__main__":
+    main()
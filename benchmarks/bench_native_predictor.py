@@ -0,0 +1,97 @@
+# Compares the compiled NumPy predictor with the MLflow pyfunc models.
+# Run from the repository root after `python native_predictor.py`:
+#   python -m benchmarks.bench_native_predictor
+import argparse
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import synthetic_applicants
+from model_registry import CLASSIFIER_URI, REGRESSOR_URI, get_artifacts
+from native_predictor import COMPILED_CLASSIFIER_PATH, COMPILED_REGRESSOR_PATH, NativePredictor
+from scoring import prepare_batch
+
+# Each snippet runs in a fresh interpreter: prints import seconds, then peak RSS in KiB after loading.
+# VmHWM is read from /proc because ru_maxrss carries the parent's peak across fork/exec.
+PEAK_RSS = "print([int(l.split()[1]) for l in open('/proc/self/status') if l.startswith('VmHWM:')][0])"
+
+PYFUNC_PROBE = f"""
+import time
+t = time.perf_counter()
+import mlflow.pyfunc
+print(time.perf_counter() - t)
+mlflow.pyfunc.load_model({CLASSIFIER_URI!r}); mlflow.pyfunc.load_model({REGRESSOR_URI!r})
+{PEAK_RSS}
+"""
+
+NATIVE_PROBE = f"""
+import time
+t = time.perf_counter()
+from native_predictor import NativePredictor
+print(time.perf_counter() - t)
+NativePredictor.load({COMPILED_CLASSIFIER_PATH!r}); NativePredictor.load({COMPILED_REGRESSOR_PATH!r})
+{PEAK_RSS}
+"""
+
+
+def probe(code: str):
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    import_seconds, rss_kib = out.stdout.split()[-2:]
+    return float(import_seconds), int(rss_kib) / 1024
+
+
+def single_row_ms(model, X, repeats: int):
+    timings = []
+    for i in range(repeats):
+        row = X.iloc[[i % len(X)]]
+        start = time.perf_counter()
+        model.predict(row)
+        timings.append((time.perf_counter() - start) * 1000)
+    return np.percentile(timings, [50, 99])
+
+
+def rows_per_second(model, X):
+    start = time.perf_counter()
+    model.predict(X)
+    return len(X) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeats", type=int, default=500)
+    args = parser.parse_args()
+
+    artifacts = get_artifacts()
+    X = prepare_batch(synthetic_applicants(args.rows), artifacts)
+
+    pairs = [
+        ("classifier", artifacts.classification_model, NativePredictor.load(COMPILED_CLASSIFIER_PATH)),
+        ("regressor", artifacts.regression_model, NativePredictor.load(COMPILED_REGRESSOR_PATH)),
+    ]
+
+    for name, pyfunc_model, native_model in pairs:
+        expected = np.asarray(pyfunc_model.predict(X))
+        actual = native_model.predict(X)
+        if name == "classifier":
+            assert np.array_equal(expected, actual), "class predictions differ"
+            print(f"{name}: identical labels on {len(X):,} rows")
+        else:
+            diff = np.abs(expected - actual).max()
+            assert np.allclose(expected, actual, rtol=1e-5, atol=1e-3), f"max abs diff {diff}"
+            print(f"{name}: max abs diff {diff:.2e} on {len(X):,} rows")
+
+        for label, model in [("pyfunc", pyfunc_model), ("native", native_model)]:
+            p50, p99 = single_row_ms(model, X, args.repeats)
+            print(f"  {label:7s} single row p50 {p50:.3f} ms, p99 {p99:.3f} ms | "
+                  f"batch {rows_per_second(model, X):,.0f} rows/s")
+
+    for label, code in [("pyfunc", PYFUNC_PROBE), ("native", NATIVE_PROBE)]:
+        import_seconds, rss_mib = probe(code)
+        print(f"{label:7s} import {import_seconds * 1000:.0f} ms, peak RSS with both models {rss_mib:.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
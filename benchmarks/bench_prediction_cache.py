@@ -0,0 +1,110 @@
+# Prediction cache: equivalence with the uncached paths, hit vs miss latency, a resubmission-heavy
+# workload, and many threads sharing one cache.
+# Run from the repository root:  python -m benchmarks.bench_prediction_cache --repeat-share 0.5
+import argparse
+import threading
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import synthetic_applicants
+from model_registry import get_artifacts
+from prediction_cache import PredictionCache, score_one_cached, score_records_cached
+from scoring import score_one
+
+
+def check_equivalence(records, artifacts):
+    cache = PredictionCache()
+    batch = score_records_cached(records, artifacts, cache)
+    for i, row in enumerate(records):
+        pred_class, pred_emi = score_one(row, artifacts)
+        assert score_one_cached(row, artifacts, cache) == batch[i] == (str(pred_class), pred_emi), i
+    assert cache.stats()["hits"] == len(records)
+    print(f"Equivalence: {len(records)} rows, cached single/batch results identical to score_one")
+
+
+def check_partial_records(records, artifacts, dropped=("credit_score", "monthly_salary", "gender", "existing_loans")):
+    # Records with different missing fields in one batch: each must score as score_one scores it
+    # alone (0 or "" for what is missing), not with the NaN a shared frame would give it
+    choices = (None, *dropped)
+    partial = [{k: v for k, v in row.items() if k != choices[i % len(choices)]} for i, row in enumerate(records)]
+    batch = score_records_cached(partial, artifacts, PredictionCache())
+    for i, row in enumerate(partial):
+        pred_class, pred_emi = score_one(row, artifacts)
+        assert batch[i] == (str(pred_class), pred_emi), (i, sorted(set(records[i]) - set(row)))
+    print(f"Equivalence: {len(partial)} rows missing one of {', '.join(dropped)}, batch results identical to score_one")
+
+
+def workload(pool, requests: int, repeat_share: float, seed: int = 0):
+    # A stream of applicants where `repeat_share` of requests resubmit an earlier applicant
+    rng = np.random.default_rng(seed)
+    seen, stream, fresh = [], [], iter(pool)
+    for _ in range(requests):
+        if seen and rng.random() < repeat_share:
+            stream.append(seen[int(rng.integers(len(seen)))])
+        else:
+            seen.append(next(fresh))
+            stream.append(seen[-1])
+    return stream
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--repeat-share", type=float, default=0.5)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    artifacts = get_artifacts()
+    records = synthetic_applicants(args.requests, seed=3).to_dict(orient="records")
+    check_equivalence(records[:50], artifacts)
+    check_partial_records(records[:50], artifacts)
+
+    stream = workload(records, args.requests, args.repeat_share)
+    start = time.perf_counter()
+    for row in stream:
+        score_one(row, artifacts)
+    uncached = time.perf_counter() - start
+
+    cache = PredictionCache()
+    start = time.perf_counter()
+    for row in stream:
+        score_one_cached(row, artifacts, cache)
+    cached = time.perf_counter() - start
+
+    hit_times = []
+    for row in stream[:200]:
+        t = time.perf_counter()
+        score_one_cached(row, artifacts, cache)
+        hit_times.append((time.perf_counter() - t) * 1e6)
+
+    stats = cache.stats()
+    print(f"Workload: {args.requests} requests, {args.repeat_share:.0%} resubmissions")
+    print(f"  uncached {args.requests / uncached:8.1f} req/s   cached {args.requests / cached:8.1f} req/s "
+          f"({uncached / cached:.2f}x), hit rate {stats['hit_rate']:.1%}")
+    print(f"  hit latency p50 {np.percentile(hit_times, 50):.1f} us, "
+          f"miss latency ~{uncached / args.requests * 1000:.2f} ms")
+
+    # Shared across threads with a small bound: counters must add up and the bound must hold
+    shared = PredictionCache(max_entries=64)
+    lookups_per_thread = 300
+
+    def hammer(seed):
+        rng = np.random.default_rng(seed)
+        for i in rng.integers(0, 128, lookups_per_thread):
+            score_one_cached(records[i], artifacts, shared)
+
+    threads = [threading.Thread(target=hammer, args=(seed,)) for seed in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = shared.stats()
+    assert stats["hits"] + stats["misses"] == args.threads * lookups_per_thread
+    assert stats["entries"] <= 64
+    print(f"Threads: {args.threads} x {lookups_per_thread} lookups, {stats['hits']} hits, "
+          f"{stats['misses']} misses, {stats['evictions']} evictions, {stats['entries']} entries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# Error and speed of the KLL sketch against exact pandas quantiles for the IQR capping bounds.
+# Run from the repository root:
+#   python -m benchmarks.bench_quantiles                      # synthetic data
+#   python -m benchmarks.bench_quantiles --csv emi_prediction_dataset_enhanced.csv
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from cleaning_pipeline import OUTLIER_COLS
+from quantile_sketch import DEFAULT_K, merge_sketches, sketch_columns
+
+
+def synthetic(rows: int, seed: int = 42):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({col: rng.lognormal(9 + i % 3, 0.5 + 0.1 * i, rows) for i, col in enumerate(OUTLIER_COLS)})
+
+
+def rank_error(sorted_values, estimate: float, q: float):
+    rank = np.searchsorted(sorted_values, estimate, side="left") / len(sorted_values)
+    return abs(rank - q)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--csv", help="measure on the outlier columns of this file instead of synthetic data")
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--k", type=int, nargs="+", default=[200, DEFAULT_K, 1000])
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv, usecols=OUTLIER_COLS) if args.csv else synthetic(args.rows)
+    columns = [col for col in OUTLIER_COLS if col in df.columns]
+    print(f"{len(df):,} rows, {len(columns)} columns, chunks of {args.chunksize:,}")
+
+    start = time.perf_counter()
+    exact = {col: (df[col].quantile(0.25), df[col].quantile(0.75)) for col in columns}
+    exact_seconds = time.perf_counter() - start
+    print(f"exact  (pandas quantile per column): {exact_seconds * 1000:8.1f} ms, holds all {len(df):,} rows")
+
+    sorted_columns = {col: np.sort(df[col].dropna().to_numpy()) for col in columns}
+    for k in args.k:
+        start = time.perf_counter()
+        per_chunk = [sketch_columns(df.iloc[i:i + args.chunksize], columns, k)
+                     for i in range(0, len(df), args.chunksize)]
+        sketches = merge_sketches(per_chunk)
+        sketch_seconds = time.perf_counter() - start
+
+        worst_rank, worst_bound = 0.0, 0.0
+        for col in columns:
+            q1, q3 = sketches[col].quantiles([0.25, 0.75])
+            worst_rank = max(worst_rank, rank_error(sorted_columns[col], q1, 0.25),
+                             rank_error(sorted_columns[col], q3, 0.75))
+            exact_upper = exact[col][1] + 1.5 * (exact[col][1] - exact[col][0])
+            approx_upper = sketches[col].iqr_bounds()[1]
+            worst_bound = max(worst_bound, abs(approx_upper - exact_upper) / abs(exact_upper))
+
+        items = max(sum(len(level) for level in sketch.levels) for sketch in sketches.values())
+        print(f"sketch k={k:<5d} (one pass + merge):   {sketch_seconds * 1000:8.1f} ms, "
+              f"{items:,} items/column | max rank error {worst_rank:.4%}, "
+              f"max upper-bound error {worst_bound:.3%} | speedup {exact_seconds / sketch_seconds:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
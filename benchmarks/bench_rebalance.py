@@ -0,0 +1,101 @@
+# Compares the notebook's SMOTE step with rebalance.py on the enhanced dataset.
+# The data is encoded and split once; each method then runs in a fresh interpreter
+# so the peak memory it reports is its own:
+#   python -m benchmarks.bench_rebalance [--data emi_prediction_dataset_enhanced.csv]
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+METHODS = {
+    "smote": "imblearn SMOTE on the full training split, then a 100k sample (notebook)",
+    "partitioned": "rebalance.py, 100k balanced rows synthesized directly",
+    "partitioned-full": "rebalance.py, balanced up to the largest class like SMOTE",
+}
+
+
+def memory_kib(field: str):
+    return [int(l.split()[1]) for l in open("/proc/self/status") if l.startswith(field + ":")][0]
+
+
+def measure(method: str, split_dir: str, workers: int):
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import f1_score
+
+    from rebalance import class_targets, rebalance
+    from train_runner import SMOTE_SAMPLE_SIZE, balance
+
+    X_train, y_train = np.load(f"{split_dir}/X_train.npy"), np.load(f"{split_dir}/y_train.npy")
+
+    # Reset the peak-RSS counter so VmHWM below covers the rebalancing step only
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")
+    rss_before = memory_kib("VmRSS")
+
+    start = time.perf_counter()
+    if method == "smote":
+        _, _, X_bal, y_bal = balance(X_train, y_train, "smote")
+    elif method == "partitioned":
+        n_samples = min(SMOTE_SAMPLE_SIZE, int(class_targets(y_train)[2].sum()))
+        X_bal, y_bal = rebalance(X_train, y_train, n_samples=n_samples, workers=workers)
+    else:
+        X_bal, y_bal = rebalance(X_train, y_train, workers=workers)
+    seconds = time.perf_counter() - start
+    peak_mib = (memory_kib("VmHWM") - rss_before) / 1024
+
+    # Downstream check: the notebook's RandomForest, macro F1 on the untouched test split
+    model = RandomForestClassifier(n_estimators=50, random_state=42, n_jobs=-1).fit(X_bal, y_bal)
+    y_pred = model.predict(np.load(f"{split_dir}/X_test.npy"))
+    f1 = f1_score(np.load(f"{split_dir}/y_test.npy"), y_pred, average="macro")
+
+    classes, counts = np.unique(y_bal, return_counts=True)
+    return {
+        "seconds": seconds,
+        "peak_mib": peak_mib,
+        "rows": len(y_bal),
+        "balance": {str(c): int(n) for c, n in zip(classes, counts)},
+        "f1_macro": f1,
+    }
+
+
+def write_split(data_path: str, split_dir: str):
+    from train_runner import encode, split
+
+    X, y_class, _, _, _, _ = encode(data_path)
+    train_c, test_c, _, _ = split(X, y_class)
+    for name, array in [("X_train", X[train_c]), ("y_train", y_class[train_c]),
+                        ("X_test", X[test_c]), ("y_test", y_class[test_c])]:
+        np.save(f"{split_dir}/{name}.npy", array)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", default="emi_prediction_dataset_enhanced.csv")
+    parser.add_argument("--methods", nargs="*", default=list(METHODS), choices=list(METHODS))
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--measure", nargs=2, metavar=("METHOD", "SPLIT_DIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(*args.measure, args.workers)))
+        return
+
+    with tempfile.TemporaryDirectory() as split_dir:
+        write_split(args.data, split_dir)
+        for method in args.methods:
+            cmd = [sys.executable, "-m", "benchmarks.bench_rebalance", "--measure", method, split_dir]
+            if args.workers:
+                cmd += ["--workers", str(args.workers)]
+            out = subprocess.run(cmd, capture_output=True, text=True, check=True)
+            result = json.loads(out.stdout.strip().splitlines()[-1])
+            print(f"{method:17s} {result['seconds']:7.2f}s | peak +{result['peak_mib']:.0f} MiB | "
+                  f"{result['rows']:,} rows {result['balance']} | macro F1 {result['f1_macro']:.4f}")
+            print(f"{'':17s} {METHODS[method]}")
+
+
+if __name__ == "__main__":
+    main()
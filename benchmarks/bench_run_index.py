@@ -0,0 +1,94 @@
+# Page-load cost of the Model Training page's run listing, old directory walk vs run_index.
+# Builds a synthetic file-based mlruns tree in a temporary directory:
+#   python -m benchmarks.bench_run_index --runs 100 500 2000
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import yaml
+
+import run_index
+from benchmarks.synthetic import EXPERIMENT_ID, make_tree, write_run
+
+
+def legacy_load_mlruns(root: str, experiment_id: str):
+    # The directory walk pages/model_training.py used before run_index
+    base_path = os.path.join(root, experiment_id)
+    records = []
+    for run_id in os.listdir(base_path):
+        run_path = os.path.join(base_path, run_id)
+        metrics_dir = os.path.join(run_path, "metrics")
+        if not os.path.isdir(run_path) or not os.path.exists(metrics_dir):
+            continue
+        metrics = {}
+        for fname in os.listdir(metrics_dir):
+            with open(os.path.join(metrics_dir, fname)) as f:
+                line = f.readline().strip()
+                if line:
+                    metrics[fname] = float(line.split()[1])
+        params_dir = os.path.join(run_path, "params")
+        for fname in os.listdir(params_dir):
+            with open(os.path.join(params_dir, fname)) as f:
+                f.readline()
+        with open(os.path.join(run_path, "meta.yaml")) as f:
+            run_name = yaml.safe_load(f).get("run_name", run_id)
+        records.append({"Run ID": run_id, "Model": run_name, **metrics})
+    return records
+
+
+def check_statuses():
+    # Only unfinished runs are parsed again on every refresh: a killed run (5) is final, a
+    # scheduled one (2) can still start logging
+    with tempfile.TemporaryDirectory() as tmp:
+        root, index_path = os.path.join(tmp, "mlruns"), os.path.join(tmp, "index.sqlite")
+        experiment_dir = make_tree(root, 0, 1)
+        rng = np.random.default_rng(2)
+        statuses = {"running": 1, "scheduled": 2, "finished": 3, "failed": 4, "killed": 5}
+        runs = {name: write_run(experiment_dir, rng, 1, status) for name, status in statuses.items()}
+        assert run_index.refresh(root, index_path)["parsed"] == len(runs)
+        assert run_index.refresh(root, index_path)["parsed"] == 2
+        indexed = run_index.query("SELECT run_id, status FROM runs", index_path=index_path)
+        assert dict(zip(indexed["run_id"], indexed["status"])) == {runs[n]: str(s) for n, s in statuses.items()}
+    print("Statuses: running and scheduled runs re-parsed on refresh, finished/failed/killed runs not")
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, nargs="+", default=[100, 500, 2000])
+    parser.add_argument("--history", type=int, default=20, help="logged values per metric")
+    args = parser.parse_args()
+
+    check_statuses()
+    for n_runs in args.runs:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = os.path.join(tmp, "mlruns")
+            index_path = os.path.join(tmp, "index.sqlite")
+            experiment_dir = make_tree(root, n_runs, args.history)
+
+            legacy_ms, records = timed(legacy_load_mlruns, root, EXPERIMENT_ID)
+            cold_ms, _ = timed(run_index.refresh, root, index_path)
+            warm_refresh_ms, _ = timed(run_index.refresh, root, index_path)
+            query_ms, df = timed(run_index.latest_metrics, EXPERIMENT_ID, index_path)
+            assert len(df) == len(records) == n_runs
+
+            rng = np.random.default_rng(1)
+            for _ in range(10):
+                write_run(experiment_dir, rng, args.history)
+            incremental_ms, report = timed(run_index.refresh, root, index_path)
+            assert report["parsed"] == 10
+
+            print(f"{n_runs:5d} runs | legacy walk {legacy_ms:8.1f} ms | index cold build {cold_ms:8.1f} ms | "
+                  f"page load: refresh {warm_refresh_ms:6.1f} ms + query {query_ms:5.1f} ms | "
+                  f"+10 new runs {incremental_ms:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
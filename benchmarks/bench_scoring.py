@@ -0,0 +1,51 @@
+# Rows-per-second benchmark for the batch scoring engine.
+# Run from the repository root:  python -m benchmarks.bench_scoring --rows 200000
+import argparse
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import synthetic_applicants
+from model_registry import get_artifacts
+from scoring import score_batch, score_one
+
+
+def check_equivalence(df: pd.DataFrame, artifacts, sample: int):
+    batch = score_batch(df.head(sample), artifacts)
+    for i, row in enumerate(df.head(sample).to_dict(orient="records")):
+        pred_class, pred_emi = score_one(row, artifacts)
+        assert batch["emi_eligibility"].iloc[i] == pred_class, f"class mismatch on row {i}"
+        assert batch["max_monthly_emi"].iloc[i] == pred_emi, f"EMI mismatch on row {i}"
+    print(f"Equivalence: {sample} rows identical to the single-row path")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    parser.add_argument("--check-rows", type=int, default=500)
+    parser.add_argument("--single-rows", type=int, default=200)
+    args = parser.parse_args()
+
+    artifacts = get_artifacts()
+    df = synthetic_applicants(args.rows)
+
+    check_equivalence(df, artifacts, args.check_rows)
+
+    records = df.head(args.single_rows).to_dict(orient="records")
+    start = time.perf_counter()
+    for row in records:
+        score_one(row, artifacts)
+    single_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    score_batch(df, artifacts, chunk_size=args.chunk_size)
+    batch_elapsed = time.perf_counter() - start
+
+    print(f"Single-row path: {len(records) / single_elapsed:,.0f} rows/s")
+    print(f"Batch path:      {len(df) / batch_elapsed:,.0f} rows/s "
+          f"({len(df):,} rows, chunk_size={args.chunk_size:,})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# Prediction service, driven in-process through its ASGI interface (no server or sockets):
+# a micro-batch mixing valid and invalid requests, then concurrent /predict throughput.
+# Run from the repository root:  python -m benchmarks.bench_service --requests 400 --concurrency 32
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.synthetic import synthetic_applicants
+from model_registry import get_artifacts
+from scoring import score_one
+from service import PredictionService
+
+
+async def call(app, method: str, path: str, payload=None):
+    messages = [{"type": "http.request", "body": json.dumps(payload).encode() if payload is not None else b""}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    await app({"type": "http", "method": method, "path": path}, receive, send)
+    return sent[0]["status"], json.loads(sent[1]["body"])
+
+
+async def started(app):
+    lifespan = asyncio.Queue()
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    await lifespan.put({"type": "lifespan.startup"})
+    task = asyncio.create_task(app({"type": "lifespan"}, lifespan.get, send))
+    while not sent:
+        await asyncio.sleep(0.01)
+    return lifespan, task
+
+
+async def check_mixed_batch(records, artifacts):
+    # Valid and invalid requests in one micro-batch: the invalid ones get 422, the others are
+    # scored as score_one scores them
+    app = PredictionService(max_batch_size=64, max_wait_ms=200)
+    lifespan, task = await started(app)
+    missing = {k: v for k, v in records[1].items() if k != "credit_score"}
+    wrong_type = {**records[2], "monthly_salary": "abc"}
+    wrong_category = {**records[3], "gender": 1}
+    responses = await asyncio.gather(
+        call(app, "POST", "/predict", records[0]),
+        call(app, "POST", "/predict", missing),
+        call(app, "POST", "/predict/batch", [records[4], wrong_type]),
+        call(app, "POST", "/predict", wrong_category),
+        call(app, "POST", "/predict/batch", records[4:8]),
+    )
+    assert app.stats.batches == 1, app.stats.batches
+
+    def expected(row):
+        label, emi = score_one(row, artifacts)
+        return {"emi_eligibility": str(label), "max_monthly_emi": emi}
+
+    assert responses[0] == (200, expected(records[0])), responses[0]
+    assert responses[1] == (422, {"error": "invalid applicant fields", "missing": ["credit_score"]}), responses[1]
+    assert responses[2] == (422, {"error": "invalid applicant fields",
+                                  "applicants": {"1": {"invalid": ["monthly_salary"]}}}), responses[2]
+    assert responses[3] == (422, {"error": "invalid applicant fields", "invalid": ["gender"]}), responses[3]
+    assert responses[4] == (200, {"predictions": [expected(row) for row in records[4:8]]}), responses[4]
+    assert app.stats.errors == 0
+
+    await lifespan.put({"type": "lifespan.shutdown"})
+    await task
+    print("Mixed batch: 3 invalid requests answered 422, the 2 valid ones batched with them scored as score_one")
+
+
+async def throughput(records, requests: int, concurrency: int):
+    app = PredictionService()
+    lifespan, task = await started(app)
+    queue = iter(records[i % len(records)] for i in range(requests))
+
+    async def client():
+        for row in queue:
+            status, _ = await call(app, "POST", "/predict", row)
+            assert status == 200
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stats = app.stats.snapshot()
+    print(f"{requests} requests from {concurrency} clients: {requests / elapsed:,.0f} req/s, "
+          f"p50 {stats['latency_p50_ms']:.1f} ms, p99 {stats['latency_p99_ms']:.1f} ms, "
+          f"mean batch {stats['mean_batch_size']:.1f}")
+
+    await lifespan.put({"type": "lifespan.shutdown"})
+    await task
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    records = synthetic_applicants(args.requests, seed=5).to_dict(orient="records")
+    asyncio.run(check_mixed_batch(records, get_artifacts()))
+    asyncio.run(throughput(records, args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
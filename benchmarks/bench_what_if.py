@@ -0,0 +1,69 @@
+# What-if sweep: checks the incrementally built grid against prepare_batch on the fully expanded
+# grid, then times a sweep against the batch path and against one score_one per point.
+# Run from the repository root:  python -m benchmarks.bench_what_if --amount-steps 40
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import what_if
+from benchmarks.synthetic import FORM_CATEGORIES, synthetic_applicants
+from model_registry import get_artifacts
+from scoring import prepare_batch, score_batch, score_one
+
+
+def expanded(user_input: dict, grid: pd.DataFrame):
+    # The grid as plain applicant rows, for the reference paths
+    rows = pd.DataFrame([user_input] * len(grid))
+    for column in ("emi_scenario", "requested_tenure", "requested_amount"):
+        rows[column] = grid[column].to_numpy()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--amount-steps", type=int, default=what_if.DEFAULT_AMOUNT_STEPS)
+    parser.add_argument("--single-sample", type=int, default=100, help="score_one calls to time")
+    parser.add_argument("--applicants", type=int, default=5)
+    args = parser.parse_args()
+
+    artifacts = get_artifacts()
+    amounts = what_if.amount_range(10_000, 2_000_000, args.amount_steps)
+    tenures = what_if.DEFAULT_TENURES
+    scenarios = FORM_CATEGORIES["emi_scenario"]
+
+    for user_input in synthetic_applicants(args.applicants, seed=4).to_dict(orient="records"):
+        grid, features = what_if.prepare_grid(user_input, artifacts, amounts, tenures, scenarios)
+        reference = prepare_batch(expanded(user_input, grid), artifacts)
+        pd.testing.assert_frame_equal(features, reference.reset_index(drop=True), check_exact=True)
+    print(f"Equivalence: {args.applicants} applicants x {len(grid):,} grid points match prepare_batch")
+
+    start = time.perf_counter()
+    result = what_if.sweep(user_input, artifacts, amounts, tenures, scenarios)
+    frontier = what_if.frontier(result)
+    sweep_seconds = time.perf_counter() - start
+
+    rows = expanded(user_input, grid)
+    start = time.perf_counter()
+    batch = score_batch(rows, artifacts)
+    batch_seconds = time.perf_counter() - start
+    assert (batch["emi_eligibility"].to_numpy() == result["emi_eligibility"].to_numpy()).all()
+    assert np.array_equal(batch["max_monthly_emi"].to_numpy(), result["max_monthly_emi"].to_numpy())
+
+    sample = rows.head(args.single_sample).to_dict(orient="records")
+    start = time.perf_counter()
+    for row in sample:
+        score_one(row, artifacts)
+    single_seconds = (time.perf_counter() - start) / len(sample) * len(rows)
+
+    print(f"Grid: {len(amounts)} amounts x {len(tenures)} tenures x {len(scenarios)} scenarios "
+          f"= {len(result):,} points, {int(result['safe'].sum()):,} safe")
+    print(f"  sweep + frontier    {sweep_seconds * 1000:9.1f} ms")
+    print(f"  score_batch         {batch_seconds * 1000:9.1f} ms")
+    print(f"  score_one per point {single_seconds * 1000:9.1f} ms (extrapolated from {len(sample)} calls)")
+    print(frontier.pivot(index="requested_tenure", columns="emi_scenario", values="max_safe_amount").head())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# Compares two benchmark results files from benchmarks.run_all and fails on regressions.
+#   python -m benchmarks.compare BASELINE.json CURRENT.json --threshold 0.10
+#   python -m benchmarks.compare old.json new.json --metric-threshold "*.p99=0.25"
+import argparse
+import fnmatch
+import json
+import sys
+
+DEFAULT_THRESHOLD = 0.10   # relative change in the "worse" direction that counts as a regression
+
+
+def change(base: dict, current: dict):
+    # Relative change, positive when the current value is worse
+    if base["value"] == 0:
+        return 0.0
+    ratio = (current["value"] - base["value"]) / abs(base["value"])
+    return ratio if base.get("better", "lower") == "lower" else -ratio
+
+
+def threshold_for(name: str, threshold: float, overrides: dict):
+    for pattern, value in overrides.items():
+        if fnmatch.fnmatch(name, pattern):
+            return value
+    return threshold
+
+
+def report(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD, overrides: dict = None):
+    # Prints the comparison and returns the names of the regressed metrics
+    overrides = overrides or {}
+    base_metrics, current_metrics = baseline["metrics"], current["metrics"]
+    print(f"Baseline {baseline.get('commit')}  vs  current {current.get('commit')}")
+    if baseline.get("quick") != current.get("quick"):
+        print("Warning: one run used --quick, sizes and repeats differ")
+    if baseline.get("environment", {}).get("cpu_count") != current.get("environment", {}).get("cpu_count"):
+        print("Warning: results come from machines with different CPU counts")
+
+    only_base = sorted(set(base_metrics) - set(current_metrics))
+    only_current = sorted(set(current_metrics) - set(base_metrics))
+    regressions = []
+    for name in sorted(set(base_metrics) & set(current_metrics)):
+        base, cur = base_metrics[name], current_metrics[name]
+        worse = change(base, cur)
+        limit = threshold_for(name, threshold, overrides)
+        status = "REGRESSION" if worse > limit else ("improved" if worse < -limit else "")
+        if status == "REGRESSION":
+            regressions.append(name)
+        raw = (cur["value"] / base["value"] - 1) if base["value"] else 0.0
+        print(f"  {name:45s} {base['value']:14,.3f} -> {cur['value']:14,.3f} {cur['unit']:7s} "
+              f"{raw:+7.1%} {status}")
+
+    if only_base or only_current:
+        print(f"Not compared: {len(only_base)} metric(s) only in the baseline, "
+              f"{len(only_current)} only in the current run")
+    print(f"{len(regressions)} regression(s) beyond the threshold" if regressions else "No regressions")
+    return regressions
+
+
+def parse_overrides(items):
+    overrides = {}
+    for item in items or []:
+        pattern, _, value = item.rpartition("=")
+        if not pattern:
+            raise argparse.ArgumentTypeError(f"expected PATTERN=THRESHOLD, got {item!r}")
+        overrides[pattern] = float(value)
+    return overrides
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark results files")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="relative slowdown that fails the check (default 0.10)")
+    parser.add_argument("--metric-threshold", action="append", metavar="PATTERN=THRESHOLD",
+                        help="per-metric threshold, glob pattern on the metric name; repeatable")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    regressions = report(baseline, current, args.threshold, parse_overrides(args.metric_threshold))
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
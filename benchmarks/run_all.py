@@ -0,0 +1,255 @@
+# Reproducible benchmark suite: single-row latency, batch throughput across batch sizes,
+# artifact load times, CSV vs Arrow dataset loads, the run listing over synthetic mlruns trees and
+# the import time of the Streamlit scripts.
+# Results go to a JSON file per commit so two commits can be compared with benchmarks.compare.
+# Run from the repository root:
+#   python -m benchmarks.run_all                          # .cache/benchmarks/<commit>.json
+#   python -m benchmarks.run_all --quick --suites single_row batch
+#   python -m benchmarks.run_all --compare .cache/benchmarks/<baseline>.json
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from importlib import metadata
+
+import numpy as np
+import pandas as pd
+
+import dataset_store
+import model_registry
+import run_index
+import startup_report
+from benchmarks import compare, synthetic
+from benchmarks.bench_run_index import legacy_load_mlruns
+from scoring import compute_features, score_batch, score_one
+
+RESULTS_DIR = os.path.join(".cache", "benchmarks")
+BATCH_SIZES = [1, 10, 100, 1_000, 10_000, 100_000]
+MLRUNS_SIZES = [100, 1_000]
+DATASET_ROWS = 200_000
+SUBSET_COLUMNS = ["emi_scenario", "emi_eligibility", "monthly_salary", "credit_score", "gender"]
+PACKAGES = ["numpy", "pandas", "scikit-learn", "xgboost", "pyarrow", "mlflow"]
+
+
+def metric(value: float, unit: str, better: str = "lower"):
+    return {"value": float(value), "unit": unit, "better": better}
+
+
+def best_seconds(fn, repeats: int, warmup: int = 1):
+    # Fastest of `repeats` runs, as timeit reports: the least noisy estimate between commits
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+# ------------------------
+# Suites (each returns {metric name: metric})
+# ------------------------
+def single_row(quick: bool):
+    artifacts = model_registry.get_artifacts()
+    records = synthetic.synthetic_applicants(100 if quick else 500, seed=1).to_dict(orient="records")
+    score_one(records[0], artifacts)
+
+    latencies = []
+    for row in records:
+        start = time.perf_counter()
+        score_one(row, artifacts)
+        latencies.append((time.perf_counter() - start) * 1000)
+    features_us = best_seconds(lambda: [compute_features(row) for row in records], 5) / len(records) * 1e6
+
+    p50, p99 = np.percentile(latencies, [50, 99])
+    return {
+        "single_row.score_one.p50": metric(p50, "ms"),
+        "single_row.score_one.p99": metric(p99, "ms"),
+        "single_row.compute_features.mean": metric(features_us, "us"),
+    }
+
+
+def batch(quick: bool):
+    artifacts = model_registry.get_artifacts()
+    sizes = [size for size in BATCH_SIZES if not quick or size <= 10_000]
+    df = synthetic.synthetic_applicants(max(sizes), seed=2)
+    results = {}
+    for size in sizes:
+        chunk = df.head(size)
+        # Enough repeats for a stable minimum without the large sizes dominating the run
+        repeats = max(3, min(50, 20_000 // size))
+        seconds = best_seconds(lambda: score_batch(chunk, artifacts), repeats)
+        results[f"batch.score_batch.{size}"] = metric(size / seconds, "rows/s", "higher")
+    return results
+
+
+def artifact_load(quick: bool):
+    # Direct loader calls (model_registry's cache bypassed); the OS file cache is warm after the first
+    results = {}
+    for name, (path, loader) in model_registry.ARTIFACTS.items():
+        if not os.path.exists(path):
+            print(f"  artifact_load: {name} skipped, {path} not found")
+            continue
+        results[f"artifact_load.{name}"] = metric(best_seconds(lambda: loader(path), 1 if quick else 3) * 1000, "ms")
+
+    model_registry.get_artifacts()
+    hit_us = best_seconds(model_registry.get_artifacts, 1000, warmup=0) * 1e6
+    results["artifact_load.cached_get_artifacts"] = metric(hit_us, "us")
+    return results
+
+
+def dataset_load(quick: bool):
+    # A synthetic cleaned-dataset-like table, through the same code paths as the pages
+    rows = 20_000 if quick else DATASET_ROWS
+    saved = dict(dataset_store.DATASETS), dataset_store.STORE_DIR
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "bench.csv")
+        synthetic.synthetic_dataset(rows).to_csv(csv_path, index=False)
+        try:
+            dataset_store.DATASETS["bench"] = csv_path
+            dataset_store.STORE_DIR = tmp
+            dataset_store.convert("bench")
+
+            def arrow(columns):
+                dataset_store._tables.clear()  # re-map the file every time, as a fresh process would
+                return dataset_store.load_dataset("bench", columns=columns)
+
+            repeats = 3 if quick else 5
+            cases = {
+                "csv.all": lambda: pd.read_csv(csv_path, low_memory=False),
+                "arrow.all": lambda: arrow(None),
+                "csv.subset": lambda: pd.read_csv(csv_path, usecols=SUBSET_COLUMNS, low_memory=False),
+                "arrow.subset": lambda: arrow(SUBSET_COLUMNS),
+            }
+            for case, fn in cases.items():
+                results[f"dataset_load.{case}"] = metric(best_seconds(fn, repeats) * 1000, "ms")
+        finally:
+            dataset_store.DATASETS.clear()
+            dataset_store.DATASETS.update(saved[0])
+            dataset_store.STORE_DIR = saved[1]
+            dataset_store._tables.pop("bench", None)
+    return results
+
+
+def mlruns(quick: bool):
+    # Model Training page's load_mlruns (refresh + latest_metrics) vs the old directory walk
+    results = {}
+    for n_runs in MLRUNS_SIZES[:1] if quick else MLRUNS_SIZES:
+        with tempfile.TemporaryDirectory() as tmp:
+            root, index_path = os.path.join(tmp, "mlruns"), os.path.join(tmp, "index.sqlite")
+            synthetic.make_tree(root, n_runs, history=20)
+
+            legacy = best_seconds(lambda: legacy_load_mlruns(root, synthetic.EXPERIMENT_ID), 3, warmup=0)
+            start = time.perf_counter()
+            run_index.refresh(root, index_path, workers=1)
+            cold = time.perf_counter() - start
+            page = best_seconds(lambda: (run_index.refresh(root, index_path, workers=1),
+                                         run_index.latest_metrics(synthetic.EXPERIMENT_ID, index_path)), 5)
+
+            results[f"mlruns.{n_runs}.legacy_walk"] = metric(legacy * 1000, "ms")
+            results[f"mlruns.{n_runs}.index_cold_build"] = metric(cold * 1000, "ms")
+            results[f"mlruns.{n_runs}.load_mlruns"] = metric(page * 1000, "ms")
+    return results
+
+
+def startup(quick: bool):
+    # Import time of each Streamlit script in a fresh interpreter (startup_report)
+    results = {}
+    for path in startup_report.SCRIPTS:
+        report = startup_report.measure(path, 1 if quick else startup_report.DEFAULT_REPEATS)
+        name = os.path.splitext(os.path.basename(path))[0]
+        results[f"startup.import.{name}"] = metric(report["import_ms"], "ms")
+    return results
+
+
+SUITES = {
+    "single_row": single_row,
+    "batch": batch,
+    "artifact_load": artifact_load,
+    "dataset_load": dataset_load,
+    "mlruns": mlruns,
+    "startup": startup,
+}
+
+
+# ------------------------
+# Run metadata
+# ------------------------
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                               capture_output=True, text=True, check=True).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def environment():
+    versions = {}
+    for package in PACKAGES:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "packages": versions,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite and write JSON results")
+    parser.add_argument("--suites", nargs="+", choices=list(SUITES), default=list(SUITES))
+    parser.add_argument("--quick", action="store_true", help="smaller inputs and fewer repeats")
+    parser.add_argument("--output", help=f"JSON path (default {RESULTS_DIR}/<commit>.json)")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare with a previous results file")
+    parser.add_argument("--threshold", type=float, default=compare.DEFAULT_THRESHOLD)
+    parser.add_argument("--metric-threshold", action="append", metavar="PATTERN=THRESHOLD")
+    args = parser.parse_args()
+
+    synthetic.check_schema(model_registry.get("trained_features"))
+
+    commit = git_commit()
+    results = {}
+    for name in args.suites:
+        start = time.perf_counter()
+        results.update(SUITES[name](args.quick))
+        print(f"{name}: {time.perf_counter() - start:.1f} s")
+
+    report = {
+        "commit": commit,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "quick": args.quick,
+        "model_version": model_registry.version(),
+        "environment": environment(),
+        "metrics": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}{'-quick' if args.quick else ''}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for name, m in results.items():
+        print(f"  {name:45s} {m['value']:14,.3f} {m['unit']}")
+    print(f"Wrote {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare.report(baseline, report, args.threshold,
+                                     compare.parse_overrides(args.metric_threshold))
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# Synthetic inputs shared by the benchmarks: applicants in the form's schema, a cleaned-dataset-like
+# table for load tests, and file-based mlruns trees. Everything is seeded, so runs are reproducible.
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from features import CATEGORICAL_MAP
+from scoring import compute_features
+
+# Form options from pages/predict_emi.py (includes the drop_first baseline categories)
+FORM_CATEGORIES = {
+    "gender": ["Male", "Female"],
+    "marital_status": ["Married", "Single"],
+    "education": ["Graduate", "High School", "Post Graduate", "Professional"],
+    "employment_type": ["Government", "Private", "Self-employed"],
+    "company_type": ["Large Indian", "MNC", "Mid-size", "Small", "Startup"],
+    "house_type": ["Family", "Own", "Rented"],
+    "existing_loans": ["Yes", "No"],
+    "emi_scenario": ["E-commerce Shopping EMI", "Education EMI", "Home Appliances EMI",
+                     "Personal Loan EMI", "Vehicle EMI"],
+}
+
+LABELS = ["Eligible", "High_Risk", "Not_Eligible"]
+
+
+# ------------------------
+# Applicants
+# ------------------------
+def synthetic_applicants(n: int, seed: int = 42):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "age": rng.integers(18, 80, n),
+        "monthly_salary": rng.choice([0.0, 15000.0, 50000.0, 120000.0], n) + rng.integers(0, 5000, n),
+        "monthly_rent": rng.integers(0, 30000, n).astype(float),
+        "school_fees": rng.integers(0, 10000, n).astype(float),
+        "college_fees": rng.integers(0, 10000, n).astype(float),
+        "travel_expenses": rng.integers(0, 8000, n).astype(float),
+        "groceries_utilities": rng.integers(0, 20000, n).astype(float),
+        "other_monthly_expenses": rng.integers(0, 10000, n).astype(float),
+        "current_emi_amount": rng.integers(0, 20000, n).astype(float),
+        "credit_score": rng.integers(300, 900, n),
+        "bank_balance": rng.choice([0.0, 1.0], n, p=[0.1, 0.9]) * rng.integers(0, 500000, n),
+        "emergency_fund": rng.choice([0.0, 1.0], n, p=[0.1, 0.9]) * rng.integers(0, 200000, n),
+        "requested_amount": rng.integers(1, 100, n) * 10000.0,
+        "requested_tenure": rng.integers(1, 21, n) * 6,
+    })
+    for col, values in FORM_CATEGORIES.items():
+        assert set(CATEGORICAL_MAP[col]) <= set(values)
+        df[col] = rng.choice(values, n)
+    # Dataset columns the form does not ask for
+    df["years_of_employment"] = np.round(rng.uniform(0, 35, n), 1)
+    df["family_size"] = rng.integers(1, 7, n)
+    df["dependents"] = np.minimum(rng.integers(0, 5, n), df["family_size"] - 1)
+    return df
+
+
+def check_schema(trained_features: list):
+    # Every trained feature must come from the applicant columns or compute_features;
+    # anything else would silently be zero-filled by reindex and skew the benchmarks
+    features = compute_features(synthetic_applicants(1).to_dict(orient="records")[0])
+    missing = [name for name in trained_features if name not in features]
+    if missing:
+        raise ValueError(f"synthetic applicants do not produce trained features: {missing}")
+
+
+def synthetic_dataset(n: int, seed: int = 0):
+    # Applicants plus targets, shaped like the cleaned dataset the dashboard pages load
+    rng = np.random.default_rng(seed + 1)
+    df = synthetic_applicants(n, seed)
+    df["emi_eligibility"] = rng.choice(LABELS, n, p=[0.2, 0.05, 0.75])
+    df["max_monthly_emi"] = np.round(rng.gamma(2.0, 3000.0, n), 2)
+    return df
+
+
+def synthetic_raw(n: int, seed: int = 0):
+    # A dirty raw extract in emi_prediction_dataset.csv's shape, for cleaning_pipeline: numbers
+    # stored as text with junk values, missing values in the filled columns, gender spellings,
+    # outliers and repeated rows (some only equal once the missing values are filled)
+    rng = np.random.default_rng(seed + 2)
+    df = synthetic_dataset(n, seed)
+    for col in ["monthly_rent", "credit_score", "emergency_fund", "bank_balance", "monthly_salary", "age"]:
+        df[col] = df[col].astype(float).where(rng.random(n) > 0.05)
+    df["education"] = df["education"].where(rng.random(n) > 0.03)
+    for col in ["monthly_salary", "college_fees", "requested_amount", "max_monthly_emi"]:
+        df[col] = df[col].where(rng.random(n) > 0.01, df[col] * 40)
+    for col in ["age", "monthly_salary", "bank_balance"]:
+        text = df[col].map(lambda v: "" if pd.isna(v) else f"{v:g}").astype(object)
+        text[rng.random(n) < 0.01] = "n/a"
+        df[col] = text.replace("", np.nan)
+    df["gender"] = df["gender"].map({"Male": ["M", "male", " MALE", "Male"],
+                                     "Female": ["F", "female", "FEMALE ", "Female"]}).map(rng.choice)
+    repeated = df.iloc[rng.integers(0, n, n // 20)]
+    df = pd.concat([df, repeated], ignore_index=True)
+    return df.iloc[rng.permutation(len(df))].reset_index(drop=True)
+
+
+# ------------------------
+# mlruns trees
+# ------------------------
+EXPERIMENT_ID = "924749176205125717"
+METRICS = ["accuracy", "precision", "recall", "f1_score", "roc_auc"]
+PARAMS = {"n_estimators": "50", "random_state": "42", "max_depth": "6"}
+TAGS = {"task": "classification", "model_type": "XGBoost", "mlflow.user": "bench"}
+
+
+def write_run(experiment_dir: str, rng, history: int, status: int = 3):
+    run_id = uuid.UUID(bytes=rng.bytes(16)).hex
+    run_dir = os.path.join(experiment_dir, run_id)
+    for sub in ("metrics", "params", "tags", "artifacts"):
+        os.makedirs(os.path.join(run_dir, sub))
+
+    start = 1_700_000_000_000 + int(rng.integers(10**9))
+    with open(os.path.join(run_dir, "meta.yaml"), "w") as f:
+        yaml.safe_dump({"run_id": run_id, "run_name": f"run-{run_id[:6]}", "experiment_id": EXPERIMENT_ID,
+                        "status": status, "lifecycle_stage": "active", "start_time": start,
+                        "end_time": start + 1000}, f)
+    for key in METRICS:
+        with open(os.path.join(run_dir, "metrics", key), "w") as f:
+            for step in range(history):
+                f.write(f"{start + step} {rng.random()} {step}\n")
+    for folder, values in (("params", PARAMS), ("tags", TAGS)):
+        for key, value in values.items():
+            with open(os.path.join(run_dir, folder, key), "w") as f:
+                f.write(value)
+    return run_id
+
+
+def make_tree(root: str, n_runs: int, history: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    experiment_dir = os.path.join(root, EXPERIMENT_ID)
+    os.makedirs(experiment_dir, exist_ok=True)
+    with open(os.path.join(experiment_dir, "meta.yaml"), "w") as f:
+        yaml.safe_dump({"experiment_id": EXPERIMENT_ID, "name": "bench"}, f)
+    for _ in range(n_runs):
+        write_run(experiment_dir, rng, history)
+    return experiment_dir
@@ -0,0 +1,301 @@
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+import model_registry
+from features import transform_for
+
+# Out-of-core rescoring of a portfolio file (CSV or Parquet) with the serving pipeline:
+# FeatureTransform, then both models and the label encoder, as scoring.score_batch does.
+# The file is read in chunks of --chunk-size rows; chunks are scored in a process pool whose
+# workers load the artifacts once (in the pool initializer) and reuse one float32 feature
+# buffer, and each chunk is written as its own Parquet part (optionally under hive-style
+# --partition-by directories). _checkpoint.json records the finished chunks, so an interrupted
+# run resumes where it stopped; it also pins the input file, chunk size and model version, and
+# a run against anything else refuses to mix outputs unless --restart is given. Each run
+# appends its throughput and peak memory to _runs.jsonl.
+#
+#   python bulk_score.py portfolio.parquet --output scores/ --keep customer_id --partition-by emi_eligibility
+
+DEFAULT_CHUNK_SIZE = 100_000
+CHECKPOINT_NAME = "_checkpoint.json"
+RUNS_NAME = "_runs.jsonl"
+OUTPUT_COLS = ["emi_eligibility", "max_monthly_emi"]
+
+
+# ------------------------
+# Input
+# ------------------------
+def input_fingerprint(path: str):
+    # Identifies one version of the input without reading it (as dataset_store.dataset_hash)
+    stat = os.stat(path)
+    return {"path": os.path.abspath(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def input_columns(path: str):
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).schema_arrow.names
+    return pd.read_csv(path, nrows=0).columns.tolist()
+
+
+def read_chunks(path: str, chunk_size: int, columns: list, skip_chunks: int = 0):
+    # Yields (chunk index, first row number, DataFrame). Chunk boundaries depend only on the
+    # file and chunk_size, so a resumed run sees the same chunks. The first skip_chunks CSV
+    # chunks (already scored) are skipped without being parsed.
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        first_row = 0
+        for index, batch in enumerate(pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=columns)):
+            if index >= skip_chunks:
+                yield index, first_row, batch.to_pandas()
+            first_row += batch.num_rows
+        return
+
+    skip_rows = skip_chunks * chunk_size
+    reader = pd.read_csv(path, chunksize=chunk_size, usecols=columns, low_memory=False,
+                         skiprows=(lambda i: 0 < i <= skip_rows) if skip_rows else None)
+    for index, chunk in enumerate(reader, start=skip_chunks):
+        if len(chunk):
+            yield index, index * chunk_size, chunk
+
+
+# ------------------------
+# Checkpoint
+# ------------------------
+def load_checkpoint(output_dir: str):
+    path = os.path.join(output_dir, CHECKPOINT_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_checkpoint(output_dir: str, checkpoint: dict):
+    path = os.path.join(output_dir, CHECKPOINT_NAME)
+    with open(path + ".tmp", "w") as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def remove_parts(output_dir: str):
+    for path in glob.glob(os.path.join(output_dir, "**", "part-*.parquet"), recursive=True):
+        os.remove(path)
+
+
+def peak_rss_mib():
+    # VmHWM of this process (ru_maxrss would include a forked parent's peak)
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+# ------------------------
+# Workers
+# ------------------------
+_worker = {}
+
+
+def _init_worker(threads: int, chunk_size: int):
+    # Once per worker process: the artifacts, a feature buffer every chunk is written into, and
+    # thread limits. numpy was imported with this module and xgboost with the artifacts, so
+    # their pools already exist and are resized with threadpoolctl; the env vars only reach
+    # libraries loaded later.
+    from threadpoolctl import threadpool_limits
+
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "NUMEXPR_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    artifacts = model_registry.get_artifacts()
+    transform = transform_for(artifacts)
+    _worker["artifacts"] = artifacts
+    _worker["transform"] = transform
+    _worker["buffer"] = np.empty((chunk_size, len(transform.trained_features)), dtype=np.float32)
+    threadpool_limits(threads)
+
+
+def score_chunk(chunk: pd.DataFrame, artifacts, transform, out: np.ndarray = None):
+    # scoring.score_batch for one chunk, with the feature matrix written into `out`
+    features = pd.DataFrame(transform.matrix(chunk, out=out), columns=transform.trained_features, copy=False)
+    pred_class = artifacts.label_encoder.inverse_transform(
+        np.asarray(artifacts.classification_model.predict(features)))
+    pred_emi = np.asarray(artifacts.regression_model.predict(features), dtype=np.float64)
+    return pred_class, pred_emi
+
+
+def _part_path(output_dir: str, index: int, partition: tuple = ()):
+    directory = os.path.join(output_dir, *(f"{col}={value}" for col, value in partition))
+    return os.path.join(directory, f"part-{index:06d}.parquet")
+
+
+def _write_part(df: pd.DataFrame, path: str):
+    # Written under a dot-name first: Parquet dataset readers skip it until it is complete
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = os.path.join(directory, f".{os.path.basename(path)}.tmp")
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def _score_and_write(index: int, first_row: int, chunk: pd.DataFrame, output_dir: str,
+                     keep: list, partition_by: list):
+    start = time.perf_counter()
+    n = len(chunk)
+    pred_class, pred_emi = score_chunk(chunk, _worker["artifacts"], _worker["transform"], _worker["buffer"][:n])
+
+    result = pd.DataFrame({"row": np.arange(first_row, first_row + n, dtype=np.int64)})
+    for col in keep:
+        result[col] = chunk[col].to_numpy()
+    result["emi_eligibility"] = pred_class
+    result["max_monthly_emi"] = pred_emi
+
+    # Parts of one chunk are named after it, so rescoring the chunk overwrites them
+    if partition_by:
+        for values, part in result.groupby(partition_by, sort=False, dropna=False):
+            values = values if isinstance(values, tuple) else (values,)
+            _write_part(part.drop(columns=partition_by), _part_path(output_dir, index, tuple(zip(partition_by, values))))
+    else:
+        _write_part(result, _part_path(output_dir, index))
+    return index, n, time.perf_counter() - start, peak_rss_mib()
+
+
+# ------------------------
+# Driver
+# ------------------------
+def run(input_path: str, output_dir: str, chunk_size: int = DEFAULT_CHUNK_SIZE, workers: int = None,
+        threads_per_worker: int = 1, keep: list = None, partition_by: list = None, restart: bool = False):
+    keep, partition_by = list(keep or []), list(partition_by or [])
+    workers = workers or os.cpu_count()
+    started_at = time.strftime("%Y-%m-%dT%H:%M:%S%z")
+    start = time.perf_counter()
+
+    # Checked up front in this process: the artifacts load and validate, and the input has
+    # every column the transform reads
+    artifacts = model_registry.get_artifacts()
+    transform = transform_for(artifacts)
+    available = set(input_columns(input_path))
+    missing = [col for col in transform.inputs + keep if col not in available]
+    if missing:
+        raise ValueError(f"{input_path} is missing columns {missing}")
+    unknown = [col for col in partition_by if col not in keep + OUTPUT_COLS]
+    if unknown:
+        raise ValueError(f"--partition-by columns must be kept columns or {OUTPUT_COLS}, got {unknown}")
+    clashes = [col for col in keep if col in OUTPUT_COLS + ["row"]]
+    if clashes:
+        raise ValueError(f"kept columns clash with output columns: {clashes}")
+
+    settings = {
+        "input": input_fingerprint(input_path),
+        "chunk_size": chunk_size,
+        "model_version": model_registry.version(),
+        "keep": keep,
+        "partition_by": partition_by,
+    }
+    os.makedirs(output_dir, exist_ok=True)
+    checkpoint = load_checkpoint(output_dir)
+    if checkpoint is not None and not restart:
+        changed = [key for key, value in settings.items() if checkpoint["settings"].get(key) != value]
+        if changed:
+            raise ValueError(f"{output_dir} holds a run with different {', '.join(changed)}; "
+                             f"use --restart (or another --output) to score from scratch")
+    else:
+        # Parts of an earlier run (other chunking or partitions) would not be overwritten
+        remove_parts(output_dir)
+        checkpoint = {"settings": settings, "done": {}}
+    done = {int(index) for index in checkpoint["done"]}
+
+    # The scored prefix of the file is not read again; other finished chunks are read but not rescored
+    prefix = 0
+    while prefix in done:
+        prefix += 1
+
+    rows_scored = rows_skipped = 0
+    worker_peak = 0.0
+    columns = list(dict.fromkeys(transform.inputs + keep))
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                             initargs=(threads_per_worker, chunk_size)) as executor:
+        pending = set()
+
+        def collect(block: bool):
+            nonlocal rows_scored, worker_peak
+            if block:
+                finished = wait(pending, return_when=FIRST_COMPLETED).done
+            else:
+                finished = {future for future in pending if future.done()}
+            for future in finished:
+                pending.discard(future)
+                index, n, seconds, peak = future.result()
+                rows_scored += n
+                worker_peak = max(worker_peak, peak)
+                checkpoint["done"][str(index)] = n
+                save_checkpoint(output_dir, checkpoint)
+                print(f"chunk {index}: {n:,} rows in {seconds:.2f}s ({n / max(seconds, 1e-9):,.0f} rows/s)")
+
+        for index, first_row, chunk in read_chunks(input_path, chunk_size, columns, prefix):
+            if index in done:
+                rows_skipped += len(chunk)
+                continue
+            # At most two chunks per worker in flight, so memory stays bounded by the chunk size
+            while len(pending) >= workers * 2:
+                collect(block=True)
+            pending.add(executor.submit(_score_and_write, index, first_row, chunk, output_dir, keep, partition_by))
+            collect(block=False)
+        while pending:
+            collect(block=True)
+
+    seconds = time.perf_counter() - start
+    report = {
+        "input": input_path,
+        "output": output_dir,
+        "started_at": started_at,
+        "model_version": settings["model_version"],
+        "rows_scored": rows_scored,
+        "rows_resumed": rows_skipped + sum(checkpoint["done"][str(i)] for i in range(prefix)),
+        "chunks": len(checkpoint["done"]),
+        "workers": workers,
+        "seconds": seconds,
+        "rows_per_second": rows_scored / seconds if seconds else 0.0,
+        "peak_rss_mib": {"driver": peak_rss_mib(), "worker_max": worker_peak},
+    }
+    with open(os.path.join(output_dir, RUNS_NAME), "a") as f:
+        f.write(json.dumps(report) + "\n")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a CSV or Parquet portfolio in chunks into partitioned Parquet")
+    parser.add_argument("input", help="CSV or Parquet file of applicants (raw dataset columns)")
+    parser.add_argument("--output", required=True, help="output directory (parts, checkpoint and run log)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=None, help="scoring processes (default: CPU count)")
+    parser.add_argument("--threads", type=int, default=1, help="BLAS/OpenMP threads per worker")
+    parser.add_argument("--keep", nargs="+", default=[], help="input columns copied to the output (e.g. an id)")
+    parser.add_argument("--partition-by", nargs="+", default=[],
+                        help="hive-style output directories by these output or kept columns")
+    parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint")
+    args = parser.parse_args()
+
+    report = run(args.input, args.output, args.chunk_size, args.workers, args.threads,
+                 args.keep, args.partition_by, args.restart)
+    print(f"Scored {report['rows_scored']:,} rows ({report['rows_resumed']:,} from an earlier run) "
+          f"in {report['seconds']:.1f}s: {report['rows_per_second']:,.0f} rows/s with {report['workers']} worker(s)")
+    print(f"Peak RSS: driver {report['peak_rss_mib']['driver']:,.0f} MiB, "
+          f"largest worker {report['peak_rss_mib']['worker_max']:,.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
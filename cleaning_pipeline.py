@@ -0,0 +1,398 @@
+import argparse
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import out_of_core
+from out_of_core import DEFAULT_BUCKET_ROWS, ColumnSpill, column_sum, first_occurrences
+from quantile_sketch import DEFAULT_K, QuantileSketch, merge_sketches, sketch_columns
+
+# Two-pass, chunked version of the cleaning cells in main.ipynb that produce
+# emi_prediction_dataset_enhanced.csv:
+#   pass 1  scan chunks and spill the narrow columns the statistics need (fill columns,
+#           group keys, outlier columns) plus one 64-bit hash per row for the rest to disk;
+#           the statistics (means, education mode, group medians, salary bins, first
+#           drop_duplicates, IQR bounds) are then computed exactly from the spilled
+#           columns, a block at a time (out_of_core.py)
+#   pass 2  clean chunks in parallel with those statistics and spill them with their row
+#           hashes; rows that became duplicates after capping are found in on-disk hash
+#           buckets, and the kept rows are written out in file order
+#
+# Memory does not grow with the row count. It is bounded by the chunks in flight (2 per
+# worker, --chunksize rows each), one spilled block (--chunksize rows of the narrow
+# columns), one dedupe bucket (out_of_core.DEFAULT_BUCKET_ROWS hashes, 16 bytes each) and
+# 512 KiB per order statistic being selected (a few per group median, four per outlier
+# column). The spill directory needs about the narrow columns (~25 x 8 bytes per row) plus
+# the cleaned data in free disk space, and the keep masks are memory-mapped files there.
+#
+# With approx_quantiles=True the IQR bounds come from mergeable KLL sketches built per
+# chunk instead of exact quantiles, so the outlier columns are neither spilled nor read
+# back in the five selection passes. The sketches see the rows before the first
+# drop_duplicates.
+
+RAW_PATH = "emi_prediction_dataset.csv"
+OUTPUT_PATH = "emi_prediction_dataset_enhanced.csv"
+DEFAULT_CHUNKSIZE = 100_000
+
+# Object columns in the raw file; read as text so pd.to_numeric parses them as in the notebook
+TEXT_NUMERIC_COLS = ['age', 'monthly_salary', 'bank_balance']
+COERCE_COLS = ['age', 'monthly_salary', 'bank_balance', 'emergency_fund']
+MEAN_FILL_COLS = ['monthly_rent', 'credit_score', 'age']
+
+# Columns whose values can change before the first drop_duplicates
+FILL_COLS = ['age', 'monthly_salary', 'bank_balance', 'emergency_fund',
+             'monthly_rent', 'credit_score', 'education']
+
+OUTLIER_COLS = [
+    'monthly_salary','monthly_rent','college_fees',
+    'travel_expenses','groceries_utilities','other_monthly_expenses',
+    'current_emi_amount','bank_balance','emergency_fund',
+    'requested_amount','max_monthly_emi'
+]
+
+GENDER_MAP = {
+    'F': 'Female', 'FEMALE': 'Female', 'female': 'Female', 'Female': 'Female',
+    'M': 'Male', 'MALE': 'Male', 'male': 'Male', 'Male': 'Male'
+}
+
+GROUP_COLS = ['employment_type', 'family_size']
+NARROW_COLS = list(dict.fromkeys(FILL_COLS + GROUP_COLS + OUTLIER_COLS))
+# Text columns among them, spilled as codes into a vocabulary
+CODED_COLS = ['education', 'employment_type']
+
+# Outlier columns untouched by the fills can be sketched straight from the raw chunks
+SKETCH_COLS = [col for col in OUTLIER_COLS if col not in FILL_COLS]
+
+
+# ------------------------
+# Helpers
+# ------------------------
+def read_chunks(path: str, chunksize: int, usecols=None):
+    dtype = {col: str for col in TEXT_NUMERIC_COLS}
+    return pd.read_csv(path, chunksize=chunksize, dtype=dtype, usecols=usecols)
+
+
+def coerce(chunk: pd.DataFrame):
+    for col in COERCE_COLS:
+        chunk[col] = pd.to_numeric(chunk[col], errors='coerce')
+    return chunk
+
+
+def row_hashes(df: pd.DataFrame):
+    # Same rows -> same hash, matching DataFrame.duplicated (NaN == NaN, -0.0 == 0.0)
+    canonical = {}
+    for col in df.columns:
+        values = df[col]
+        if values.dtype == np.uint64:
+            canonical[col] = values  # an earlier row hash, kept bit-exact
+        elif pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            canonical[col] = values.astype(float) + 0.0
+        else:
+            canonical[col] = values.astype(object)
+    return pd.util.hash_pandas_object(pd.DataFrame(canonical), index=False).to_numpy()
+
+
+def cap(values, lower: float, upper: float):
+    values = np.where(values > upper, upper, values)
+    return np.where(values < lower, lower, values)
+
+
+def fill(chunk: pd.DataFrame, stats: dict):
+    # The notebook's fills, in its order, with statistics of the whole file
+    for col in MEAN_FILL_COLS:
+        chunk[col] = chunk[col].fillna(stats["means"][col])
+    chunk['education'] = chunk['education'].fillna(stats["education_mode"])
+
+    chunk['monthly_salary'] = chunk['monthly_salary'].fillna(
+        chunk['employment_type'].map(stats["salary_medians"])
+    )
+    salary_bins = pd.cut(chunk['monthly_salary'], bins=stats["salary_edges"], labels=False)
+    chunk['bank_balance'] = chunk['bank_balance'].fillna(salary_bins.map(stats["balance_medians"]))
+    chunk['emergency_fund'] = chunk['emergency_fund'].fillna(
+        chunk['family_size'].map(stats["fund_medians"])
+    )
+    return chunk
+
+
+def _encode(values, vocabulary: dict):
+    # Text -> float codes (NaN stays NaN), growing the vocabulary in order of appearance
+    local, uniques = pd.factorize(values)
+    codes = np.array([vocabulary.setdefault(value, len(vocabulary)) for value in uniques] + [np.nan])
+    return codes[local]
+
+
+def _decode(codes, vocabulary: dict):
+    names = np.array(list(vocabulary), dtype=object)
+    values = np.full(len(codes), np.nan, dtype=object)
+    valid = ~np.isnan(codes)
+    values[valid] = names[codes[valid].astype(np.intp)]
+    return values
+
+
+# ------------------------
+# Pass 1: statistics
+# ------------------------
+def scan_chunk(chunk: pd.DataFrame, approx_quantiles: bool = False, k: int = DEFAULT_K):
+    # The chunk's narrow columns as arrays (text ones as objects, numbers as float64)
+    chunk = coerce(chunk)
+    other_cols = [col for col in chunk.columns if col not in FILL_COLS]
+    sketches = None
+    if approx_quantiles:
+        columns = FILL_COLS + GROUP_COLS
+        sketches = sketch_columns(chunk, SKETCH_COLS, k)
+    else:
+        columns = NARROW_COLS
+    narrow = {col: chunk[col].to_numpy(dtype=object if col in CODED_COLS else np.float64, na_value=np.nan)
+              for col in columns}
+    narrow['other_hash'] = row_hashes(chunk[other_cols])
+    return narrow, sketches
+
+
+def spill_narrow(spill: ColumnSpill, narrow: dict, vocabularies: dict):
+    for col, values in narrow.items():
+        if col in vocabularies:
+            values = _encode(values, vocabularies[col])
+        spill.append(col, values)
+        if col in MEAN_FILL_COLS:
+            # What Series.mean sums: NaN replaced by 0
+            spill.append(f"{col}.zeros", np.where(np.isnan(values), 0.0, values))
+
+
+def spilled_blocks(spill: ColumnSpill, columns: list, vocabularies: dict):
+    # (first row, DataFrame) blocks of spilled narrow columns, text columns decoded
+    for start, arrays in spill.blocks(*columns):
+        block = pd.DataFrame(dict(zip(columns, arrays)))
+        for col in CODED_COLS:
+            if col in block:
+                block[col] = _decode(block[col].to_numpy(), vocabularies[col])
+        yield start, block
+
+
+def compute_stats(spill: ColumnSpill, vocabularies: dict, spill_dir: str, sketches: dict = None,
+                  k: int = DEFAULT_K, bucket_rows: int = DEFAULT_BUCKET_ROWS):
+    # Same statistics as the notebook computes on the whole frame, read back block by block
+    rows = spill.rows['other_hash']
+    stats = {"means": {}}
+    for col in MEAN_FILL_COLS:
+        count = sum(int((~np.isnan(values)).sum()) for _, (values,) in spill.blocks(col))
+        stats["means"][col] = column_sum(spill, f"{col}.zeros") / count if count else np.nan
+
+    # Categorical mode: the most frequent value, the first category (sorted) on a tie
+    counts = np.zeros(len(vocabularies['education']), dtype=np.int64)
+    for _, (codes,) in spill.blocks('education'):
+        counts += np.bincount(codes[~np.isnan(codes)].astype(np.intp), minlength=len(counts))
+    stats["education_mode"] = min(name for name, n in zip(vocabularies['education'], counts) if n == counts.max())
+
+    employment = list(vocabularies['employment_type'])
+    salary_medians = out_of_core.medians(
+        lambda: (arrays for _, arrays in spill.blocks('employment_type', 'monthly_salary')))
+    stats["salary_medians"] = pd.Series({employment[int(code)]: value
+                                         for code, value in salary_medians.items()}).sort_index()
+
+    def filled_salary():
+        for _, block in spilled_blocks(spill, ['employment_type', 'monthly_salary'], vocabularies):
+            yield block['monthly_salary'].fillna(block['employment_type'].map(stats["salary_medians"]))
+
+    # pd.cut(bins=5) edges depend only on the minimum and maximum
+    low = min(salary.min() for salary in filled_salary())
+    high = max(salary.max() for salary in filled_salary())
+    _, stats["salary_edges"] = pd.cut(pd.Series([low, high]), bins=5, labels=False, retbins=True)
+
+    def balance_by_bin():
+        for salary, (_, (balance,)) in zip(filled_salary(), spill.blocks('bank_balance')):
+            bins = pd.cut(salary, bins=stats["salary_edges"], labels=False)
+            yield bins.to_numpy(dtype=np.float64, na_value=np.nan), balance
+
+    stats["balance_medians"] = pd.Series(out_of_core.medians(balance_by_bin)).sort_index()
+    stats["fund_medians"] = pd.Series(out_of_core.medians(
+        lambda: (arrays for _, arrays in spill.blocks('family_size', 'emergency_fund')))).sort_index()
+
+    # First drop_duplicates: full row = (hash of untouched columns, filled columns). The
+    # filled outlier columns are spilled on the way for the bounds.
+    filled_outliers = [col for col in OUTLIER_COLS if col in FILL_COLS]
+    columns = ['other_hash'] + FILL_COLS + GROUP_COLS
+
+    def filled_hashes():
+        for start, block in spilled_blocks(spill, columns, vocabularies):
+            block = fill(block, stats)
+            for col in filled_outliers:
+                if sketches is not None:
+                    sketches.setdefault(col, QuantileSketch(k)).update(block[col].to_numpy())
+                else:
+                    spill.append(f"{col}.filled", block[col].to_numpy(dtype=np.float64))
+            yield start, row_hashes(block[['other_hash'] + FILL_COLS])
+
+    keep = first_occurrences(filled_hashes(), rows, os.path.join(spill_dir, "dedupe1"), bucket_rows)
+
+    stats["bounds"] = {}
+    if sketches is not None:
+        for col in OUTLIER_COLS:
+            stats["bounds"][col] = sketches[col].iqr_bounds()
+        return stats, keep
+
+    sources = [f"{col}.filled" if col in filled_outliers else col for col in OUTLIER_COLS]
+
+    def deduped_values():
+        # group = position in OUTLIER_COLS
+        for start, arrays in spill.blocks(*sources):
+            kept = np.asarray(keep[start:start + len(arrays[0])])
+            yield (np.repeat(np.arange(len(arrays), dtype=np.float64), kept.sum()),
+                   np.concatenate([values[kept] for values in arrays]))
+
+    quartiles = out_of_core.quantiles(deduped_values, [0.25, 0.75])
+    for i, col in enumerate(OUTLIER_COLS):
+        q1, q3 = quartiles.get(float(i), [np.nan, np.nan])
+        iqr = q3 - q1
+        stats["bounds"][col] = (q1 - 1.5 * iqr, q3 + 1.5 * iqr)
+
+    return stats, keep
+
+
+# ------------------------
+# Pass 2: apply
+# ------------------------
+def clean_chunk(chunk: pd.DataFrame, keep, stats: dict):
+    chunk = fill(coerce(chunk), stats)
+    chunk = chunk[keep].copy()
+
+    chunk['gender'] = chunk['gender'].str.strip().str.upper().map(GENDER_MAP)
+
+    for col, (lower, upper) in stats["bounds"].items():
+        chunk[col] = cap(chunk[col].to_numpy(), lower, upper)
+    chunk['credit_score'] = chunk['credit_score'].clip(lower=300, upper=850)
+
+    return chunk, row_hashes(chunk)
+
+
+# ------------------------
+# Driver
+# ------------------------
+def _ordered_map(executor, fn, items, window: int):
+    # executor.map with a bounded number of chunks in flight, results in input order
+    pending = []
+    for args in items:
+        pending.append(executor.submit(fn, *args))
+        if len(pending) >= window:
+            yield pending.pop(0).result()
+    for future in pending:
+        yield future.result()
+
+
+def run(input_path: str = RAW_PATH, output_path: str = OUTPUT_PATH,
+        chunksize: int = DEFAULT_CHUNKSIZE, workers: int = None,
+        approx_quantiles: bool = False, k: int = DEFAULT_K, spill_dir: str = None,
+        bucket_rows: int = DEFAULT_BUCKET_ROWS):
+    workers = workers or os.cpu_count()
+    window = workers * 2
+    timings = {}
+    spill_dir = tempfile.mkdtemp(prefix=".cleaning-spill-", dir=spill_dir or os.path.dirname(output_path) or ".")
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            start = time.perf_counter()
+            spill = ColumnSpill(os.path.join(spill_dir, "narrow"), block_rows=chunksize)
+            vocabularies = {col: {} for col in CODED_COLS}
+            sketches = {} if approx_quantiles else None
+            chunks = ((chunk, approx_quantiles, k) for chunk in read_chunks(input_path, chunksize))
+            for narrow, chunk_sketches in _ordered_map(executor, scan_chunk, chunks, window):
+                spill_narrow(spill, narrow, vocabularies)
+                if approx_quantiles:
+                    sketches = merge_sketches([sketches, chunk_sketches])
+            stats, keep = compute_stats(spill, vocabularies, spill_dir, sketches, k, bucket_rows)
+            timings["pass1_seconds"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            offsets = [0]
+
+            def pass2_items():
+                for chunk in read_chunks(input_path, chunksize):
+                    offset = offsets[0]
+                    offsets[0] += len(chunk)
+                    yield chunk, np.array(keep[offset:offset + len(chunk)]), stats
+
+            cleaned = ColumnSpill(os.path.join(spill_dir, "cleaned"), block_rows=chunksize)
+            parts = []
+            for chunk, hashes in _ordered_map(executor, clean_chunk, pass2_items(), window):
+                parts.append((os.path.join(spill_dir, "cleaned", f"part-{len(parts):06d}.pkl"), len(chunk)))
+                chunk.to_pickle(parts[-1][0])
+                cleaned.append("hash", hashes)
+
+        # Second drop_duplicates, in file order across chunks
+        rows_in = len(keep)
+        keep = first_occurrences(((start, hashes) for start, (hashes,) in cleaned.blocks("hash")),
+                                 cleaned.rows.get("hash", 0), os.path.join(spill_dir, "dedupe2"), bucket_rows)
+        rows_out, offset = 0, 0
+        tmp_path = output_path + ".tmp"
+        with open(tmp_path, "w", newline="") as out:
+            header = True
+            for path, n in parts:
+                chunk = pd.read_pickle(path)
+                os.remove(path)
+                chunk = chunk[np.asarray(keep[offset:offset + n])]
+                offset += n
+                chunk.to_csv(out, index=False, header=header)
+                header = False
+                rows_out += len(chunk)
+        os.replace(tmp_path, output_path)
+        timings["pass2_seconds"] = time.perf_counter() - start
+    finally:
+        shutil.rmtree(spill_dir, ignore_errors=True)
+
+    return {"rows_in": rows_in, "rows_out": rows_out, **timings}
+
+
+def file_digest(path: str):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def check(output_path: str, reference_path: str):
+    if file_digest(output_path) == file_digest(reference_path):
+        print(f"Check passed: {output_path} is byte-identical to {reference_path}")
+        return True
+
+    with open(output_path) as a, open(reference_path) as b:
+        for line_no, (line_a, line_b) in enumerate(zip(a, b), start=1):
+            if line_a != line_b:
+                print(f"Check failed at line {line_no}:\n  ours:      {line_a.rstrip()}\n"
+                      f"  reference: {line_b.rstrip()}")
+                return False
+    print("Check failed: files differ in length")
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming version of the main.ipynb cleaning cells")
+    parser.add_argument("--input", default=RAW_PATH)
+    parser.add_argument("--output", default="emi_prediction_dataset_enhanced.pipeline.csv")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--approx-quantiles", action="store_true",
+                        help="estimate the IQR bounds with mergeable KLL sketches (bounded memory)")
+    parser.add_argument("--sketch-k", type=int, default=DEFAULT_K)
+    parser.add_argument("--spill-dir", default=None,
+                        help="where to create the temporary spill directory (default: next to --output)")
+    parser.add_argument("--check", metavar="REFERENCE", nargs="?", const=OUTPUT_PATH,
+                        help=f"compare the output with the notebook's file (default {OUTPUT_PATH})")
+    args = parser.parse_args()
+
+    report = run(args.input, args.output, args.chunksize, args.workers,
+                 args.approx_quantiles, args.sketch_k, args.spill_dir)
+    print(f"{report['rows_in']:,} rows in, {report['rows_out']:,} rows out | "
+          f"pass 1 {report['pass1_seconds']:.1f}s, pass 2 {report['pass2_seconds']:.1f}s")
+
+    if args.check and not check(args.output, args.check):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
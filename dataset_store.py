@@ -0,0 +1,126 @@
+import argparse
+import hashlib
+import os
+import threading
+
+import pandas as pd
+
+from instrumentation import count, stage
+
+# Arrow IPC (Feather v2) files written uncompressed so they can be memory-mapped;
+# string columns are stored as dictionary columns and come back as pandas categoricals.
+
+STORE_DIR = "data_store"
+
+DATASETS = {
+    "raw": "emi_prediction_dataset.csv",
+    "clean": "emi_prediction_dataset_enhanced.csv",
+    "encoded": "emi_prediction_dataset_encoded.csv",
+    "final": "emi_prediction_dataset_final_enhanced.csv",
+    "smote": "smote_emi_data.csv",
+}
+
+_lock = threading.Lock()
+_tables = {}
+
+
+def store_path(name: str):
+    return os.path.join(STORE_DIR, f"{name}.arrow")
+
+
+def is_fresh(name: str):
+    path = store_path(name)
+    return os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(DATASETS[name])
+
+
+def dataset_hash(name: str):
+    # Identifies one version of the dataset file without reading it
+    path = store_path(name) if is_fresh(name) else DATASETS[name]
+    stat = os.stat(path)
+    key = f"{path}:{stat.st_size}:{stat.st_mtime_ns}"
+    return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+
+# ------------------------
+# Conversion (CSV -> Arrow IPC)
+# ------------------------
+def convert(name: str):
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    df = pd.read_csv(DATASETS[name], low_memory=False)
+    for col in df.select_dtypes(include=["object", "string", "bool"]).columns:
+        df[col] = df[col].astype("category")
+
+    os.makedirs(STORE_DIR, exist_ok=True)
+    path = store_path(name)
+    tmp_path = path + ".tmp"
+    feather.write_feather(pa.Table.from_pandas(df, preserve_index=False), tmp_path,
+                          compression="uncompressed")
+    os.replace(tmp_path, path)
+    return path
+
+
+# ------------------------
+# Loading
+# ------------------------
+def _mapped_table(name: str):
+    import pyarrow.feather as feather
+
+    path = store_path(name)
+    mtime = os.path.getmtime(path)
+    with _lock:
+        cached = _tables.get(name)
+        if cached is None or cached[0] != mtime:
+            # memory_map=True: column buffers stay in the OS page cache, shared by every process
+            cached = (mtime, feather.read_table(path, memory_map=True))
+            _tables[name] = cached
+    return cached[1]
+
+
+def columns_of(name: str):
+    if is_fresh(name):
+        return _mapped_table(name).column_names
+    return pd.read_csv(DATASETS[name], nrows=0).columns.tolist()
+
+
+def load_dataset(name: str, columns=None):
+    # columns=None loads everything; requested columns missing from the dataset are skipped
+    with stage(f"dataset_load.{name}"):
+        if columns is not None:
+            available = set(columns_of(name))
+            columns = [col for col in dict.fromkeys(columns) if col in available]
+
+        if not is_fresh(name):
+            count("dataset_load.csv")
+            return pd.read_csv(DATASETS[name], usecols=columns, low_memory=False)
+
+        count("dataset_load.arrow")
+        table = _mapped_table(name)
+        if columns is not None:
+            table = table.select(columns)
+        # split_blocks keeps numeric columns without nulls as zero-copy views of the mapped file
+        return table.to_pandas(split_blocks=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert the CSV datasets to memory-mappable Arrow files")
+    parser.add_argument("names", nargs="*", help=f"datasets to convert (default: all of {', '.join(DATASETS)})")
+    parser.add_argument("--force", action="store_true", help="rewrite files that are already up to date")
+    args = parser.parse_args()
+
+    unknown = set(args.names) - set(DATASETS)
+    if unknown:
+        parser.error(f"unknown dataset(s): {', '.join(sorted(unknown))}")
+
+    for name in args.names or DATASETS:
+        if is_fresh(name) and not args.force:
+            print(f"{name}: up to date ({store_path(name)})")
+            continue
+        path = convert(name)
+        print(f"{name}: {DATASETS[name]} ({os.path.getsize(DATASETS[name]) / 2**20:.1f} MiB) -> "
+              f"{path} ({os.path.getsize(path) / 2**20:.1f} MiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from dataset_store import dataset_hash, load_dataset
+
+CACHE_DIR = os.path.join(".cache", "eda")
+TARGET = "emi_eligibility"
+
+# ------------------------
+# Columns charted on the EDA page
+# ------------------------
+SCENARIO_COLS = ['emi_scenario']
+
+FINANCIAL_VARS = [
+    'monthly_salary','dti','expense_ratio','savings_potential',
+    'affordability_ratio','credit_score','bank_balance','emergency_fund'
+]
+
+DEMOGRAPHIC_COLS = [
+    'gender','marital_status','education',
+    'employment_type','company_type',
+    'house_type','existing_loans'
+]
+
+RISK_FLAGS = [
+    'salary_missing',
+    'balance_missing',
+    'fund_missing'
+]
+
+SUMMARY_COLS = [
+    'monthly_salary','dti','expense_ratio',
+    'savings_potential','affordability_ratio',
+    'credit_score','bank_balance'
+]
+
+COUNT_COLS = SCENARIO_COLS + DEMOGRAPHIC_COLS + RISK_FLAGS
+EDA_COLUMNS = list(dict.fromkeys([TARGET] + COUNT_COLS + FINANCIAL_VARS + SUMMARY_COLS))
+
+_lock = threading.Lock()
+_memory = {}
+
+
+# ------------------------
+# Aggregation
+# ------------------------
+def _counts(df: pd.DataFrame, target_codes, target_labels):
+    # counts per category x eligibility, via one bincount per column
+    counts = {}
+    n_target = len(target_labels)
+    for col in COUNT_COLS:
+        if col not in df.columns:
+            continue
+        codes, labels = pd.factorize(df[col], sort=True)
+        valid = (codes >= 0) & (target_codes >= 0)
+        flat = np.bincount(codes[valid] * n_target + target_codes[valid],
+                           minlength=len(labels) * n_target)
+        counts[col] = pd.DataFrame(flat.reshape(len(labels), n_target),
+                                   index=pd.Index(labels, name=col), columns=target_labels)
+    return counts
+
+
+def _box_stats(df: pd.DataFrame, cols: list, target_codes, target_labels):
+    # Tukey box statistics per class, in the form matplotlib's Axes.bxp draws
+    stats = {}
+    for col in cols:
+        values = df[col].to_numpy(dtype=float)
+        col_stats = []
+        for code, label in enumerate(target_labels):
+            group = values[(target_codes == code) & ~np.isnan(values)]
+            if len(group) == 0:
+                continue
+            q1, med, q3 = np.percentile(group, [25, 50, 75])
+            iqr = q3 - q1
+            inside = group[(group >= q1 - 1.5 * iqr) & (group <= q3 + 1.5 * iqr)]
+            col_stats.append({
+                "label": label, "q1": q1, "med": med, "q3": q3,
+                "whislo": inside.min(), "whishi": inside.max(),
+                "mean": group.mean(), "n": len(group),
+            })
+        stats[col] = col_stats
+    return stats
+
+
+def compute_aggregates(df: pd.DataFrame):
+    target_codes, target_labels = pd.factorize(df[TARGET], sort=True)
+    target_labels = list(target_labels)
+
+    existing_financial = [col for col in FINANCIAL_VARS if col in df.columns]
+    existing_summary = [col for col in SUMMARY_COLS if col in df.columns]
+
+    return {
+        "rows": len(df),
+        "columns": list(df.columns),
+        "target_labels": target_labels,
+        "counts": _counts(df, target_codes, target_labels),
+        "corr": df[existing_financial].corr() if len(existing_financial) >= 2 else None,
+        "summary": df.groupby(TARGET, observed=True)[existing_summary].describe(),
+        "box_stats": _box_stats(df, existing_summary, target_codes, target_labels),
+    }
+
+
+# ------------------------
+# Cache (memory, then .cache/eda/<hash>.pkl)
+# ------------------------
+def get_aggregates(name: str = "final"):
+    key = dataset_hash(name)
+    if key in _memory:
+        return _memory[key]
+
+    with _lock:
+        if key in _memory:
+            return _memory[key]
+
+        path = os.path.join(CACHE_DIR, f"{name}-{key}.pkl")
+        if os.path.exists(path):
+            aggregates = pd.read_pickle(path)
+        else:
+            aggregates = compute_aggregates(load_dataset(name, columns=EDA_COLUMNS))
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            pd.to_pickle(aggregates, path + ".tmp")
+            os.replace(path + ".tmp", path)
+
+        _memory[key] = aggregates
+        return aggregates
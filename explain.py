@@ -0,0 +1,155 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+import model_registry
+from features import CATEGORICAL_MAP
+from instrumentation import stage
+from scoring import prepare_batch, prepare_single
+
+# Per-applicant explanations from XGBoost's built-in TreeSHAP (pred_contribs=True),
+# computed on the same model.ubj files the scoring path serves. Contributions are
+# additive in margin space: per row they sum to the raw model output (each class's
+# pre-softmax margin for the classifier, log-odds if it is binary; the EMI itself for
+# the regressor), so one-hot columns can be summed back into the categorical input
+# they came from.
+
+CACHE_DIR = os.path.join(".cache", "explain")
+DEFAULT_BATCH_SIZE = 10_000
+DEFAULT_TOP_K = 3
+BACKGROUND_ROWS = 2_000
+
+BOOSTERS = {
+    "classification": model_registry.CLASSIFIER_URI,
+    "regression": model_registry.REGRESSOR_URI,
+}
+
+_lock = threading.Lock()
+_importances = {}
+
+
+# ------------------------
+# Models
+# ------------------------
+def load_booster(model_dir: str):
+    import xgboost as xgb
+
+    booster = xgb.Booster()
+    booster.load_model(os.path.join(model_dir, "model.ubj"))
+    return booster
+
+
+def get_booster(kind: str):
+    return model_registry.load(f"{kind}_booster", BOOSTERS[kind], load_booster)
+
+
+def booster_version(kind: str):
+    get_booster(kind)
+    return model_registry.version([f"{kind}_booster"])
+
+
+# ------------------------
+# Contributions
+# ------------------------
+def contributions(booster, X: pd.DataFrame, batch_size: int = DEFAULT_BATCH_SIZE):
+    # (rows, features + 1) for one output, (rows, classes, features + 1) for multi-class;
+    # the last column is the bias (expected value)
+    import xgboost as xgb
+
+    parts = []
+    for start in range(0, len(X), batch_size):
+        chunk = X.iloc[start:start + batch_size].astype(np.float32)
+        with stage("explain.contributions"):
+            parts.append(booster.predict(xgb.DMatrix(chunk), pred_contribs=True))
+    return np.concatenate(parts)
+
+
+def input_groups(features: list):
+    # (input names, features x inputs 0/1 matrix): one-hot columns map to their categorical input
+    inputs = []
+    for feature in features:
+        group = feature
+        for col, values in CATEGORICAL_MAP.items():
+            if feature.startswith(col + "_") and feature[len(col) + 1:] in values:
+                group = col
+                break
+        inputs.append(group)
+
+    names = list(dict.fromkeys(inputs))
+    matrix = np.zeros((len(features), len(names)))
+    matrix[np.arange(len(features)), [names.index(group) for group in inputs]] = 1
+    return names, matrix
+
+
+def reason_codes(grouped, names: list, k: int = DEFAULT_TOP_K):
+    # Per row: the k inputs with the largest absolute contribution, as (input, contribution)
+    top = np.argsort(-np.abs(grouped), axis=1, kind="stable")[:, :k]
+    return [[(names[j], float(grouped[i, j])) for j in row] for i, row in enumerate(top)]
+
+
+def explain_frame(X: pd.DataFrame, k: int = DEFAULT_TOP_K, batch_size: int = DEFAULT_BATCH_SIZE):
+    # X is model-ready (scaled, trained_features order), as from prepare_single/prepare_batch.
+    # Classifier reasons explain the predicted class: positive values pushed towards it.
+    names, groups = input_groups(list(X.columns))
+
+    clf = contributions(get_booster("classification"), X, batch_size)
+    if clf.ndim == 3:
+        predicted = clf.sum(axis=2).argmax(axis=1)
+        clf = clf[np.arange(len(clf)), predicted]
+    else:
+        # One margin for class 1: a class-0 prediction is explained by what pushed it down
+        predicted = (clf.sum(axis=1) > 0).astype(int)
+        clf = np.where(predicted[:, None] == 1, clf, -clf)
+    reg = contributions(get_booster("regression"), X, batch_size)
+
+    return {
+        "predicted_class": predicted,
+        "classification": reason_codes(clf[:, :-1] @ groups, names, k),
+        "regression": reason_codes(reg[:, :-1] @ groups, names, k),
+    }
+
+
+def explain_batch(df: pd.DataFrame, artifacts, k: int = DEFAULT_TOP_K, batch_size: int = DEFAULT_BATCH_SIZE):
+    return explain_frame(prepare_batch(df, artifacts), k, batch_size)
+
+
+def explain_one(user_input: dict, artifacts, k: int = DEFAULT_TOP_K):
+    # Reason codes for one applicant, through the same prepare_single path as score_one
+    result = explain_frame(prepare_single(user_input, artifacts), k)
+    return {
+        "eligibility": str(artifacts.label_encoder.inverse_transform(result["predicted_class"])[0]),
+        "classification": result["classification"][0],
+        "regression": result["regression"][0],
+    }
+
+
+# ------------------------
+# Global importances (cached per model version and background data)
+# ------------------------
+def global_importance(background: pd.DataFrame, data_version: str, batch_size: int = DEFAULT_BATCH_SIZE):
+    # Mean |SHAP| per input over the background rows (summed over classes for the classifier)
+    key = f"{booster_version('classification')}-{booster_version('regression')}-{data_version}"
+    if key in _importances:
+        return _importances[key]
+
+    path = os.path.join(CACHE_DIR, f"importance-{key}.pkl")
+    if os.path.exists(path):
+        importance = pd.read_pickle(path)
+    else:
+        names, groups = input_groups(list(background.columns))
+        columns = {}
+        for kind in BOOSTERS:
+            contribs = np.abs(contributions(get_booster(kind), background, batch_size))
+            if contribs.ndim == 3:
+                contribs = contribs.sum(axis=1)
+            columns[kind] = contribs[:, :-1].mean(axis=0) @ groups
+        importance = pd.DataFrame(columns, index=pd.Index(names, name="input"))
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        pd.to_pickle(importance, path + ".tmp")
+        os.replace(path + ".tmp", path)
+
+    with _lock:
+        _importances[key] = importance
+    return importance
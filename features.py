@@ -0,0 +1,239 @@
+import numpy as np
+import pandas as pd
+
+# Feature engineering, defined once for training (train_runner.encode) and serving (scoring,
+# explain, what_if). The formulas are the training cells of main.ipynb, which the models were
+# fitted on; serving used to keep its own copy, which had drifted (rent counted in
+# total_expenses, emi_gap = -current_emi).
+
+# Summed into total_expenses (rent is not part of it at training time)
+EXPENSE_COLS = [
+    "school_fees", "college_fees", "travel_expenses",
+    "groceries_utilities", "other_monthly_expenses"
+]
+
+# Columns scaled with input_scaler.pkl, in the order the scaler was fitted
+NUMERIC_COLS = [
+    'monthly_salary','monthly_rent','school_fees','college_fees','travel_expenses',
+    'groceries_utilities','other_monthly_expenses','current_emi_amount','credit_score',
+    'bank_balance','emergency_fund','requested_amount','requested_tenure','savings_potential',
+    'dti','total_expenses','expense_ratio','affordability_ratio','salary_credit_interaction',
+    'emi_gap','balance_emi_gap'
+]
+
+# One-hot columns kept after get_dummies(drop_first=True) at training time
+CATEGORICAL_MAP = {
+    "gender": ["Male"],
+    "marital_status": ["Single"],
+    "education": ["High School", "Post Graduate", "Professional"],
+    "employment_type": ["Private", "Self-employed"],
+    "company_type": ["MNC", "Mid-size", "Small", "Startup"],
+    "house_type": ["Own", "Rented"],
+    "existing_loans": ["Yes"],
+    "emi_scenario": ["Education EMI", "Home Appliances EMI", "Personal Loan EMI", "Vehicle EMI"]
+}
+CAT_COLS = list(CATEGORICAL_MAP)
+
+# The drop_first category of each column (encoded as all one-hots zero)
+BASELINE_CATEGORIES = {
+    "gender": "Female",
+    "marital_status": "Married",
+    "education": "Graduate",
+    "employment_type": "Government",
+    "company_type": "Large Indian",
+    "house_type": "Family",
+    "existing_loans": "No",
+    "emi_scenario": "E-commerce Shopping EMI",
+}
+
+ONE_HOT_COLS = [f"{col}_{value}" for col, values in CATEGORICAL_MAP.items() for value in values]
+
+# flag -> input it flags when zero
+MISSING_FLAGS = {"salary_missing": "monthly_salary", "balance_missing": "bank_balance", "fund_missing": "emergency_fund"}
+
+
+# ------------------------
+# Definitions
+# ------------------------
+def derive(get, n: int = None):
+    # Engineered columns from the raw inputs. get(name, default) returns a scalar (one applicant,
+    # n=None) or an array of n values. Ratios divide by max(x, 1): the same as training on the
+    # training data (no zero salaries or amounts) and finite for the form's zero defaults.
+    salary = get("monthly_salary", 0)
+    current_emi = get("current_emi_amount", 0)
+    bank_balance = get("bank_balance", 0)
+    emergency_fund = get("emergency_fund", 0)
+
+    total_expenses = get(EXPENSE_COLS[0], 0)
+    for col in EXPENSE_COLS[1:]:
+        total_expenses = total_expenses + get(col, 0)
+
+    derived = {
+        "total_expenses": total_expenses,
+        "savings_potential": salary - total_expenses,
+        "dti": current_emi / np.maximum(salary, 1),
+        "expense_ratio": total_expenses / np.maximum(salary, 1),
+        "affordability_ratio": (bank_balance + emergency_fund) / np.maximum(get("requested_amount", 0), 1),
+        "salary_credit_interaction": salary * get("credit_score", 0),
+        "emi_gap": 0 if n is None else np.zeros(n, dtype=np.int64),
+        "balance_emi_gap": bank_balance - current_emi,
+    }
+    for flag, col in MISSING_FLAGS.items():
+        derived[flag] = (get(col, 0) == 0) * 1
+    return derived
+
+
+# NUMERIC_COLS the applicant provides (the rest are computed by derive)
+RAW_NUMERIC_COLS = [col for col in NUMERIC_COLS if col not in derive(lambda name, default: 0)]
+
+
+def one_hot(get):
+    # drop_first one-hots; an unknown or missing category is the all-zeros baseline
+    return {
+        f"{col}_{value}": (get(col, "") == value) * 1
+        for col, values in CATEGORICAL_MAP.items()
+        for value in values
+    }
+
+
+def engineer_features(df: pd.DataFrame):
+    # Training: raw dataset -> dataset plus engineered columns (encoding and scaling follow)
+    df = df.copy()
+    for name, values in derive(lambda col, default: df[col].to_numpy(), len(df)).items():
+        df[name] = values
+    return df
+
+
+def validate(trained_features: list, scaler=None):
+    # The feature list (and scaler) must match the definitions above, so a model trained on
+    # something else fails at load instead of scoring on misaligned columns
+    problems = []
+    names = set(trained_features)
+    if len(names) != len(trained_features):
+        problems.append("duplicate feature names")
+    missing = [col for col in NUMERIC_COLS + ONE_HOT_COLS if col not in names]
+    if missing:
+        problems.append(f"missing {missing}")
+    unknown = [name for name in trained_features
+               if name not in ONE_HOT_COLS and any(name.startswith(f"{col}_") for col in CAT_COLS)]
+    if unknown:
+        problems.append(f"one-hot columns not in CATEGORICAL_MAP {unknown}")
+    raw = [col for col in CAT_COLS if col in names]
+    if raw:
+        problems.append(f"unencoded categorical columns {raw}")
+    fitted = getattr(scaler, "feature_names_in_", None)
+    if fitted is not None and list(fitted) != NUMERIC_COLS:
+        problems.append(f"scaler fitted on {list(fitted)}, expected NUMERIC_COLS")
+    if problems:
+        raise ValueError(f"trained features do not match features.py: {'; '.join(problems)}")
+    return trained_features
+
+
+# ------------------------
+# Serving transform
+# ------------------------
+def _affine(scaler):
+    # StandardScaler as (x - mean) / scale over NUMERIC_COLS; None for any other scaler
+    if not (hasattr(scaler, "with_mean") and hasattr(scaler, "with_std")):
+        return None
+    n = len(NUMERIC_COLS)
+    mean = np.asarray(scaler.mean_, dtype=np.float64) if scaler.with_mean else np.zeros(n)
+    scale = np.asarray(scaler.scale_, dtype=np.float64) if scaler.with_std else np.ones(n)
+    return mean, scale
+
+
+class FeatureTransform:
+    # Raw applicant rows -> float32 matrix in trained_features order, NUMERIC_COLS scaled.
+    # Column positions and the scaler's mean/scale are resolved once, so a transform writes
+    # each input straight into its cell: no per-row dict copy, DataFrame or reindex. Scaling
+    # is done in float64 (as the scaler does) and then stored as float32, which is what the
+    # tree models convert their input to anyway.
+    def __init__(self, trained_features: list, scaler):
+        self.trained_features = validate(trained_features, scaler)
+        self.scaler = scaler
+        self.position = {name: i for i, name in enumerate(trained_features)}
+
+        self._numeric = np.array([self.position[col] for col in NUMERIC_COLS])
+        self._affine = _affine(scaler)
+        self._flags = [(flag, self.position[flag]) for flag in MISSING_FLAGS if flag in self.position]
+        self._one_hot = {
+            col: [(value, self.position[f"{col}_{value}"]) for value in values]
+            for col, values in CATEGORICAL_MAP.items()
+        }
+        # Trained columns used as given (e.g. age, family_size); 0 when an input lacks them
+        computed = set(NUMERIC_COLS) | set(ONE_HOT_COLS) | set(MISSING_FLAGS)
+        self._passthrough = [(name, i) for i, name in enumerate(trained_features) if name not in computed]
+        # Every column an applicant row is read from
+        self.inputs = RAW_NUMERIC_COLS + CAT_COLS + [name for name, _ in self._passthrough]
+
+    def scale_column(self, column: str, values):
+        # Scaled values of one NUMERIC_COLS column
+        j = NUMERIC_COLS.index(column)
+        values = np.asarray(values, dtype=np.float64)
+        if self._affine is None:
+            block = np.zeros((len(values), len(NUMERIC_COLS)))
+            block[:, j] = values
+            return np.asarray(self.scaler.transform(pd.DataFrame(block, columns=NUMERIC_COLS)))[:, j]
+        mean, scale = self._affine
+        return (values - mean[j]) / scale[j]
+
+    def _fill(self, get, n: int, out):
+        # get(name, default) returns arrays of n values, or scalars when n is None (one row)
+        rows = 1 if n is None else n
+        if out is None:
+            out = np.empty((rows, len(self.trained_features)), dtype=np.float32)
+        derived = derive(get, n)
+
+        numeric = np.empty((rows, len(NUMERIC_COLS)), dtype=np.float64)
+        for j, col in enumerate(NUMERIC_COLS):
+            numeric[:, j] = derived[col] if col in derived else get(col, 0)
+        if self._affine is None:
+            numeric = np.asarray(self.scaler.transform(pd.DataFrame(numeric, columns=NUMERIC_COLS)))
+        else:
+            numeric -= self._affine[0]
+            numeric /= self._affine[1]
+        out[:, self._numeric] = numeric
+
+        for flag, i in self._flags:
+            out[:, i] = derived[flag]
+        for col, positions in self._one_hot.items():
+            values = get(col, "")
+            for value, i in positions:
+                out[:, i] = values == value
+        for name, i in self._passthrough:
+            out[:, i] = get(name, 0)
+        return out
+
+    def matrix(self, df: pd.DataFrame, out: np.ndarray = None):
+        # `out`, if given, is a float32 array of shape (len(df), len(trained_features)) to reuse
+        def get(name, default):
+            if name in df.columns:
+                return df[name].to_numpy()
+            return np.full(len(df), default)
+
+        return self._fill(get, len(df), out)
+
+    def matrix_one(self, user_input: dict, out: np.ndarray = None):
+        # One applicant, read straight from the dict (scalars, no per-column arrays)
+        return self._fill(user_input.get, None, out)
+
+    def frame(self, df: pd.DataFrame):
+        # The matrix as a DataFrame (no copy), for models that look features up by name
+        return pd.DataFrame(self.matrix(df), index=df.index, columns=self.trained_features, copy=False)
+
+    def frame_one(self, user_input: dict):
+        return pd.DataFrame(self.matrix_one(user_input), columns=self.trained_features, copy=False)
+
+
+_transform = None
+
+
+def transform_for(artifacts):
+    # The FeatureTransform for these artifacts, rebuilt only when the feature list or scaler
+    # object changes (model_registry hands out the same objects until a file changes on disk)
+    global _transform
+    transform = _transform
+    if (transform is None or transform.trained_features is not artifacts.trained_features
+            or transform.scaler is not artifacts.scaler):
+        transform = _transform = FeatureTransform(artifacts.trained_features, artifacts.scaler)
+    return transform
@@ -0,0 +1,210 @@
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+
+import pandas as pd
+
+from instrumentation import count, stage
+
+# Rendered dashboard charts. A chart is drawn once per spec and data version into PNG (or SVG)
+# bytes, which every later rerun and session shows as an image: repeat page views draw nothing.
+# Figures are built with matplotlib.figure.Figure, not pyplot, so they never enter pyplot's
+# figure registry (the old plt.subplots() figures were never closed) and are cleared as soon as
+# they are saved. Misses render in a thread pool while the page shows the hits, and each chart
+# replaces its placeholder as it finishes. One cache per process, bounded in bytes (LRU).
+#
+#   EMI_FIGURE_CACHE_MB=64        memory bound (0 disables caching)
+#   EMI_FIGURE_FORMAT=png         png or svg
+#   EMI_FIGURE_WORKERS=4          render threads
+
+MAX_BYTES = int(float(os.environ.get("EMI_FIGURE_CACHE_MB", 64)) * 1024 * 1024)
+FORMAT = os.environ.get("EMI_FIGURE_FORMAT", "png")
+WORKERS = int(os.environ.get("EMI_FIGURE_WORKERS", min(4, os.cpu_count() or 1)))
+# st.pyplot's resolution, capped at the width st.image downscales to (2 x 730 px): an image
+# within it is served as stored, a wider one is decoded, resized and re-encoded on every rerun
+DPI = 200
+MAX_WIDTH = 1460
+
+
+@dataclass
+class Chart:
+    # key: chart spec plus the version of the data it is drawn from, e.g.
+    # ("eda.counts", "gender", dataset_hash("final")); draw(ax) draws on a fresh axes
+    key: tuple
+    draw: object
+    figsize: tuple = None
+
+
+def frame_version(df: pd.DataFrame):
+    # Version key for charts drawn from a small in-memory frame (e.g. run metrics)
+    digest = hashlib.blake2b(repr(list(df.columns)).encode(), digest_size=16)
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+# ------------------------
+# Rendering
+# ------------------------
+def render(chart: Chart, fmt: str = FORMAT):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    with stage("figure_cache.render"):
+        fig = Figure(figsize=chart.figsize)
+        try:
+            chart.draw(fig.subplots())
+            # Width of the tight bounding box (plus savefig's 0.1 in padding on each side)
+            width = fig.get_tightbbox(FigureCanvasAgg(fig).get_renderer()).width + 0.2
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format=fmt, dpi=min(DPI, (MAX_WIDTH - 1) / width), bbox_inches="tight")
+        finally:
+            fig.clear()
+    return buffer.getvalue()
+
+
+# ------------------------
+# Cache
+# ------------------------
+class FigureCache:
+    def __init__(self, max_bytes: int = MAX_BYTES, workers: int = WORKERS, fmt: str = FORMAT):
+        self.max_bytes = max_bytes
+        self.fmt = fmt
+        self._workers = workers
+        self._pool = None
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> bytes, least recently used first
+        self._pending = {}              # key -> Future, so concurrent sessions render once
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: tuple):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+                count("figure_cache.miss")
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            count("figure_cache.hit")
+            return data
+
+    def put(self, key: tuple, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= len(old)
+            self._entries[key] = data
+            self.bytes += len(data)
+            while self.bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= len(evicted)
+                self.evictions += 1
+
+    def _render(self, chart: Chart):
+        try:
+            data = render(chart, self.fmt)
+            self.put(chart.key, data)
+            return data
+        finally:
+            with self._lock:
+                self._pending.pop(chart.key, None)
+
+    def submit(self, chart: Chart):
+        # Future of the chart's bytes: already done on a hit, shared with any render in flight
+        data = self.get(chart.key)
+        if data is not None:
+            future = Future()
+            future.set_result(data)
+            return future
+        with self._lock:
+            future = self._pending.get(chart.key)
+            if future is None and chart.key in self._entries:
+                # Rendered by another session since the lookup above
+                future = Future()
+                future.set_result(self._entries[chart.key])
+            elif future is None:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="emi-figure")
+                future = self._pending[chart.key] = self._pool.submit(self._render, chart)
+            return future
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self.bytes, "max_bytes": self.max_bytes,
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_cache():
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = FigureCache()
+        return _default
+
+
+# ------------------------
+# Streamlit
+# ------------------------
+def _image(target, data: bytes, fmt: str):
+    target.image(data.decode("utf-8") if fmt == "svg" else data, width="stretch")
+
+
+class ChartStream:
+    # add() reserves the chart's place on the page (cached charts are shown at once) and
+    # finish() fills the rest in as their renders complete:
+    #   charts = ChartStream()
+    #   st.subheader(...); charts.add(Chart(...))
+    #   ...
+    #   charts.finish()
+    def __init__(self, cache: FigureCache = None):
+        self.cache = cache or default_cache()
+        self._waiting = []   # (future, placeholder)
+
+    def add(self, chart: Chart):
+        import streamlit as st
+
+        placeholder = st.empty()
+        future = self.cache.submit(chart)
+        if future.done():
+            self._fill(future, placeholder)
+        else:
+            self._waiting.append((future, placeholder))
+
+    def _fill(self, future, placeholder):
+        try:
+            _image(placeholder, future.result(), self.cache.fmt)
+        except Exception as e:
+            placeholder.error(f"Chart failed: {e}")
+
+    def finish(self):
+        placeholders = {}
+        for future, placeholder in self._waiting:
+            placeholders.setdefault(future, []).append(placeholder)
+        self._waiting = []
+        for future in as_completed(placeholders):
+            for placeholder in placeholders[future]:
+                self._fill(future, placeholder)
+
+
+def show(chart: Chart, cache: FigureCache = None):
+    stream = ChartStream(cache)
+    stream.add(chart)
+    stream.finish()
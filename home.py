@@ -1,8 +1,12 @@
 import streamlit as st
+import warmup
 
 # Page config
 st.set_page_config(page_title="EMI Prediction App", page_icon="💸", layout="centered")
 
+# Start loading models and data for the other pages in the background
+warmup.start()
+
 # Title and intro
 st.title("💸 EMI Prediction & Risk Assessment")
 st.markdown("""
@@ -33,7 +37,7 @@ with col1:
         st.switch_page("pages/model_training.py")
 
     if st.button("🔮 Real-Time Prediction"):
-        st.switch_page("pages/prediction_emi.py")
+        st.switch_page("pages/predict_emi.py")
 
     if st.button("📘 MLflow Tracking"):
         st.switch_page("pages/model_explain.py")
@@ -41,6 +45,12 @@ with col1:
 # Optional image or logo
 # st.image("logo.png", width=200)
 
+with st.expander("Startup warm-up"):
+    state = warmup.status()
+    st.write("Running" if state["running"] else "Finished" if state["steps"] else "Not started")
+    for step, result in state["steps"].items():
+        st.write(f"- {step}: {result['seconds']:.2f} s" + (f" (failed: {result['error']})" if result["error"] else ""))
+
 # Footer
 st.markdown("---")
 st.caption("Built with ❤️ by Tasneem | Powered by MLflow + Streamlit")
\ No newline at end of file
@@ -0,0 +1,306 @@
+import argparse
+import atexit
+import bisect
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# Stage timings and counters for the prediction flow, the dataset loads and the model loads.
+# Off by default: stage() then returns a shared no-op object, so an instrumented call costs one
+# function call and a flag check. Turn it on with EMI_INSTRUMENTATION=1 (or enable()).
+# Timings go into fixed-bucket histograms exported as Prometheus text or a JSON dump.
+#
+#   EMI_INSTRUMENTATION=1            record stage timings and counters
+#   EMI_INSTRUMENTATION_DUMP=path    write the JSON dump at exit
+#   EMI_PROFILE_INTERVAL_MS=5        also run the sampling profiler (folded stacks in the dump)
+
+ENABLED = os.environ.get("EMI_INSTRUMENTATION", "").lower() in ("1", "true", "yes")
+DUMP_PATH = os.environ.get("EMI_INSTRUMENTATION_DUMP")
+PROFILE_INTERVAL_MS = float(os.environ.get("EMI_PROFILE_INTERVAL_MS", 0))
+DEFAULT_DUMP_PATH = os.path.join(".cache", "instrumentation.json")
+
+# Upper bounds in seconds, Prometheus-style (cumulative on export, +Inf implied)
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_lock = threading.Lock()
+_histograms = {}   # stage -> Histogram
+_counters = Counter()
+
+
+# ------------------------
+# Histograms
+# ------------------------
+class Histogram:
+    __slots__ = ("counts", "sum", "count", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q: float):
+        # Linear interpolation inside the bucket holding the q-th observation, as Prometheus'
+        # histogram_quantile does; never above the largest observation
+        if self.count == 0:
+            return 0.0
+        rank, seen, lower = q * self.count, 0, 0.0
+        for bound, count in zip(BUCKETS, self.counts):
+            if count and seen + count >= rank:
+                return min(lower + (bound - lower) * (rank - seen) / count, self.max)
+            seen, lower = seen + count, bound
+        return self.max
+
+
+def observe(stage_name: str, seconds: float):
+    with _lock:
+        histogram = _histograms.get(stage_name)
+        if histogram is None:
+            histogram = _histograms[stage_name] = Histogram()
+        histogram.observe(seconds)
+
+
+def count(name: str, value: int = 1):
+    if ENABLED:
+        with _lock:
+            _counters[name] += value
+
+
+# ------------------------
+# Timers
+# ------------------------
+class _Timer:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NoOp:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoOp()
+
+
+def stage(name: str):
+    # with stage("scaler_transform"): ...
+    return _Timer(name) if ENABLED else _NOOP
+
+
+def timed(name: str):
+    # Decorator form of stage(); the flag is checked on every call, so enable() applies at once
+    def decorate(fn):
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            with _Timer(name):
+                return fn(*args, **kwargs)
+        wrapper.__name__, wrapper.__doc__, wrapper.__wrapped__ = fn.__name__, fn.__doc__, fn
+        return wrapper
+    return decorate
+
+
+def enable():
+    global ENABLED
+    ENABLED = True
+
+
+def disable():
+    global ENABLED
+    ENABLED = False
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+# ------------------------
+# Sampling profiler hook
+# ------------------------
+class SamplingProfiler:
+    # Samples every thread's Python stack each `interval` seconds from a daemon thread and
+    # counts folded stacks ("a;b;c" -> samples), the input format of flamegraph.pl/speedscope
+    def __init__(self, interval: float = 0.005, max_depth: int = 64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                names = []
+                while frame is not None and len(names) < self.max_depth:
+                    code = frame.f_code
+                    names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(names))] += 1
+            self.samples += 1
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._sample, name="sampling-profiler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        return self
+
+    def folded(self, top: int = None):
+        return "\n".join(f"{stack} {n}" for stack, n in self.stacks.most_common(top))
+
+
+profiler = None
+
+
+def start_profiler(interval_ms: float = 5.0):
+    global profiler
+    if profiler is None:
+        profiler = SamplingProfiler(interval_ms / 1000.0)
+    return profiler.start()
+
+
+def stop_profiler():
+    return profiler.stop() if profiler is not None else None
+
+
+# ------------------------
+# Export
+# ------------------------
+def _copy():
+    with _lock:
+        histograms = {}
+        for name, h in _histograms.items():
+            copy = Histogram()
+            copy.counts, copy.sum, copy.count, copy.max = list(h.counts), h.sum, h.count, h.max
+            histograms[name] = copy
+        return histograms, dict(_counters)
+
+
+def _label(value: str):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text(prefix: str = "emi"):
+    histograms, counters = _copy()
+    lines = [f"# HELP {prefix}_stage_seconds Time spent in each instrumented stage.",
+             f"# TYPE {prefix}_stage_seconds histogram"]
+    for name in sorted(histograms):
+        h, cumulative = histograms[name], 0
+        for bound, n in zip(BUCKETS, h.counts):
+            cumulative += n
+            lines.append(f'{prefix}_stage_seconds_bucket{{stage="{_label(name)}",le="{bound:g}"}} {cumulative}')
+        lines.append(f'{prefix}_stage_seconds_bucket{{stage="{_label(name)}",le="+Inf"}} {h.count}')
+        lines.append(f'{prefix}_stage_seconds_sum{{stage="{_label(name)}"}} {h.sum:.9g}')
+        lines.append(f'{prefix}_stage_seconds_count{{stage="{_label(name)}"}} {h.count}')
+
+    lines += [f"# HELP {prefix}_events_total Instrumented event counts.",
+              f"# TYPE {prefix}_events_total counter"]
+    for name in sorted(counters):
+        lines.append(f'{prefix}_events_total{{event="{_label(name)}"}} {counters[name]}')
+    return "\n".join(lines) + "\n"
+
+
+def snapshot():
+    # JSON-serializable view: per stage count, total/mean/max and bucket-bound p50/p90/p99 (ms)
+    histograms, counters = _copy()
+    stages = {
+        name: {
+            "count": h.count,
+            "total_ms": h.sum * 1000,
+            "mean_ms": h.sum / h.count * 1000 if h.count else 0.0,
+            "p50_ms": h.quantile(0.50) * 1000,
+            "p90_ms": h.quantile(0.90) * 1000,
+            "p99_ms": h.quantile(0.99) * 1000,
+            "max_ms": h.max * 1000,
+            "buckets": dict(zip([*map(str, BUCKETS), "+Inf"], h.counts)),
+        }
+        for name, h in sorted(histograms.items())
+    }
+    result = {"taken_at": time.time(), "enabled": ENABLED, "stages": stages, "counters": counters}
+    if profiler is not None:
+        result["profile"] = {"interval_ms": profiler.interval * 1000, "samples": profiler.samples,
+                             "folded": dict(profiler.stacks.most_common(200))}
+    return result
+
+
+def dump_json(path: str = None):
+    path = path or DUMP_PATH or DEFAULT_DUMP_PATH
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path + ".tmp", "w") as f:
+        json.dump(snapshot(), f, indent=2)
+    os.replace(path + ".tmp", path)
+    return path
+
+
+def stage_table():
+    # Stage breakdown as a DataFrame, slowest total first (for the dashboard expander)
+    import pandas as pd
+
+    rows = [{"stage": name, **{k: v for k, v in stats.items() if k != "buckets"}}
+            for name, stats in snapshot()["stages"].items()]
+    if not rows:
+        return pd.DataFrame(columns=["stage", "count", "total_ms", "mean_ms", "p50_ms", "p90_ms", "p99_ms", "max_ms"])
+    return pd.DataFrame(rows).sort_values("total_ms", ascending=False).reset_index(drop=True)
+
+
+if ENABLED and PROFILE_INTERVAL_MS > 0:
+    start_profiler(PROFILE_INTERVAL_MS)
+if ENABLED and DUMP_PATH:
+    atexit.register(dump_json)
+
+
+def main():
+    # Print a saved dump as a stage table, or convert it to Prometheus text
+    parser = argparse.ArgumentParser(description="Show an instrumentation dump")
+    parser.add_argument("path", nargs="?", default=DEFAULT_DUMP_PATH)
+    args = parser.parse_args()
+
+    with open(args.path) as f:
+        data = json.load(f)
+    print(f"{'stage':40s} {'count':>8s} {'mean ms':>9s} {'p50 ms':>9s} {'p99 ms':>9s} {'total ms':>10s}")
+    for name, s in sorted(data["stages"].items(), key=lambda item: -item[1]["total_ms"]):
+        print(f"{name:40s} {s['count']:8d} {s['mean_ms']:9.3f} {s['p50_ms']:9.3f} {s['p99_ms']:9.3f} {s['total_ms']:10.1f}")
+    for name, value in sorted(data["counters"].items()):
+        print(f"{name:40s} {value:8d}")
+
+
+if __name__ == "__main__":
+    main()
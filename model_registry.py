@@ -0,0 +1,162 @@
+import hashlib
+import os
+import threading
+import time
+
+import pandas as pd
+
+import features
+from instrumentation import count, stage
+from scoring import ScoringArtifacts
+
+# ------------------------
+# Artifact locations
+# ------------------------
+TRAINED_FEATURES_PATH = "trained_features.csv"
+SCALER_PATH = "input_scaler.pkl"
+LABEL_ENCODER_PATH = "label_encoder.pkl"
+CLASSIFIER_URI = "mlartifacts/924749176205125717/models/m-eca40b7e777b4d6e90c8b932547a17d6/artifacts"
+REGRESSOR_URI = "mlartifacts/779327931942531374/models/m-55b8bd1e138141f18d7b10d87989c3b3/artifacts"
+
+# "pyfunc" serves the MLflow models; "native" serves the arrays written by native_predictor.py
+MODEL_BACKEND = os.environ.get("EMI_MODEL_BACKEND", "pyfunc")
+
+# Seconds between on-disk change checks; reruns inside this window reuse the cached objects
+CHECK_INTERVAL = 1.0
+
+
+# Loaders import joblib / mlflow on first use: importing mlflow.pyfunc takes longer than
+# everything else a page needs, and pages that never score should not pay for it
+def load_joblib(path: str):
+    import joblib
+    return joblib.load(path)
+
+
+def load_pyfunc(path: str):
+    import mlflow.pyfunc
+    return mlflow.pyfunc.load_model(path)
+
+
+def load_trained_features(path: str):
+    # Checked against features.py on every (re)load, before any request scores with it
+    return features.validate(pd.read_csv(path)["feature"].tolist())
+
+
+# name -> (path on disk, loader)
+ARTIFACTS = {
+    "trained_features": (TRAINED_FEATURES_PATH, load_trained_features),
+    "scaler": (SCALER_PATH, load_joblib),
+    "label_encoder": (LABEL_ENCODER_PATH, load_joblib),
+    "classification_model": (CLASSIFIER_URI, load_pyfunc),
+    "regression_model": (REGRESSOR_URI, load_pyfunc),
+}
+
+if MODEL_BACKEND == "native":
+    from native_predictor import COMPILED_CLASSIFIER_PATH, COMPILED_REGRESSOR_PATH, NativePredictor
+
+    ARTIFACTS["classification_model"] = (COMPILED_CLASSIFIER_PATH, NativePredictor.load)
+    ARTIFACTS["regression_model"] = (COMPILED_REGRESSOR_PATH, NativePredictor.load)
+
+# Shared by every page, session and thread in this process (module state survives Streamlit reruns)
+_lock = threading.Lock()
+_entries = {}
+
+
+def _fingerprint(path: str):
+    # (relative path, mtime_ns, size) for a file, or for every file under a model directory
+    if os.path.isfile(path):
+        paths = [path]
+    else:
+        paths = sorted(
+            os.path.join(root, fname)
+            for root, _, files in os.walk(path)
+            for fname in files
+        )
+    fingerprint = []
+    for p in paths:
+        stat = os.stat(p)
+        fingerprint.append((os.path.relpath(p, path), stat.st_mtime_ns, stat.st_size))
+    return tuple(fingerprint)
+
+
+def get(name: str):
+    path, loader = ARTIFACTS[name]
+    return load(name, path, loader)
+
+
+def load(name: str, path: str, loader):
+    # Cached load of any file or model directory under `name` (get() covers the fixed ARTIFACTS)
+    entry = _entries.get(name)
+    now = time.monotonic()
+
+    if entry is not None and now - entry["checked_at"] < CHECK_INTERVAL:
+        count("model_load.cache_hit")
+        return entry["value"]
+
+    with stage("model_load.fingerprint"):
+        fingerprint = _fingerprint(path)
+    if entry is not None and entry["fingerprint"] == fingerprint:
+        entry["checked_at"] = now
+        count("model_load.cache_hit")
+        return entry["value"]
+
+    with _lock:
+        # Another thread may have finished the reload while we waited
+        entry = _entries.get(name)
+        if entry is not None and entry["fingerprint"] == fingerprint:
+            return entry["value"]
+
+        start = time.perf_counter()
+        with stage(f"model_load.{name}"):
+            value = loader(path)
+        seconds = time.perf_counter() - start
+        count("model_load.reload" if entry is not None else "model_load.load")
+
+        _entries[name] = {
+            "value": value,
+            "fingerprint": fingerprint,
+            "checked_at": time.monotonic(),
+            "loaded_at": time.time(),
+            "load_seconds": seconds,
+            "loads": (entry["loads"] + 1) if entry is not None else 1,
+        }
+        return value
+
+
+def get_artifacts():
+    return ScoringArtifacts(**{name: get(name) for name in ARTIFACTS})
+
+
+def version(names=None):
+    # Stable across processes; changes whenever one of the artifacts changes on disk.
+    # Names outside ARTIFACTS must have been loaded with load() first.
+    names = sorted(names or ARTIFACTS)
+    for name in names:
+        if name in ARTIFACTS:
+            get(name)
+    fingerprints = repr([(name, _entries[name]["fingerprint"]) for name in names])
+    return hashlib.sha1(fingerprints.encode()).hexdigest()[:12]
+
+
+def artifacts_version(artifacts):
+    # version() of exactly these ScoringArtifacts objects, or None when one of them has been
+    # reloaded since they were fetched (results from them then belong to no current version)
+    fingerprints = []
+    for name in sorted(ARTIFACTS):
+        entry = _entries.get(name)
+        if entry is None or entry["value"] is not getattr(artifacts, name):
+            return None
+        fingerprints.append((name, entry["fingerprint"]))
+    return hashlib.sha1(repr(fingerprints).encode()).hexdigest()[:12]
+
+
+def load_report():
+    return pd.DataFrame([
+        {
+            "artifact": name,
+            "load_seconds": entry["load_seconds"],
+            "loads": entry["loads"],
+            "loaded_at": pd.Timestamp(entry["loaded_at"], unit="s"),
+        }
+        for name, entry in _entries.items()
+    ])
@@ -0,0 +1,205 @@
+import argparse
+import json
+import os
+
+import numpy as np
+
+# Only NumPy is needed at prediction time; xgboost is imported by the export step alone.
+
+COMPILED_DIR = "compiled_models"
+COMPILED_CLASSIFIER_PATH = os.path.join(COMPILED_DIR, "classifier.npz")
+COMPILED_REGRESSOR_PATH = os.path.join(COMPILED_DIR, "regressor.npz")
+
+# Objectives whose margin is the prediction itself / is turned into a class by argmax
+IDENTITY_OBJECTIVES = {"reg:squarederror", "reg:linear", "reg:absoluteerror", "reg:pseudohubererror"}
+ARGMAX_OBJECTIVES = {"multi:softprob", "multi:softmax"}
+
+ROW_BLOCK = 8192
+
+
+# ------------------------
+# Array-backed tree ensemble
+# ------------------------
+class NativePredictor:
+    def __init__(self, left, right, feature, threshold, default_left, value, roots, tree_group,
+                 base_margin, feature_names, objective, max_depth):
+        self.left = left
+        self.right = right
+        self.feature = feature
+        self.threshold = threshold
+        self.default_left = default_left
+        self.value = value
+        self.roots = roots
+        self.tree_group = tree_group
+        self.base_margin = base_margin
+        self.feature_names = list(feature_names)
+        self.objective = objective
+        self.max_depth = int(max_depth)
+        self.num_groups = len(base_margin)
+
+    @classmethod
+    def load(cls, path: str):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                data["left"], data["right"], data["feature"], data["threshold"],
+                data["default_left"], data["value"], data["roots"], data["tree_group"],
+                data["base_margin"], data["feature_names"].tolist(),
+                str(data["objective"]), int(data["max_depth"]),
+            )
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez(
+            path,
+            left=self.left, right=self.right, feature=self.feature, threshold=self.threshold,
+            default_left=self.default_left, value=self.value, roots=self.roots,
+            tree_group=self.tree_group, base_margin=self.base_margin,
+            feature_names=np.array(self.feature_names), objective=np.array(self.objective),
+            max_depth=np.array(self.max_depth),
+        )
+
+    def _as_matrix(self, X):
+        if hasattr(X, "columns"):
+            X = (X[self.feature_names] if self.feature_names else X).to_numpy(dtype=np.float32)
+        return np.ascontiguousarray(X, dtype=np.float32)
+
+    def _leaf_values(self, X):
+        n = X.shape[0]
+        rows = np.arange(n)[:, None]
+        node = np.broadcast_to(self.roots, (n, len(self.roots))).copy()
+
+        # One step down every (row, tree) path per level; leaves point at themselves
+        for _ in range(self.max_depth):
+            fvalue = X[rows, self.feature[node]]
+            go_left = np.where(np.isnan(fvalue), self.default_left[node], fvalue < self.threshold[node])
+            node = np.where(go_left, self.left[node], self.right[node])
+
+        return self.value[node]
+
+    def predict_margin(self, X):
+        X = self._as_matrix(X)
+        margin = np.empty((X.shape[0], self.num_groups), dtype=np.float32)
+
+        for start in range(0, X.shape[0], ROW_BLOCK):
+            leaves = self._leaf_values(X[start:start + ROW_BLOCK])
+            block = np.repeat(self.base_margin[None, :], leaves.shape[0], axis=0)
+            # Accumulate tree by tree in float32, the same order XGBoost uses
+            for t, group in enumerate(self.tree_group):
+                block[:, group] += leaves[:, t]
+            margin[start:start + ROW_BLOCK] = block
+
+        return margin
+
+    def predict(self, X):
+        margin = self.predict_margin(X)
+        if self.objective in ARGMAX_OBJECTIVES:
+            return margin.argmax(axis=1)
+        return margin[:, 0]
+
+
+# ------------------------
+# Export from an XGBoost booster
+# ------------------------
+def _parse_base_score(raw):
+    raw = str(raw)
+    if raw.startswith("["):
+        return np.asarray(json.loads(raw), dtype=np.float32)
+    return np.asarray([float(raw)], dtype=np.float32)
+
+
+def from_booster(booster):
+    model = json.loads(booster.save_raw(raw_format="json"))["learner"]
+    objective = model["objective"]["name"]
+    if objective not in IDENTITY_OBJECTIVES | ARGMAX_OBJECTIVES:
+        raise ValueError(f"Unsupported objective for native export: {objective}")
+
+    gbm = model["gradient_booster"]
+    if gbm["name"] != "gbtree":
+        raise ValueError(f"Only gbtree boosters can be exported, got {gbm['name']}")
+
+    num_groups = max(int(model["learner_model_param"].get("num_class", 0)), 1)
+    base_margin = _parse_base_score(model["learner_model_param"]["base_score"])
+    if len(base_margin) == 1:
+        base_margin = np.repeat(base_margin, num_groups)
+
+    left, right, feature, threshold, default_left, value, roots = [], [], [], [], [], [], []
+    max_depth, offset = 0, 0
+    for tree in gbm["model"]["trees"]:
+        tree_left = np.asarray(tree["left_children"], dtype=np.int32)
+        tree_right = np.asarray(tree["right_children"], dtype=np.int32)
+        is_leaf = tree_left == -1
+        node_ids = np.arange(len(tree_left), dtype=np.int32)
+
+        # Leaves loop back to themselves so every path can be advanced a fixed number of steps
+        left.append(np.where(is_leaf, node_ids, tree_left) + offset)
+        right.append(np.where(is_leaf, node_ids, tree_right) + offset)
+        feature.append(np.where(is_leaf, 0, tree["split_indices"]).astype(np.int32))
+        conditions = np.asarray(tree["split_conditions"], dtype=np.float32)
+        threshold.append(conditions)
+        value.append(np.where(is_leaf, conditions, 0).astype(np.float32))
+        default_left.append(np.asarray(tree["default_left"], dtype=bool))
+        roots.append(offset)
+
+        depth = np.zeros(len(tree_left), dtype=np.int32)
+        for node in range(len(tree_left)):
+            if not is_leaf[node]:
+                depth[tree_left[node]] = depth[tree_right[node]] = depth[node] + 1
+        max_depth = max(max_depth, int(depth.max()))
+        offset += len(tree_left)
+
+    return NativePredictor(
+        left=np.concatenate(left), right=np.concatenate(right),
+        feature=np.concatenate(feature), threshold=np.concatenate(threshold),
+        default_left=np.concatenate(default_left), value=np.concatenate(value),
+        roots=np.asarray(roots, dtype=np.int32),
+        tree_group=np.asarray(gbm["model"]["tree_info"], dtype=np.int32),
+        base_margin=base_margin, feature_names=booster.feature_names or [],
+        objective=objective, max_depth=max_depth,
+    )
+
+
+def verify(predictor: NativePredictor, booster, rows: int = 2000, seed: int = 0):
+    import xgboost as xgb
+
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(rows, booster.num_features())).astype(np.float32)
+    X[rng.random(X.shape) < 0.02] = np.nan
+    dmatrix = xgb.DMatrix(X, feature_names=predictor.feature_names or None)
+
+    expected = booster.predict(dmatrix, output_margin=True).reshape(rows, -1)
+    actual = predictor.predict_margin(X)
+    max_diff = float(np.abs(expected - actual).max())
+    if not np.allclose(expected, actual, rtol=1e-5, atol=1e-5):
+        raise AssertionError(f"Native predictor disagrees with XGBoost (max abs diff {max_diff})")
+    return max_diff
+
+
+def export(model_dir: str, output_path: str):
+    import xgboost as xgb
+
+    booster = xgb.Booster()
+    booster.load_model(os.path.join(model_dir, "model.ubj"))
+    predictor = from_booster(booster)
+    max_diff = verify(predictor, booster)
+    predictor.save(output_path)
+    return predictor, max_diff
+
+
+def main():
+    from model_registry import CLASSIFIER_URI, REGRESSOR_URI
+
+    parser = argparse.ArgumentParser(description="Compile the XGBoost models into NumPy tree arrays")
+    parser.add_argument("--classifier", default=CLASSIFIER_URI)
+    parser.add_argument("--regressor", default=REGRESSOR_URI)
+    parser.add_argument("--output-dir", default=COMPILED_DIR)
+    args = parser.parse_args()
+
+    for name, model_dir in [("classifier", args.classifier), ("regressor", args.regressor)]:
+        output_path = os.path.join(args.output_dir, f"{name}.npz")
+        predictor, max_diff = export(model_dir, output_path)
+        print(f"{name}: {len(predictor.roots)} trees, {len(predictor.left)} nodes, "
+              f"depth {predictor.max_depth} -> {output_path} (max margin diff {max_diff:.2e})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+import os
+
+import numpy as np
+
+# Exact statistics over columns kept on disk, for jobs whose input does not fit in memory.
+# Columns are appended chunk by chunk to raw files (ColumnSpill) and read back a block at a
+# time, so memory depends on the block size, never on the row count:
+#   column_sum        bit-identical to numpy's sum of the whole column (same pairwise tree)
+#   select_ranks      k-th smallest values per group: MSD radix select, one 16-bit digit per
+#                     pass over the blocks (5 passes with the counting pass)
+#   medians/quantiles the same values as pandas' median and quantile (linear interpolation)
+#   first_occurrences drop_duplicates' keep mask over 64-bit row hashes, deduplicated in
+#                     on-disk buckets split by hash prefix
+
+DEFAULT_BLOCK_ROWS = 1 << 20
+DEFAULT_BUCKET_ROWS = 1 << 22   # hashes per dedupe bucket (16 bytes each with the row number)
+DIGIT_BITS = 16
+
+
+class ColumnSpill:
+    def __init__(self, directory: str, block_rows: int = DEFAULT_BLOCK_ROWS):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.block_rows = block_rows
+        self.dtypes = {}
+        self.rows = {}
+
+    def path(self, name: str):
+        return os.path.join(self.directory, f"{name}.bin")
+
+    def append(self, name: str, values):
+        values = np.ascontiguousarray(values, dtype=self.dtypes.setdefault(name, np.asarray(values).dtype))
+        with open(self.path(name), "ab") as f:
+            values.tofile(f)
+        self.rows[name] = self.rows.get(name, 0) + len(values)
+
+    def read(self, name: str, start: int = 0, stop: int = None):
+        stop = self.rows.get(name, 0) if stop is None else stop
+        dtype = self.dtypes[name]
+        return np.fromfile(self.path(name), dtype=dtype, count=stop - start, offset=start * dtype.itemsize)
+
+    def blocks(self, *names):
+        # (first row, [one array per name]) for every block of the columns
+        rows = self.rows.get(names[0], 0)
+        for start in range(0, rows, self.block_rows):
+            stop = min(start + self.block_rows, rows)
+            yield start, [self.read(name, start, stop) for name in names]
+
+
+# ------------------------
+# Sums
+# ------------------------
+def column_sum(spill: ColumnSpill, name: str):
+    # numpy sums a float array pairwise: halves (rounded down to a multiple of 8) summed
+    # recursively down to blocks of at most 128 items. Following the same splits down to
+    # spill-sized ranges, and letting numpy sum those, gives exactly arr.sum() of the column.
+    def pairwise(start, n):
+        if n <= max(spill.block_rows, 128):
+            return np.add.reduce(spill.read(name, start, start + n))
+        half = n // 2
+        half -= half % 8
+        return pairwise(start, half) + pairwise(start + half, n - half)
+
+    rows = spill.rows.get(name, 0)
+    return float(pairwise(0, rows)) if rows else 0.0
+
+
+# ------------------------
+# Order statistics
+# ------------------------
+_SIGN = np.uint64(1 << 63)
+
+
+def _sortable(values):
+    # float64 -> uint64 with the same order (-0.0 counted as 0.0)
+    bits = (np.asarray(values, dtype=np.float64) + 0.0).view(np.uint64)
+    return np.where(bits & _SIGN, ~bits, bits | _SIGN)
+
+
+def _unsortable(key: int):
+    key = np.uint64(key)
+    bits = key ^ _SIGN if key & _SIGN else ~key
+    return float(np.array([bits], dtype=np.uint64).view(np.float64)[0])
+
+
+def group_counts(read):
+    # {group: number of non-NaN values}; groups with only NaN values count 0, NaN groups are dropped
+    counts = {}
+    for groups, values in read():
+        present = groups == groups
+        unique, inverse = np.unique(groups[present], return_inverse=True)
+        valid = np.bincount(inverse, weights=~np.isnan(values[present]), minlength=len(unique))
+        for group, n in zip(unique.tolist(), valid.astype(np.int64).tolist()):
+            counts[group] = counts.get(group, 0) + n
+    return counts
+
+
+def select_ranks(read, wanted: dict):
+    # {group: {rank: value}}, the rank-th smallest (0-based) non-NaN value of each group.
+    # read() yields blocks of (group array, float64 value array) and is called once per pass.
+    state = {(group, rank): [0, rank] for group, ranks in wanted.items() for rank in set(ranks)}
+    if not state:
+        return {}
+    for shift in range(64 - DIGIT_BITS, -1, -DIGIT_BITS):
+        counts = {target: np.zeros(1 << DIGIT_BITS, dtype=np.int64) for target in state}
+        for groups, values in read():
+            valid = ~np.isnan(values)
+            groups, keys = groups[valid], _sortable(values[valid])
+            for group in wanted:
+                in_group = keys[groups == group]
+                high = None if shift == 64 - DIGIT_BITS else in_group >> np.uint64(shift + DIGIT_BITS)
+                digits = {}
+                for (target_group, rank), (prefix, _) in state.items():
+                    if target_group != group:
+                        continue
+                    if prefix not in digits:
+                        selected = in_group if high is None else in_group[high == np.uint64(prefix)]
+                        digits[prefix] = np.bincount(
+                            ((selected >> np.uint64(shift)) & np.uint64((1 << DIGIT_BITS) - 1)).astype(np.intp),
+                            minlength=1 << DIGIT_BITS)
+                    counts[(target_group, rank)] += digits[prefix]
+        for target, entry in state.items():
+            cumulative = np.cumsum(counts[target])
+            digit = int(np.searchsorted(cumulative, entry[1], side="right"))
+            if digit >= len(cumulative):
+                raise ValueError(f"rank {target[1]} out of range for group {target[0]!r}")
+            entry[1] -= int(cumulative[digit - 1]) if digit else 0
+            entry[0] = (entry[0] << DIGIT_BITS) | digit
+    return {group: {rank: _unsortable(state[(group, rank)][0]) for rank in set(ranks)}
+            for group, ranks in wanted.items()}
+
+
+def medians(read):
+    # {group: median}, as pandas' groupby median (the mean of the two middle values for an
+    # even count, NaN for a group without values)
+    counts = group_counts(read)
+    wanted = {group: sorted({(n - 1) // 2, n // 2}) for group, n in counts.items() if n}
+    ranks = select_ranks(read, wanted)
+    result = {}
+    for group, n in counts.items():
+        if n == 0:
+            result[group] = np.nan
+        elif n % 2:
+            result[group] = ranks[group][n // 2]
+        else:
+            result[group] = (ranks[group][n // 2 - 1] + ranks[group][n // 2]) / 2
+    return result
+
+
+def quantiles(read, qs):
+    # {group: [value per q]}, as pandas' Series.quantile (numpy's linear method)
+    counts = group_counts(read)
+    positions = {}
+    for group, n in counts.items():
+        if n:
+            virtual = [(n - 1) * q for q in qs]
+            positions[group] = [(v, int(np.floor(v)), min(int(np.floor(v)) + 1, n - 1)) for v in virtual]
+    ranks = select_ranks(read, {group: [r for _, lo, hi in pos for r in (lo, hi)]
+                                for group, pos in positions.items()})
+    result = {}
+    for group in counts:
+        if group not in positions:
+            result[group] = [np.nan] * len(qs)
+            continue
+        # numpy's own interpolation between the two neighbours: on a 2-item array the virtual
+        # index is the gamma itself, so the result is bit-identical to the full-array quantile
+        result[group] = [float(np.quantile(np.array([ranks[group][lo], ranks[group][hi]]), v - lo))
+                         for v, lo, hi in positions[group]]
+    return result
+
+
+# ------------------------
+# Duplicates
+# ------------------------
+def first_occurrences(hash_blocks, rows: int, directory: str, bucket_rows: int = DEFAULT_BUCKET_ROWS):
+    # Memory-mapped bool mask over `rows` rows, True where the row's hash is seen for the first
+    # time in file order (DataFrame.duplicated(keep="first") negated). hash_blocks yields
+    # (first row, uint64 hashes) in order; the hashes are split into on-disk buckets by their
+    # top bits, so one bucket is in memory at a time.
+    os.makedirs(directory, exist_ok=True)
+    bits = max(int(np.ceil(np.log2(max(rows / bucket_rows, 1)))), 0)
+    spill = ColumnSpill(directory)
+    for start, hashes in hash_blocks:
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        bucket = (hashes >> np.uint64(64 - bits)).astype(np.int64) if bits else np.zeros(len(hashes), np.int64)
+        order = np.argsort(bucket, kind="stable")
+        bounds = np.searchsorted(bucket[order], np.arange((1 << bits) + 1))
+        for b in range(1 << bits):
+            part = order[bounds[b]:bounds[b + 1]]
+            if len(part):
+                spill.append(f"hash{b}", hashes[part])
+                spill.append(f"row{b}", part.astype(np.int64) + start)
+
+    keep = np.lib.format.open_memmap(os.path.join(directory, "keep.npy"), mode="w+", dtype=bool, shape=(rows,))
+    keep[:] = True
+    for b in range(1 << bits):
+        if f"hash{b}" not in spill.rows:
+            continue
+        hashes, row = spill.read(f"hash{b}"), spill.read(f"row{b}")
+        # rows were appended in file order, so a stable sort keeps the first one first
+        order = np.argsort(hashes, kind="stable")
+        repeated = np.zeros(len(order), dtype=bool)
+        repeated[1:] = hashes[order][1:] == hashes[order][:-1]
+        keep[row[order][repeated]] = False
+        os.remove(spill.path(f"hash{b}"))
+        os.remove(spill.path(f"row{b}"))
+    keep.flush()
+    return keep
@@ -1,9 +1,12 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
+from dataset_store import dataset_hash, load_dataset
+from figure_cache import Chart, ChartStream
+import warmup
 
 # Page config
 st.set_page_config(page_title="Data Overview", page_icon="📊", layout="wide")
+warmup.start()
 st.title("📊 Data Overview")
 
 st.markdown("""
@@ -14,13 +17,14 @@ This page provides a quick overview of both **raw** and **cleaned** EMI datasets
 """)
 
 # --- Load datasets ---
-@st.cache_data
-def load_datasets():
-    raw_df = pd.read_csv("emi_prediction_dataset.csv")      # adjust path
-    clean_df = pd.read_csv("emi_prediction_dataset_enhanced.csv") # adjust path
+# The versions are part of the cache key, so a rebuilt store is reloaded along with its charts
+@st.cache_resource
+def load_datasets(raw_version, clean_version):
+    raw_df = load_dataset("raw")      # memory-mapped Arrow store, CSV fallback
+    clean_df = load_dataset("clean")
     return raw_df, clean_df
 
-raw_df, clean_df = load_datasets()
+raw_df, clean_df = load_datasets(dataset_hash("raw"), dataset_hash("clean"))
 
 # --- Dataset Shapes ---
 st.subheader("📐 Dataset Shapes")
@@ -67,27 +71,29 @@ with col2:
 if "emi_eligibility" in raw_df.columns and "emi_eligibility" in clean_df.columns:
     st.subheader("⚖️ EMI Eligibility Distribution Comparison")
     col1, col2 = st.columns(2)
+    charts = ChartStream()
+
+    def balance_chart(name, counts, colors, title):
+        def draw(ax):
+            counts.plot(kind="bar", color=colors, ax=ax)
+            ax.set_ylabel("Count")
+            ax.set_title(title)
+        return Chart(("data_overview.balance", name, dataset_hash(name)), draw)
 
     with col1:
         st.write("**Raw Dataset**")
         raw_counts = raw_df["emi_eligibility"].value_counts()
-        fig1, ax1 = plt.subplots()
-        raw_counts.plot(kind="bar", color=["gray", "orange", "red"], ax=ax1)
-        ax1.set_ylabel("Count")
-        ax1.set_title("Raw EMI Eligibility")
-        st.pyplot(fig1)
+        charts.add(balance_chart("raw", raw_counts, ["gray", "orange", "red"], "Raw EMI Eligibility"))
         st.write(raw_counts)
 
     with col2:
         st.write("**Cleaned Dataset**")
         clean_counts = clean_df["emi_eligibility"].value_counts()
-        fig2, ax2 = plt.subplots()
-        clean_counts.plot(kind="bar", color=["green", "orange", "red"], ax=ax2)
-        ax2.set_ylabel("Count")
-        ax2.set_title("Cleaned EMI Eligibility")
-        st.pyplot(fig2)
+        charts.add(balance_chart("clean", clean_counts, ["green", "orange", "red"], "Cleaned EMI Eligibility"))
         st.write(clean_counts)
 
+    charts.finish()
+
 # Footer
 st.markdown("---")
 st.caption("Data Overview page | EMI Prediction App")
\ No newline at end of file
@@ -1,10 +1,13 @@
 import streamlit as st
-import pandas as pd
 import seaborn as sns
-import matplotlib.pyplot as plt
+from dataset_store import dataset_hash
+from eda_aggregates import get_aggregates, TARGET, DEMOGRAPHIC_COLS, RISK_FLAGS
+from figure_cache import Chart, ChartStream
+import warmup
 
 # Page config
 st.set_page_config(page_title="EDA - EMI Prediction", page_icon="🔍", layout="wide")
+warmup.start()
 st.title("🔍 Exploratory Data Analysis (EDA)")
 
 st.markdown("""
@@ -15,28 +18,40 @@ This page provides an **exploratory analysis** of the EMI dataset:
 - Statistical summaries and boxplots
 """)
 
-# --- Load dataset ---
-@st.cache_data
-def load_data():
-    return pd.read_csv("emi_prediction_dataset_final_enhanced.csv")
-
-df = load_data()
+# --- Load precomputed summaries (computed once per dataset version) ---
+agg = get_aggregates("final")
+version = dataset_hash("final")
 
 # Set plot style
 sns.set(style="whitegrid")
-plt.rcParams["figure.figsize"] = (10, 5)
+FIGSIZE = (10, 5)
+
+# Charts are rendered once per dataset version (figure_cache) and streamed in as they finish
+charts = ChartStream()
+
+
+def count_barplot(col, ax):
+    # Same chart as sns.countplot(x=col, hue=TARGET), drawn from the cached counts
+    counts = agg["counts"][col].reset_index().melt(id_vars=col, var_name=TARGET, value_name="count")
+    sns.barplot(x=col, y="count", hue=TARGET, data=counts, ax=ax)
+
+
+def count_chart(col, title, rotate=False):
+    def draw(ax):
+        count_barplot(col, ax)
+        ax.set_title(title)
+        if rotate:
+            ax.set_xticklabels(ax.get_xticklabels(), rotation=45)
+    return Chart(("eda.counts", col, version), draw, figsize=FIGSIZE)
+
 
 # -----------------------------
 # 1. EMI Eligibility Distribution Across Lending Scenarios
 # -----------------------------
 st.subheader("📊 EMI Eligibility Across EMI Types")
 
-if 'emi_scenario' in df.columns:
-    fig1, ax1 = plt.subplots()
-    sns.countplot(x='emi_scenario', hue='emi_eligibility', data=df, ax=ax1)
-    ax1.set_title("EMI Scenario vs Eligibility")
-    ax1.set_xticklabels(ax1.get_xticklabels(), rotation=45)
-    st.pyplot(fig1)
+if 'emi_scenario' in agg["counts"]:
+    charts.add(count_chart('emi_scenario', "EMI Scenario vs Eligibility", rotate=True))
 else:
     st.warning("Column 'emi_scenario' not found in dataset.")
 
@@ -45,19 +60,11 @@ else:
 # -----------------------------
 st.subheader("📈 Financial Correlation Matrix")
 
-financial_vars = [
-    'monthly_salary','dti','expense_ratio','savings_potential',
-    'affordability_ratio','credit_score','bank_balance','emergency_fund'
-]
-
-existing_financial = [col for col in financial_vars if col in df.columns]
-
-if len(existing_financial) >= 2:
-    corr_matrix = df[existing_financial].corr()
-    fig2, ax2 = plt.subplots()
-    sns.heatmap(corr_matrix, annot=True, cmap='coolwarm', center=0, ax=ax2)
-    ax2.set_title("Financial Feature Correlation")
-    st.pyplot(fig2)
+if agg["corr"] is not None:
+    def draw_corr(ax):
+        sns.heatmap(agg["corr"], annot=True, cmap='coolwarm', center=0, ax=ax)
+        ax.set_title("Financial Feature Correlation")
+    charts.add(Chart(("eda.corr", version), draw_corr, figsize=FIGSIZE))
 else:
     st.warning("Not enough financial columns for correlation heatmap.")
 
@@ -66,66 +73,47 @@ else:
 # -----------------------------
 st.subheader("👥 Demographic vs EMI Eligibility")
 
-demographic_cols = [
-    'gender','marital_status','education',
-    'employment_type','company_type',
-    'house_type','existing_loans'
-]
-
-for col in demographic_cols:
-    if col in df.columns:
-        fig, ax = plt.subplots()
-        sns.countplot(x=col, hue='emi_eligibility', data=df, ax=ax)
-        ax.set_title(f"{col} vs EMI Eligibility")
-        ax.set_xticklabels(ax.get_xticklabels(), rotation=45)
-        st.pyplot(fig)
+for col in DEMOGRAPHIC_COLS:
+    if col in agg["counts"]:
+        charts.add(count_chart(col, f"{col} vs EMI Eligibility", rotate=True))
 
 # -----------------------------
 # 4. Risk Flag Analysis (Only columns that exist)
 # -----------------------------
 st.subheader("⚠️ Risk Indicators")
 
-risk_flags = [
-    'salary_missing',
-    'balance_missing',
-    'fund_missing'
-]
-
-for flag in risk_flags:
-    if flag in df.columns:
-        fig, ax = plt.subplots()
-        sns.countplot(x=flag, hue='emi_eligibility', data=df, ax=ax)
-        ax.set_title(f"{flag} vs EMI Eligibility")
-        st.pyplot(fig)
+for flag in RISK_FLAGS:
+    if flag in agg["counts"]:
+        charts.add(count_chart(flag, f"{flag} vs EMI Eligibility"))
 
 # -----------------------------
 # 5. Statistical Summary
 # -----------------------------
 st.subheader("📊 Statistical Summary by Eligibility")
 
-summary_cols = [
-    'monthly_salary','dti','expense_ratio',
-    'savings_potential','affordability_ratio',
-    'credit_score','bank_balance'
-]
-
-existing_summary = [col for col in summary_cols if col in df.columns]
-
-summary = df.groupby('emi_eligibility')[existing_summary].describe()
-st.dataframe(summary)
+st.dataframe(agg["summary"])
 
 # -----------------------------
 # 6. Boxplots
 # -----------------------------
 st.subheader("📦 Financial Feature Distributions")
 
-for col in existing_summary:
-    fig, ax = plt.subplots()
-    sns.boxplot(x='emi_eligibility', y=col, data=df, ax=ax)
-    ax.set_title(f"{col} vs EMI Eligibility")
-    st.pyplot(fig)
+def box_chart(col, stats):
+    def draw(ax):
+        ax.bxp(stats, showfliers=False, showmeans=False, patch_artist=True,
+               boxprops={"facecolor": sns.color_palette()[0]})
+        ax.set_xlabel(TARGET)
+        ax.set_ylabel(col)
+        ax.set_title(f"{col} vs EMI Eligibility")
+    return Chart(("eda.box", col, version), draw, figsize=FIGSIZE)
+
+
+for col, stats in agg["box_stats"].items():
+    charts.add(box_chart(col, stats))
+
+charts.finish()
 
 # -----------------------------
 # Footer
 # -----------------------------
-st.caption("EDA Page | EMI Risk Analytics Dashboard")
+st.caption(f"EDA Page | EMI Risk Analytics Dashboard | {agg['rows']:,} rows summarised")
@@ -1,10 +1,13 @@
 import streamlit as st
 import pandas as pd
 import seaborn as sns
-import matplotlib.pyplot as plt
+from dataset_store import dataset_hash, load_dataset
+from figure_cache import Chart, show
+import warmup
 
 # Page config
 st.set_page_config(page_title="Feature Engineering", page_icon="⚙️", layout="wide")
+warmup.start()
 st.title("⚙️ Feature Engineering & SMOTE Overview")
 
 st.markdown("""
@@ -13,15 +16,6 @@ This page highlights the **engineered features** and how **SMOTE** handled class
 - SMOTE ensures fair representation of all classes during training
 """)
 
-# --- Load dataset ---
-@st.cache_data
-def load_data():
-    clean_df = pd.read_csv("emi_prediction_dataset_final_enhanced.csv")  # includes engineered features
-    smote_df = pd.read_csv("smote_emi_data.csv")    # SMOTE-applied training data
-    return clean_df, smote_df
-
-clean_df, smote_df = load_data()
-
 # --- Derived Features Dictionary ---
 derived_features = {
     "total_expenses": "Sum of school fees, college fees, travel, groceries, and other expenses",
@@ -36,6 +30,16 @@ derived_features = {
     "balance_emi_gap": "Bank Balance × EMI Gap"
 }
 
+# --- Load dataset ---
+# The versions are part of the cache key, so a rebuilt store is reloaded along with its charts
+@st.cache_resource
+def load_data(final_version, smote_version):
+    clean_df = load_dataset("final", columns=[*derived_features, "emi_eligibility"])  # includes engineered features
+    smote_df = load_dataset("smote", columns=["emi_eligibility"])    # SMOTE-applied training data
+    return clean_df, smote_df
+
+clean_df, smote_df = load_data(dataset_hash("final"), dataset_hash("smote"))
+
 # --- Feature Explanation Table ---
 st.subheader("📘 Engineered Features Explained")
 st.table(pd.DataFrame(list(derived_features.items()), columns=["Feature", "Description"]))
@@ -53,21 +57,21 @@ if "emi_eligibility" in clean_df.columns and available_cols:
     st.subheader("📈 Engineered Feature vs EMI Eligibility")
     selected_eng = st.selectbox("Select a derived feature:", available_cols)
 
-    fig, ax = plt.subplots()
-    sns.boxplot(x="emi_eligibility", y=selected_eng, data=clean_df, palette="Set2", ax=ax)
-    ax.set_title(f"{selected_eng} by EMI Eligibility")
-    st.pyplot(fig)
+    def draw_box(ax):
+        sns.boxplot(x="emi_eligibility", y=selected_eng, data=clean_df, palette="Set2", ax=ax)
+        ax.set_title(f"{selected_eng} by EMI Eligibility")
+    show(Chart(("feature_eng.box", selected_eng, dataset_hash("final")), draw_box))
 
 # --- SMOTE Class Balance Visualization ---
 if "emi_eligibility" in smote_df.columns:
     st.subheader("⚖️ EMI Eligibility Distribution After SMOTE")
     class_counts = smote_df["emi_eligibility"].value_counts()
 
-    fig, ax = plt.subplots()
-    sns.barplot(x=class_counts.index, y=class_counts.values, palette="pastel", ax=ax)
-    ax.set_ylabel("Count")
-    ax.set_title("Class Balance After SMOTE")
-    st.pyplot(fig)
+    def draw_balance(ax):
+        sns.barplot(x=class_counts.index, y=class_counts.values, palette="pastel", ax=ax)
+        ax.set_ylabel("Count")
+        ax.set_title("Class Balance After SMOTE")
+    show(Chart(("feature_eng.smote_balance", dataset_hash("smote")), draw_balance))
 
     st.write("Class counts after SMOTE:")
     st.write(class_counts)
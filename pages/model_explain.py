@@ -1,50 +1,59 @@
 import streamlit as st
-import pandas as pd
 import matplotlib.pyplot as plt
-import mlflow.pyfunc
-from mlflow.tracking import MlflowClient
+import numpy as np
+import explain
+import model_registry
+import prediction_distribution
+import registry_client
+from dataset_store import dataset_hash, load_dataset
+from figure_cache import Chart, ChartStream
+import warmup
+
+# Above this many rows the distribution is estimated from a sample by default
+SAMPLE_THRESHOLD = 1_000_000
 
 # ------------------------
 # Page Config
 # ------------------------
 st.set_page_config(page_title="Model Explainability", page_icon="🔍", layout="wide")
+warmup.start()
 st.title("🔍 Model Explainability & Insights")
 
 # ------------------------
-# Load Dataset
+# Load Training Feature Order
 # ------------------------
-@st.cache_data
-def load_data():
-    return pd.read_csv("smote_emi_data.csv")
-
-df = load_data()
+trained_features = model_registry.get("trained_features")
 
 # ------------------------
-# Load Training Feature Order
+# Load Dataset (only the columns the models use)
 # ------------------------
-trained_features = pd.read_csv("trained_features.csv")["feature"].tolist()
+# The version is part of the cache key, so a rebuilt store is reloaded along with its results
+@st.cache_resource
+def load_data(columns, version):
+    return load_dataset("smote", columns=columns)
+
+data_version = dataset_hash("smote")
+df = load_data(trained_features, data_version)
 
 st.success("✅ Trained feature list loaded")
 st.write("Expected feature count:", len(trained_features))
 
 # ------------------------
-# Align dataset with training schema
+# Load MLflow Models (Production versions, through the cached registry client)
 # ------------------------
-X = df.reindex(columns=trained_features, fill_value=0)
+registry = registry_client.default_client()
+production = registry.production(["XGBoost_Classifier", "XGBoost_Regressor"])
 
-# ------------------------
-# Load MLflow Models
-# ------------------------
 classifier, regressor = None, None
 
 try:
-    classifier = mlflow.pyfunc.load_model("mlartifacts/924749176205125717/models/m-eca40b7e777b4d6e90c8b932547a17d6/artifacts")
+    classifier = registry.load_model("XGBoost_Classifier")
     st.success("✅ Classifier Loaded")
 except Exception as e:
     st.error(f"❌ Classifier load failed: {e}")
 
 try:
-    regressor = mlflow.pyfunc.load_model("mlartifacts/779327931942531374/models/m-55b8bd1e138141f18d7b10d87989c3b3/artifacts")
+    regressor = registry.load_model("XGBoost_Regressor")
     st.success("✅ Regressor Loaded")
 except Exception as e:
     st.error(f"❌ Regressor load failed: {e}")
@@ -54,62 +63,135 @@ except Exception as e:
 # ------------------------
 st.subheader("📊 Versioned Model Metrics")
 
-client = MlflowClient()
-
 def show_metrics(model_name, label):
-    versions = client.search_model_versions(f"name='{model_name}'")
-    prod_models = [v for v in versions if v.current_stage == "Production"]
+    model = production[model_name]
 
-    if not prod_models:
+    if model is None:
         st.warning(f"No production model found for {label}")
         return
 
-    run_id = prod_models[0].run_id
-    run = client.get_run(run_id)
-    metrics = run.data.metrics
-    params = run.data.params
+    metrics = model.metrics
+    params = model.params
 
     st.markdown(f"### {label}")
-    st.write("Version:", prod_models[0].version)
-    st.write("Run ID:", run_id)
+    st.write("Version:", model.version)
+    st.write("Run ID:", model.run_id)
+    st.caption(f"Source: {model.origin}")
     st.json(metrics)
     st.json(params)
 
     if metrics:
-        fig, ax = plt.subplots()
-        ax.bar(metrics.keys(), metrics.values())
-        ax.set_title(f"{label} Metrics")
-        plt.xticks(rotation=45)
-        st.pyplot(fig)
-
+        def draw(ax):
+            ax.bar(list(metrics.keys()), list(metrics.values()))
+            ax.set_title(f"{label} Metrics")
+            ax.tick_params(axis="x", labelrotation=45)
+        charts.add(Chart(("model_explain.metrics", model_name, model.run_id, tuple(metrics.items())), draw))
+
+# Rendered once per run's metrics (figure_cache) and streamed in as they finish
+charts = ChartStream()
 show_metrics("XGBoost_Classifier", "EMI Classifier")
 show_metrics("XGBoost_Regressor", "EMI Regressor")
+charts.finish()
 
 # ------------------------
 # Predictions Distribution
 # ------------------------
 st.subheader("📈 Predictions Distribution")
 
+# Scored in chunks (aligned with the training schema chunk by chunk); results are cached per
+# model version and dataset version, so later visits draw straight from the cache
+sample_rows = None
+if st.checkbox("Estimate from a random sample (95% confidence intervals)", value=len(df) > SAMPLE_THRESHOLD):
+    sample_rows = int(st.number_input("Sample size", min_value=1_000, max_value=max(len(df), 1_000),
+                                      value=min(50_000, len(df)), step=10_000))
+
+
+def draw_class_counts(state):
+    counts = prediction_distribution.class_counts(state)
+    fig, ax = plt.subplots()
+    yerr = None
+    if "low" in counts:
+        yerr = [counts["count"] - counts["low"], counts["high"] - counts["count"]]
+    ax.bar(counts.index, counts["count"], yerr=yerr, capsize=4)
+    ax.set_title("Classifier Predictions")
+    return fig
+
+
+def draw_histogram(state):
+    counts, edges, interval = prediction_distribution.histogram(state)
+    fig, ax = plt.subplots()
+    ax.bar(edges[:-1], counts, width=np.diff(edges), align="edge", edgecolor="white")
+    if interval is not None:
+        centers = (edges[:-1] + edges[1:]) / 2
+        ax.errorbar(centers, counts, yerr=[counts - interval[0], interval[1] - counts],
+                    fmt="none", ecolor="black", capsize=2)
+    ax.set_title("Regressor Predictions")
+    return fig
+
+
+def show_distribution(model, name, kind, draw):
+    placeholder = st.empty()
+
+    def render(state):
+        fig = draw(state)
+        done = state["rows_scored"] / max(state["rows_to_score"], 1)
+        caption = f"{state['rows_scored']:,} of {state['rows_to_score']:,} rows scored ({done:.0%})"
+        if state["sampled"]:
+            caption += f", sampled from {state['rows_total']:,} rows; counts scaled to the full dataset"
+        with placeholder.container():
+            st.pyplot(fig)
+            st.caption(caption)
+        plt.close(fig)
+
+    model_version = model_registry.version([registry.artifact_name(name)[0]])
+    state = prediction_distribution.get_distribution(
+        model, kind, df, trained_features, model_version, data_version,
+        sample_rows=sample_rows, on_progress=render,
+    )
+    render(state)
+
+
 if classifier is not None:
     try:
-        preds = classifier.predict(X)
-        fig, ax = plt.subplots()
-        pd.Series(preds).astype(str).value_counts().plot(kind="bar", ax=ax)
-        ax.set_title("Classifier Predictions")
-        st.pyplot(fig)
+        show_distribution(classifier, "XGBoost_Classifier", "classifier", draw_class_counts)
     except Exception as e:
         st.error(f"Classifier Prediction Failed: {e}")
 
 if regressor is not None:
     try:
-        preds = regressor.predict(X)
-        fig, ax = plt.subplots()
-        pd.Series(preds).hist(bins=25, ax=ax)
-        ax.set_title("Regressor Predictions")
-        st.pyplot(fig)
+        show_distribution(regressor, "XGBoost_Regressor", "regressor", draw_histogram)
     except Exception as e:
         st.error(f"Regressor Prediction Failed: {e}")
 
+# ------------------------
+# Global Feature Importance (TreeSHAP)
+# ------------------------
+st.subheader("🧭 Global Feature Importance (mean |SHAP|)")
+
+# Computed on a fixed background sample and cached per model version and dataset version;
+# one-hot columns are summed back into their categorical input
+try:
+    background = df.sample(n=min(explain.BACKGROUND_ROWS, len(df)), random_state=0)
+    background = background.reindex(columns=trained_features, fill_value=0)
+    importance = explain.global_importance(background, data_version)
+
+    for kind, label in [("classification", "EMI Classifier"), ("regression", "EMI Regressor")]:
+        top = importance[kind].sort_values().tail(15)
+        fig, ax = plt.subplots()
+        ax.barh(top.index, top.values)
+        ax.set_title(f"{label}: mean |SHAP|")
+        st.pyplot(fig)
+        plt.close(fig)
+    # explain.BOOSTERS are the pinned models the prediction page serves, which may not be the
+    # registry's Production versions charted above
+    newer = [artifact for artifact, path in map(registry.artifact_name, registry_client.PINNED_MODELS) if path]
+    shown = "the pinned models the Predict EMI page serves"
+    if newer:
+        shown += f", not the registry's Production versions ({', '.join(newer)})"
+    st.caption(f"Explains {shown}. Background: {len(background):,} rows of the training data")
+except Exception as e:
+    st.error(f"Feature importance failed: {e}")
+
 # ------------------------
 # Footer
 # ------------------------
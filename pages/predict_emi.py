@@ -1,69 +1,17 @@
+import time
 import streamlit as st
 import pandas as pd
-import numpy as np
-import mlflow.pyfunc
-import joblib
-
-# ------------------------
-# Load trained artifacts
-# ------------------------
-trained_features = pd.read_csv("trained_features.csv")["feature"].tolist()
-scaler = joblib.load("input_scaler.pkl")
-label_encoder = joblib.load("label_encoder.pkl")
-
-# ------------------------
-# Load MLflow models
-# ------------------------
-classification_model = mlflow.pyfunc.load_model("mlartifacts/924749176205125717/models/m-eca40b7e777b4d6e90c8b932547a17d6/artifacts")
-regression_model = mlflow.pyfunc.load_model("mlartifacts/779327931942531374/models/m-55b8bd1e138141f18d7b10d87989c3b3/artifacts")
-
-# ------------------------
-# Helper function to compute features
-# ------------------------
-def compute_features(user_input: dict):
-    features = user_input.copy()
-
-    # Total expenses
-    total_expenses = (
-        features.get("school_fees", 0) + features.get("college_fees", 0) +
-        features.get("travel_expenses", 0) + features.get("groceries_utilities", 0) +
-        features.get("other_monthly_expenses", 0) + features.get("monthly_rent", 0)
-    )
-    features["total_expenses"] = total_expenses
-    features["savings_potential"] = features.get("monthly_salary", 0) - total_expenses
-
-    features["dti"] = features.get("current_emi_amount", 0) / max(features.get("monthly_salary", 1), 1)
-    features["expense_ratio"] = total_expenses / max(features.get("monthly_salary", 1), 1)
-    features["affordability_ratio"] = (
-        (features.get("bank_balance", 0) + features.get("emergency_fund", 0)) /
-        max(features.get("requested_amount", 1), 1)
-    )
-    features["salary_credit_interaction"] = features.get("monthly_salary", 0) * features.get("credit_score", 0)
-    features["emi_gap"] = 0 - features.get("current_emi_amount", 0)
-    features["balance_emi_gap"] = features.get("bank_balance", 0) - features.get("current_emi_amount", 0)
-
-    # Missing flags
-    features["salary_missing"] = int(features.get("monthly_salary", 0) == 0)
-    features["balance_missing"] = int(features.get("bank_balance", 0) == 0)
-    features["fund_missing"] = int(features.get("emergency_fund", 0) == 0)
-
-    # One-hot encoding for categorical variables
-    categorical_map = {
-        "gender": ["Male"],
-        "marital_status": ["Single"],
-        "education": ["High School", "Post Graduate", "Professional"],
-        "employment_type": ["Private", "Self-employed"],
-        "company_type": ["MNC", "Mid-size", "Small", "Startup"],
-        "house_type": ["Own", "Rented"],
-        "existing_loans": ["Yes"],
-        "emi_scenario": ["Education EMI", "Home Appliances EMI", "Personal Loan EMI", "Vehicle EMI"]
-    }
-
-    for cat_col, cat_values in categorical_map.items():
-        for val in cat_values:
-            features[f"{cat_col}_{val}"] = int(features.get(cat_col, "") == val)
-
-    return features
+import explain
+import instrumentation
+import model_registry
+import prediction_cache
+import warmup
+import what_if
+
+EMI_SCENARIOS = [
+    "E-commerce Shopping EMI", "Education EMI", "Home Appliances EMI",
+    "Personal Loan EMI", "Vehicle EMI"
+]
 
 # ------------------------
 # Streamlit UI
@@ -71,6 +19,10 @@ def compute_features(user_input: dict):
 st.set_page_config(page_title="EMI Eligibility Predictor", layout="wide")
 st.title("💰 EMI Eligibility & Max EMI Predictor")
 
+# Models load in the background while the form is filled in; scoring picks them up from
+# model_registry's process cache (and waits for them if the warm-up is still running)
+warmup.start()
+
 with st.form("user_input_form"):
     # ------------------------
     # Personal & Employment
@@ -107,10 +59,7 @@ with st.form("user_input_form"):
     emergency_fund = st.number_input("Emergency Fund", min_value=0.0, step=100.0)
     requested_amount = st.number_input("Requested Loan Amount", min_value=1000.0, step=1000.0)
     requested_tenure = st.number_input("Requested Tenure (months)", min_value=6, max_value=120, step=6)
-    emi_scenario = st.selectbox("EMI Scenario", [
-        "E-commerce Shopping EMI", "Education EMI", "Home Appliances EMI",
-        "Personal Loan EMI", "Vehicle EMI"
-    ])
+    emi_scenario = st.selectbox("EMI Scenario", EMI_SCENARIOS)
 
     submitted = st.form_submit_button("Predict")
 
@@ -141,27 +90,72 @@ if submitted:
         "emi_scenario": emi_scenario
     }
 
-    # Compute features
-    features = compute_features(user_input)
-    features_df = pd.DataFrame([features])
-    features_df = features_df.reindex(columns=trained_features, fill_value=0)
-    
-    # Scale numeric columns
-    numeric_cols = [
-        'monthly_salary','monthly_rent','school_fees','college_fees','travel_expenses',
-        'groceries_utilities','other_monthly_expenses','current_emi_amount','credit_score',
-        'bank_balance','emergency_fund','requested_amount','requested_tenure','savings_potential',
-        'dti','total_expenses','expense_ratio','affordability_ratio','salary_credit_interaction',
-        'emi_gap','balance_emi_gap'
-    ]
-    features_df[numeric_cols] = scaler.transform(features_df[numeric_cols])
-
-    # Make predictions
-    pred_class_encoded = classification_model.predict(features_df)
-    pred_class = label_encoder.inverse_transform(pred_class_encoded)
-    pred_emi = regression_model.predict(features_df)
+    # Compute features, scale and predict (a resubmitted applicant comes from the cache)
+    artifacts = model_registry.get_artifacts()
+    pred_class, pred_emi = prediction_cache.score_one_cached(user_input, artifacts)
 
     # Display results
     st.subheader("💡 Prediction Results")
-    st.write(f"**EMI Eligibility:** {pred_class[0]}")
-    st.write(f"**Max EMI Amount:** ₹{pred_emi[0]:,.2f}")
+    st.write(f"**EMI Eligibility:** {pred_class}")
+    st.write(f"**Max EMI Amount:** ₹{pred_emi:,.2f}")
+
+    # Top reasons behind both predictions (TreeSHAP contributions of the inputs)
+    try:
+        reasons = explain.explain_one(user_input, artifacts)
+        st.subheader("🧾 Top Reasons")
+        st.write(f"Towards **{reasons['eligibility']}**:")
+        # XGBoost explains a multi-class model per class, before the softmax
+        unit = "log-odds" if len(artifacts.label_encoder.classes_) == 2 else "pre-softmax margin"
+        st.table(pd.DataFrame(reasons["classification"], columns=["input", f"contribution ({unit})"]))
+        st.write("Max EMI amount:")
+        st.table(pd.DataFrame(reasons["regression"], columns=["input", "contribution (₹)"]))
+    except Exception as e:
+        st.warning(f"Explanation unavailable: {e}")
+
+    # Kept for the what-if sweep, which reruns the page without resubmitting the form
+    st.session_state["applicant"] = user_input
+
+# ------------------------
+# What-if: loan amount x tenure x scenario, scored in one batch
+# ------------------------
+if "applicant" in st.session_state:
+    applicant = st.session_state["applicant"]
+    st.subheader("🔁 What-if: Loan Amount × Tenure")
+    with st.form("what_if_form"):
+        col1, col2, col3 = st.columns(3)
+        low = col1.number_input("Smallest amount", min_value=1000.0, value=10_000.0, step=1000.0)
+        high = col2.number_input("Largest amount", min_value=1000.0,
+                                 value=max(4 * float(applicant["requested_amount"]), 100_000.0), step=10_000.0)
+        steps = col3.slider("Amount steps", min_value=5, max_value=100, value=what_if.DEFAULT_AMOUNT_STEPS)
+        tenures = st.multiselect("Tenures (months)", what_if.DEFAULT_TENURES, default=what_if.DEFAULT_TENURES)
+        scenarios = st.multiselect("EMI scenarios", EMI_SCENARIOS, default=[applicant["emi_scenario"]])
+        annual_rate = st.number_input("Annual interest rate (%) for the instalment", min_value=0.0,
+                                      max_value=40.0, value=0.0, step=0.5)
+        run_sweep = st.form_submit_button("Run sweep")
+
+    if run_sweep and tenures and scenarios and high >= low:
+        start = time.perf_counter()
+        grid = what_if.sweep(applicant, model_registry.get_artifacts(), what_if.amount_range(low, high, steps),
+                             sorted(tenures), scenarios, annual_rate / 100)
+        frontier = what_if.frontier(grid)
+        elapsed = time.perf_counter() - start
+
+        st.caption(f"{len(grid):,} combinations scored in {elapsed * 1000:.0f} ms. A point is safe when "
+                   f"the eligibility is {', '.join(what_if.SAFE_LABELS)} and the instalment fits the "
+                   f"predicted max EMI.")
+        chart = frontier.pivot(index="requested_tenure", columns="emi_scenario", values="max_safe_amount")
+        st.write("**Affordability frontier** (largest safe amount per tenure)")
+        st.line_chart(chart)
+        st.dataframe(chart, use_container_width=True)
+
+with st.expander("Model load timings"):
+    st.dataframe(model_registry.load_report(), use_container_width=True)
+
+with st.expander("Prediction cache"):
+    st.json(prediction_cache.default_cache().stats())
+
+# Per-stage latency breakdown for this process (EMI_INSTRUMENTATION=1)
+if instrumentation.ENABLED:
+    with st.expander("Stage timings"):
+        st.dataframe(instrumentation.stage_table(), use_container_width=True)
+        st.json(instrumentation.snapshot()["counters"])
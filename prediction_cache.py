@@ -0,0 +1,174 @@
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+import model_registry
+from features import CAT_COLS
+from scoring import score_batch, score_one
+
+# Memoized predictions for repeat applicants (resubmitted forms, retried requests).
+# Keys are a hash of the normalized input; entries belong to one model_registry.version(),
+# so a changed model, scaler, encoder or feature list on disk empties the cache on the next
+# lookup. One cache per process is shared by every Streamlit session and service request.
+
+MAX_ENTRIES = int(os.environ.get("EMI_PREDICTION_CACHE_SIZE", 10_000))   # 0 disables caching
+TTL = float(os.environ.get("EMI_PREDICTION_CACHE_TTL", 3600))
+
+
+# ------------------------
+# Keys
+# ------------------------
+def _normalize(value):
+    # Numbers compare by value (30 == 30.0 == np.int64(30)), since compute_features only does
+    # arithmetic on them; strings stay exact because the one-hot match is exact
+    if isinstance(value, (bool, int, float, np.number)):
+        number = float(value)
+        if math.isnan(number):
+            return None
+        return number + 0.0  # -0.0 -> 0.0
+    if value is None or isinstance(value, str):
+        return value
+    return str(value)
+
+
+def input_key(user_input: dict):
+    canonical = json.dumps(sorted((str(k), _normalize(v)) for k, v in user_input.items()),
+                           separators=(",", ":"))
+    return hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+
+
+# ------------------------
+# Cache
+# ------------------------
+class PredictionCache:
+    def __init__(self, max_entries: int = MAX_ENTRIES, ttl: float = TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> (expires_at, value), least recently used first
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: str, version: str):
+        with self._lock:
+            if version != self._version:
+                # Artifacts changed on disk: nothing cached belongs to the new version
+                self.invalidations += len(self._entries)
+                self._entries.clear()
+                self._version = version
+
+            item = self._entries.get(key)
+            if item is not None and item[0] <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                item = None
+            if item is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def put(self, key: str, version: str, value):
+        with self._lock:
+            # Results computed against an older version are dropped
+            if self.max_entries <= 0 or version != self._version:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_cache():
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = PredictionCache()
+        return _default
+
+
+# ------------------------
+# Cached scoring
+# ------------------------
+def score_one_cached(user_input: dict, artifacts, cache: PredictionCache = None):
+    # Same result as scoring.score_one: (eligibility label, max EMI). The version comes from
+    # the artifacts object itself, so a reload after the caller fetched them cannot file old
+    # predictions under the new version; superseded artifacts score without the cache.
+    cache = cache or default_cache()
+    version = model_registry.artifacts_version(artifacts)
+    key = input_key(user_input)
+    result = cache.get(key, version) if version is not None else None
+    if result is None:
+        pred_class, pred_emi = score_one(user_input, artifacts)
+        result = (str(pred_class), pred_emi)
+        if version is not None:
+            cache.put(key, version, result)
+    return result
+
+
+def records_frame(records: list):
+    # One frame for many applicant dicts. A field missing from a record gets the default the
+    # single-row path uses (0, or "" for a categorical), not the NaN from_records would put
+    # there, so a record scores the same whatever else shares its batch.
+    columns = list(dict.fromkeys(name for record in records for name in record))
+    defaults = {name: "" if name in CAT_COLS else 0 for name in columns}
+    return pd.DataFrame.from_records([{**defaults, **record} for record in records], columns=columns)
+
+
+def score_records_cached(records: list, artifacts, cache: PredictionCache = None):
+    # [(label, max EMI)] for a list of applicant dicts; only unseen inputs go through
+    # score_batch, once each even when repeated within the list
+    cache = cache or default_cache()
+    version = model_registry.artifacts_version(artifacts)
+    keys = [input_key(record) for record in records]
+    results = [cache.get(key, version) if version is not None else None for key in keys]
+
+    missing = {}
+    for i, (key, result) in enumerate(zip(keys, results)):
+        if result is None:
+            missing.setdefault(key, i)
+    if missing:
+        scored = score_batch(records_frame([records[i] for i in missing.values()]), artifacts)
+        fresh = {}
+        for key, label, emi in zip(missing, scored["emi_eligibility"], scored["max_monthly_emi"]):
+            fresh[key] = (str(label), float(emi))
+            if version is not None:
+                cache.put(key, version, fresh[key])
+        results = [result if result is not None else fresh[key] for key, result in zip(keys, results)]
+    return results
@@ -0,0 +1,178 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+# Prediction distributions for the Model Explainability page, computed in chunks.
+# Class counts and histogram bins are accumulated chunk by chunk, so the page can
+# redraw after each step, and the finished result is cached in memory and under
+# .cache/predictions keyed by model version and dataset hash. With sample_rows set,
+# only a random sample is scored and the counts come with 95% Wilson intervals.
+
+CACHE_DIR = os.path.join(".cache", "predictions")
+DEFAULT_CHUNK_SIZE = 20_000
+PROGRESS_INTERVAL = 0.5   # seconds between progress callbacks
+FINE_BINS = 1024
+DISPLAY_BINS = 25
+Z_95 = 1.959964
+
+_lock = threading.Lock()
+_memory = {}
+
+
+# ------------------------
+# Incremental histogram
+# ------------------------
+class StreamingHistogram:
+    # Fixed number of equal-width bins whose range doubles (merging neighbouring bins)
+    # whenever a value falls outside it, so the range never has to be known up front
+    def __init__(self, bins: int = FINE_BINS):
+        self.bins = bins
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.origin = None
+        self.width = None
+        self.n = 0
+
+    def _grow(self, low: float, high: float):
+        half = self.bins // 2
+        while low < self.origin or high >= self.origin + self.bins * self.width:
+            merged = self.counts.reshape(half, 2).sum(axis=1)
+            if low < self.origin:
+                self.counts = np.concatenate([np.zeros(half, dtype=np.int64), merged])
+                self.origin -= self.bins * self.width
+            else:
+                self.counts = np.concatenate([merged, np.zeros(half, dtype=np.int64)])
+            self.width *= 2
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            return self
+        low, high = values.min(), values.max()
+        if self.origin is None:
+            self.origin = low
+            self.width = (high - low) / (self.bins - 1) if high > low else 1.0
+        self._grow(low, high)
+
+        index = np.minimum(((values - self.origin) // self.width).astype(np.int64), self.bins - 1)
+        self.counts += np.bincount(index, minlength=self.bins)
+        self.n += len(values)
+        return self
+
+    def display(self, bins: int = DISPLAY_BINS):
+        # (counts, edges) over the occupied range, whole fine bins grouped into at most `bins` bars
+        occupied = np.flatnonzero(self.counts)
+        if len(occupied) == 0:
+            return np.zeros(bins), np.linspace(0, 1, bins + 1)
+        first, span = occupied[0], occupied[-1] - occupied[0] + 1
+        group = -(-span // bins)
+        bars = -(-span // group)
+        counts = np.zeros(bars * group, dtype=np.int64)
+        counts[:span] = self.counts[first:first + span]
+        edges = self.origin + (first + np.arange(bars + 1) * group) * self.width
+        return counts.reshape(bars, group).sum(axis=1), edges
+
+
+def wilson_interval(successes, n: int, z: float = Z_95):
+    # Score interval for a binomial proportion; behaves well for small counts and p near 0 or 1
+    p = np.asarray(successes, dtype=float) / n
+    denom = 1 + z**2 / n
+    center = (p + z**2 / (2 * n)) / denom
+    margin = z * np.sqrt(p * (1 - p) / n + z**2 / (4 * n**2)) / denom
+    return center - margin, center + margin
+
+
+# ------------------------
+# Chunked scoring
+# ------------------------
+def new_state(kind: str, rows_total: int, rows_to_score: int):
+    return {
+        "kind": kind,
+        "rows_total": rows_total,
+        "rows_to_score": rows_to_score,
+        "rows_scored": 0,
+        "sampled": rows_to_score < rows_total,
+        "counts": {},
+        "histogram": StreamingHistogram(),
+    }
+
+
+def update_state(state: dict, preds):
+    preds = np.asarray(preds).ravel()
+    if state["kind"] == "classifier":
+        labels, counts = np.unique(preds.astype(str), return_counts=True)
+        for label, count in zip(labels, counts):
+            state["counts"][label] = state["counts"].get(label, 0) + int(count)
+    else:
+        state["histogram"].update(preds)
+    state["rows_scored"] += len(preds)
+    return state
+
+
+def class_counts(state: dict):
+    # DataFrame indexed by label: count (scaled to the full dataset) and, if sampled, 95% bounds
+    labels = sorted(state["counts"])
+    counts = np.array([state["counts"][label] for label in labels], dtype=float)
+    n, scale = max(state["rows_scored"], 1), state["rows_total"] / max(state["rows_scored"], 1)
+    df = pd.DataFrame({"count": counts * scale}, index=pd.Index(labels, name="prediction"))
+    if state["sampled"]:
+        low, high = wilson_interval(counts, n)
+        df["low"], df["high"] = low * state["rows_total"], high * state["rows_total"]
+    return df.sort_values("count", ascending=False)
+
+
+def histogram(state: dict, bins: int = DISPLAY_BINS):
+    # (counts scaled to the full dataset, edges, (low, high) or None)
+    counts, edges = state["histogram"].display(bins)
+    n = max(state["rows_scored"], 1)
+    scale = state["rows_total"] / n
+    interval = None
+    if state["sampled"]:
+        low, high = wilson_interval(counts, n)
+        interval = (low * state["rows_total"], high * state["rows_total"])
+    return counts * scale, edges, interval
+
+
+def iter_distribution(model, kind: str, df: pd.DataFrame, features: list,
+                      chunk_size: int = DEFAULT_CHUNK_SIZE, sample_rows: int = None, seed: int = 0):
+    # Yields the state after every chunk; the last one is the finished distribution
+    rows = np.arange(len(df))
+    if sample_rows is not None and sample_rows < len(df):
+        rows = np.sort(np.random.default_rng(seed).choice(len(df), size=sample_rows, replace=False))
+
+    state = new_state(kind, len(df), len(rows))
+    for start in range(0, len(rows), chunk_size):
+        chunk = df.iloc[rows[start:start + chunk_size]].reindex(columns=features, fill_value=0)
+        yield update_state(state, model.predict(chunk))
+    if len(rows) == 0:
+        yield state
+
+
+def get_distribution(model, kind: str, df: pd.DataFrame, features: list, model_version: str,
+                     data_version: str, sample_rows: int = None, on_progress=None,
+                     chunk_size: int = DEFAULT_CHUNK_SIZE):
+    # kind is "classifier" or "regressor"; on_progress(state) is called while scoring, at most
+    # every PROGRESS_INTERVAL seconds, and not at all when the result is already cached
+    key = f"{kind}-{model_version}-{data_version}-{sample_rows or 'all'}"
+    if key in _memory:
+        return _memory[key]
+
+    path = os.path.join(CACHE_DIR, f"{key}.pkl")
+    if os.path.exists(path):
+        state = pd.read_pickle(path)
+    else:
+        last_update = time.monotonic()
+        for state in iter_distribution(model, kind, df, features, chunk_size, sample_rows):
+            if on_progress is not None and time.monotonic() - last_update >= PROGRESS_INTERVAL:
+                on_progress(state)
+                last_update = time.monotonic()
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        pd.to_pickle(state, path + ".tmp")
+        os.replace(path + ".tmp", path)
+
+    with _lock:
+        _memory[key] = state
+    return state
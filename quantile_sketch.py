@@ -0,0 +1,112 @@
+import numpy as np
+
+# KLL-style mergeable quantile sketch (Karnin, Lang & Liberty, 2016).
+# Level h holds items of weight 2**h. When a level outgrows its capacity it is
+# sorted and every other item (random offset) is promoted to the next level, so
+# memory stays O(k log(n/k)) and the normalized rank error is roughly 1.7 / k.
+# Sketches built on separate chunks or workers can be merged in any order.
+
+DEFAULT_K = 400
+
+
+class QuantileSketch:
+    def __init__(self, k: int = DEFAULT_K, seed=None):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return self.n
+
+    def _capacity(self, level: int):
+        depth = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) <= self._capacity(level):
+                level += 1
+                continue
+
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            # Stable sort is fast on the already-sorted runs promoted from below
+            items = np.sort(items, kind="stable")
+            held_back = items[:len(items) % 2]
+            items = items[len(items) % 2:]
+            promoted = items[self._rng.integers(2)::2]
+
+            self.levels[level] = held_back
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            # Adding a level shrinks the capacities below it, so start over from the bottom
+            level = 0
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        self.n += len(values)
+
+        # Bulk insert: sort the batch once and halve it (random offset each time) until it
+        # fits a level; halving a sorted array keeps it sorted, so no further sorts are needed
+        values = np.sort(values)
+        level = 0
+        while len(values) > self._capacity(level):
+            if len(values) % 2:
+                self.levels[level] = np.concatenate([self.levels[level], values[:1]])
+                values = values[1:]
+            values = values[self._rng.integers(2)::2]
+            level += 1
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+        self.levels[level] = np.concatenate([self.levels[level], values])
+        self._compress()
+        return self
+
+    def merge(self, other: "QuantileSketch"):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def quantiles(self, qs):
+        if self.n == 0:
+            return np.full(len(np.atleast_1d(qs)), np.nan)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        items, cumulative = items[order], np.cumsum(weights[order])
+        ranks = np.atleast_1d(qs) * cumulative[-1]
+        positions = np.minimum(np.searchsorted(cumulative, ranks, side="left"), len(items) - 1)
+        return items[positions]
+
+    def quantile(self, q: float):
+        return float(self.quantiles([q])[0])
+
+    def iqr_bounds(self, whisker: float = 1.5):
+        q1, q3 = self.quantiles([0.25, 0.75])
+        iqr = q3 - q1
+        return float(q1 - whisker * iqr), float(q3 + whisker * iqr)
+
+
+def sketch_columns(df, columns, k: int = DEFAULT_K, seed=None):
+    # One sketch per column for a chunk; merge the dicts from several chunks with merge_sketches
+    return {col: QuantileSketch(k, seed).update(df[col].to_numpy()) for col in columns}
+
+
+def merge_sketches(sketch_dicts):
+    merged = {}
+    for sketches in sketch_dicts:
+        for col, sketch in sketches.items():
+            if col in merged:
+                merged[col].merge(sketch)
+            else:
+                merged[col] = sketch
+    return merged
@@ -0,0 +1,106 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# SMOTE-style oversampling that only does the work the caller needs.
+# imblearn's SMOTE finds the k nearest neighbours of every minority row over the
+# whole class before drawing any sample. Here the base rows are drawn first, each
+# class is split into leaves of a random-projection tree (median splits along
+# random directions, so leaves are balanced and nearby rows tend to share one),
+# and neighbours are searched only for the drawn rows, only inside their leaf,
+# with the leaves spread over a process pool. With one leaf per class the search
+# is exact; with several, rows near a leaf boundary get approximate neighbours.
+
+DEFAULT_K = 5
+PARTITION_SIZE = 20_000
+
+
+def class_targets(y, n_samples: int = None):
+    # n_samples=None balances up to the largest class, like SMOTE; otherwise
+    # n_samples rows are split evenly between the classes
+    classes, counts = np.unique(y, return_counts=True)
+    if n_samples is None:
+        targets = np.full(len(classes), counts.max())
+    else:
+        targets = np.full(len(classes), n_samples // len(classes))
+        targets[:n_samples % len(classes)] += 1
+    return classes, counts, targets
+
+
+def partition(X, partition_size: int, rng):
+    leaves, stack = [], [np.arange(len(X))]
+    while stack:
+        rows = stack.pop()
+        if len(rows) <= partition_size:
+            leaves.append(rows)
+            continue
+        order = np.argsort(X[rows] @ rng.standard_normal(X.shape[1]), kind="stable")
+        half = len(rows) // 2
+        stack += [rows[order[:half]], rows[order[half:]]]
+    return leaves
+
+
+def synthesize(part, bases, k: int, seed: int):
+    # New rows on the segment between each base row and one of its k nearest neighbours
+    from sklearn.neighbors import NearestNeighbors
+
+    base_rows = part[bases]
+    if len(part) == 1:
+        return base_rows.copy()
+
+    unique, inverse = np.unique(bases, return_inverse=True)
+    nn = NearestNeighbors(n_neighbors=min(k + 1, len(part))).fit(part)
+    neighbours = nn.kneighbors(part[unique], return_distance=False)[:, 1:]
+
+    rng = np.random.default_rng(seed)
+    chosen = neighbours[inverse, rng.integers(neighbours.shape[1], size=len(bases))]
+    gaps = rng.random((len(bases), 1))
+    return base_rows + gaps * (part[chosen] - base_rows)
+
+
+def rebalance(X, y, n_samples: int = None, k: int = DEFAULT_K,
+              partition_size: int = PARTITION_SIZE, workers: int = None, seed: int = 42):
+    X, y = np.asarray(X), np.asarray(y)
+    rng = np.random.default_rng(seed)
+    classes, counts, targets = class_targets(y, n_samples)
+
+    X_parts, y_parts, jobs = [], [], []
+    for cls, count, target in zip(classes, counts, targets):
+        rows = np.flatnonzero(y == cls)
+        if count >= target:
+            # Enough real rows: keep a random subset
+            rows = np.sort(rng.choice(rows, size=target, replace=False))
+            X_parts.append(X[rows])
+            y_parts.append(np.full(target, cls))
+            continue
+
+        X_class = X[rows]
+        X_parts.append(X_class)
+        y_parts.append(np.full(count, cls))
+
+        leaves = partition(X_class, partition_size, rng)
+        leaf_of = np.empty(count, dtype=np.int64)
+        position = np.empty(count, dtype=np.int64)
+        for i, leaf in enumerate(leaves):
+            leaf_of[leaf] = i
+            position[leaf] = np.arange(len(leaf))
+
+        bases = rng.integers(count, size=target - count)
+        for i, leaf in enumerate(leaves):
+            local = position[bases[leaf_of[bases] == i]]
+            if len(local):
+                jobs.append((cls, X_class[leaf], local, k, int(rng.integers(2**32))))
+
+    workers = workers or os.cpu_count()
+    if workers == 1 or len(jobs) <= 1:
+        results = [synthesize(*job[1:]) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+            results = list(executor.map(synthesize, *zip(*[job[1:] for job in jobs])))
+
+    for (cls, *_), synthetic in zip(jobs, results):
+        X_parts.append(synthetic.astype(X.dtype, copy=False))
+        y_parts.append(np.full(len(synthetic), cls))
+
+    return np.concatenate(X_parts), np.concatenate(y_parts)
@@ -0,0 +1,296 @@
+import argparse
+import hashlib
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+import model_registry
+from features import BASELINE_CATEGORIES, CAT_COLS, CATEGORICAL_MAP, FeatureTransform
+from registry_client import PINNED_MODELS, fetch_production, local_production, resolve_source
+from train_runner import CLASSIFICATION_EXPERIMENT, REGRESSION_EXPERIMENT, TRACKING_URI
+
+# Incremental refresh of the production XGBoost models from a new batch of labelled
+# applicants. The batch is checked against the saved feature list, scaler and label encoder,
+# encoded with the same FeatureTransform the app serves with (the scaler is not refitted),
+# and the current Production model.ubj keeps boosting for a few extra rounds on it. The result
+# is registered as a new model version only when it does no worse than the current model on
+# the holdout rows (a slice of the batch, plus an optional fixed holdout file). Nothing here
+# reads the historical data, so a refresh costs time in proportion to the batch.
+
+TARGETS = {"classification": "emi_eligibility", "regression": "max_monthly_emi"}
+MODELS = {
+    "classification": ("XGBoost_Classifier", CLASSIFICATION_EXPERIMENT),
+    "regression": ("XGBoost_Regressor", REGRESSION_EXPERIMENT),
+}
+
+# metric -> "higher"/"lower" is better; a refresh must not regress on any of them
+GATE_METRICS = {
+    "classification": {"f1_score": "higher", "log_loss": "lower"},
+    "regression": {"rmse": "lower", "mae": "lower"},
+}
+
+EXTRA_ROUNDS = 20
+LEARNING_RATE = 0.05
+HOLDOUT_FRACTION = 0.2
+
+
+# ------------------------
+# Batch checks
+# ------------------------
+def read_batch(path: str):
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path, low_memory=False)
+
+
+def file_sha1(path: str):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def validate_batch(df: pd.DataFrame, transform, label_encoder):
+    # Every input the transform reads and both targets must be present and usable
+    problems = []
+    missing = [col for col in transform.inputs + list(TARGETS.values()) if col not in df.columns]
+    if missing:
+        problems.append(f"missing columns {missing}")
+
+    numeric = [col for col in transform.inputs if col not in CAT_COLS and col in df.columns]
+    for col in numeric + [TARGETS["regression"]]:
+        if col not in df.columns:
+            continue
+        values = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)
+        bad = int((~np.isfinite(values)).sum())
+        if bad:
+            problems.append(f"{col}: {bad} missing or non-numeric values")
+
+    # Anything but a one-hot value or the baseline would silently encode as the baseline
+    for col in CAT_COLS:
+        if col in df.columns:
+            known = {*CATEGORICAL_MAP[col], BASELINE_CATEGORIES[col]}
+            unknown = sorted(set(df[col].dropna().astype(str)) - known)
+            if unknown:
+                problems.append(f"{col}: unknown categories {unknown}")
+            if df[col].isna().any():
+                problems.append(f"{col}: {int(df[col].isna().sum())} missing values")
+
+    label = TARGETS["classification"]
+    if label in df.columns:
+        unknown = sorted(set(df[label].dropna().astype(str)) - set(map(str, label_encoder.classes_)))
+        if unknown or df[label].isna().any():
+            problems.append(f"{label}: labels not in label_encoder.pkl {unknown or ['<missing>']}")
+
+    if problems:
+        raise ValueError(f"batch does not match the trained schema: {'; '.join(problems)}")
+
+
+def split_holdout(df: pd.DataFrame, fraction: float, seed: int):
+    rng = np.random.default_rng(seed)
+    holdout = rng.random(len(df)) < fraction
+    return df[~holdout], df[holdout]
+
+
+# ------------------------
+# Models
+# ------------------------
+def production_model(name: str, tracking_uri: str):
+    # (version label, local artifact directory) of the current Production version; the pinned
+    # model_registry artifact when the registry has none
+    try:
+        model = fetch_production(name, tracking_uri)
+    except Exception:
+        model = local_production(name)
+    if model is None:
+        return "pinned", PINNED_MODELS[name][1]
+    path = resolve_source(model.source)
+    if path is None:
+        # Artifacts outside the local roots (another store or a remote server): fetch a copy
+        import mlflow.artifacts
+        path = mlflow.artifacts.download_artifacts(artifact_uri=model.source, tracking_uri=tracking_uri)
+    return model.version, path
+
+
+def continue_boosting(model, X: np.ndarray, y: np.ndarray, rounds: int, learning_rate: float, threads: int):
+    # A new sklearn-wrapped model with `rounds` more trees fitted to (X, y); `model` is untouched.
+    # Low-level xgb.train, so a batch may lack some classes without changing num_class.
+    import xgboost as xgb
+
+    booster = model.get_booster()
+    dtrain = xgb.DMatrix(X, label=y, feature_names=booster.feature_names, nthread=threads)
+    params = {"eta": learning_rate, "nthread": threads, "seed": 42}
+    refreshed = xgb.train(params, dtrain, num_boost_round=rounds, xgb_model=booster.copy())
+
+    result = type(model)()
+    result.load_model(bytearray(refreshed.save_raw("ubj")))
+    return result
+
+
+def holdout_metrics(task: str, model, X: pd.DataFrame, y: np.ndarray, n_classes: int = None):
+    from sklearn import metrics as m
+
+    if task == "classification":
+        labels = np.arange(n_classes)
+        return {
+            "accuracy": m.accuracy_score(y, model.predict(X)),
+            "f1_score": m.f1_score(y, model.predict(X), labels=labels, average="macro", zero_division=0),
+            "log_loss": m.log_loss(y, model.predict_proba(X), labels=labels),
+        }
+    y_pred = model.predict(X)
+    return {
+        "rmse": float(np.sqrt(m.mean_squared_error(y, y_pred))),
+        "mae": m.mean_absolute_error(y, y_pred),
+        "r2": m.r2_score(y, y_pred),
+    }
+
+
+def regressions(task: str, before: dict, after: dict, tolerance: float):
+    # Gate metrics the refreshed model is worse on, beyond a relative tolerance
+    worse = []
+    for name, better in GATE_METRICS[task].items():
+        slack = abs(before[name]) * tolerance
+        if (after[name] < before[name] - slack) if better == "higher" else (after[name] > before[name] + slack):
+            worse.append(name)
+    return worse
+
+
+# ------------------------
+# Refresh
+# ------------------------
+def refresh(batch_path: str, holdout_path: str = None, rounds: int = EXTRA_ROUNDS,
+            learning_rate: float = LEARNING_RATE, holdout_fraction: float = HOLDOUT_FRACTION,
+            tolerance: float = 0.0, tasks=None, tracking_uri: str = TRACKING_URI, register: bool = True,
+            promote: bool = False, threads: int = None, seed: int = 42):
+    import mlflow
+    import mlflow.xgboost
+
+    threads = threads or os.cpu_count() or 1
+    timings = {}
+    start = time.perf_counter()
+    # Checks trained_features.csv against features.py and the scaler
+    transform = FeatureTransform(model_registry.get("trained_features"), model_registry.get("scaler"))
+    label_encoder = model_registry.get("label_encoder")
+
+    batch = read_batch(batch_path)
+    validate_batch(batch, transform, label_encoder)
+    train, holdouts = split_holdout(batch, holdout_fraction, seed)
+    holdouts = {"batch_holdout": holdouts}
+    if holdout_path:
+        fixed = read_batch(holdout_path)
+        validate_batch(fixed, transform, label_encoder)
+        holdouts["fixed_holdout"] = fixed
+    if len(train) == 0 or any(len(h) == 0 for h in holdouts.values()):
+        raise ValueError("batch too small to split into training and holdout rows")
+    timings["validate"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    X_train = transform.matrix(train)
+    X_holdout = {key: transform.frame(h) for key, h in holdouts.items()}
+    timings["transform"] = time.perf_counter() - start
+
+    os.environ.setdefault("MLFLOW_ALLOW_FILE_STORE", "true")
+    mlflow.set_tracking_uri(tracking_uri)
+    batch_hash = file_sha1(batch_path)
+    n_classes = len(label_encoder.classes_)
+    outcomes = {}
+
+    for task in tasks or list(TARGETS):
+        name, experiment = MODELS[task]
+        target = TARGETS[task]
+
+        def encode(df):
+            if task == "classification":
+                return label_encoder.transform(df[target].astype(str))
+            return pd.to_numeric(df[target]).to_numpy(dtype=float)
+
+        start = time.perf_counter()
+        version, path = production_model(name, tracking_uri)
+        current = mlflow.xgboost.load_model(path)
+        refreshed = continue_boosting(current, X_train, encode(train), rounds, learning_rate, threads)
+        timings[f"{task}.train"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        before, after, worse = {}, {}, []
+        for key, X in X_holdout.items():
+            y = encode(holdouts[key])
+            before[key] = holdout_metrics(task, current, X, y, n_classes)
+            after[key] = holdout_metrics(task, refreshed, X, y, n_classes)
+            worse += [f"{key}.{metric}" for metric in regressions(task, before[key], after[key], tolerance)]
+        timings[f"{task}.evaluate"] = time.perf_counter() - start
+
+        outcome = {"base_version": version, "before": before, "after": after, "regressed": worse,
+                   "registered_version": None}
+        if register and not worse:
+            start = time.perf_counter()
+            mlflow.set_experiment(experiment)
+            with mlflow.start_run(run_name=f"{name}_refresh") as run:
+                mlflow.set_tags({"task": task, "model_type": "XGBoost", "refresh.base_version": version,
+                                 "refresh.base_source": path, "refresh.batch_sha1": batch_hash})
+                mlflow.log_params({"extra_rounds": rounds, "learning_rate": learning_rate,
+                                   "batch_rows": len(train), "holdout_fraction": holdout_fraction})
+                for key in before:
+                    mlflow.log_metrics({f"{key}.{metric}": float(value) for metric, value in after[key].items()})
+                    mlflow.log_metrics({f"{key}.base_{metric}": float(value) for metric, value in before[key].items()})
+                info = mlflow.xgboost.log_model(refreshed, name=name, model_format="ubj",
+                                                registered_model_name=name)
+                outcome["run_id"] = run.info.run_id
+            outcome["registered_version"] = str(info.registered_model_version)
+            if promote:
+                from mlflow.tracking import MlflowClient
+                MlflowClient(tracking_uri).transition_model_version_stage(
+                    name, outcome["registered_version"], "Production", archive_existing_versions=True)
+            timings[f"{task}.register"] = time.perf_counter() - start
+        outcomes[task] = outcome
+
+    return {"rows": len(train), "holdout_rows": {k: len(h) for k, h in holdouts.items()},
+            "outcomes": outcomes, "timings": timings}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Continue boosting the Production models on a new labelled batch")
+    parser.add_argument("batch", help="CSV or Parquet of labelled applicants (raw dataset columns)")
+    parser.add_argument("tasks", nargs="*", help=f"models to refresh (default: {', '.join(TARGETS)})")
+    parser.add_argument("--holdout", help="fixed labelled holdout file, checked in addition to the batch slice")
+    parser.add_argument("--holdout-fraction", type=float, default=HOLDOUT_FRACTION)
+    parser.add_argument("--rounds", type=int, default=EXTRA_ROUNDS, help="boosting rounds added to the model")
+    parser.add_argument("--learning-rate", type=float, default=LEARNING_RATE)
+    parser.add_argument("--tolerance", type=float, default=0.0,
+                        help="relative slack before a holdout metric counts as a regression")
+    parser.add_argument("--tracking-uri", default=TRACKING_URI)
+    parser.add_argument("--dry-run", action="store_true", help="evaluate only, register nothing")
+    parser.add_argument("--promote", action="store_true", help="move a registered version to Production")
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    unknown = set(args.tasks) - set(TARGETS)
+    if unknown:
+        parser.error(f"unknown task(s): {', '.join(sorted(unknown))}")
+
+    result = refresh(args.batch, args.holdout, args.rounds, args.learning_rate, args.holdout_fraction,
+                     args.tolerance, args.tasks, args.tracking_uri, not args.dry_run, args.promote,
+                     args.threads, args.seed)
+
+    print(f"Batch: {result['rows']:,} training rows, holdout {result['holdout_rows']}")
+    for task, outcome in result["outcomes"].items():
+        print(f"{MODELS[task][0]} (from version {outcome['base_version']}):")
+        for key in outcome["before"]:
+            summary = ", ".join(f"{metric} {outcome['before'][key][metric]:.4f} -> {value:.4f}"
+                                for metric, value in outcome["after"][key].items())
+            print(f"  {key}: {summary}")
+        if outcome["regressed"]:
+            print(f"  not registered: worse on {', '.join(outcome['regressed'])}")
+        elif outcome["registered_version"]:
+            print(f"  registered version {outcome['registered_version']} (run {outcome['run_id']})"
+                  f"{', promoted to Production' if args.promote else ''}")
+        else:
+            print("  no regression (dry run, not registered)")
+    print("Timings: " + ", ".join(f"{step} {seconds:.2f}s" for step, seconds in result["timings"].items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+import glob
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+import model_registry
+from instrumentation import count, stage
+from run_index import parse_run
+
+# Production-version lookups for the registered models, without blocking the pages.
+# Lookups for several models run concurrently on a small thread pool and are cached
+# for TTL seconds. Once an entry is older than that it is still served while a
+# background refresh runs. If the tracking server does not answer within TIMEOUT
+# seconds, fails, or has no Production version of the model (e.g. a fresh sqlite:///mlflow.db),
+# the registry files under mlruns/models are read instead.
+
+MLRUNS_DIR = "mlruns"
+ARTIFACT_ROOTS = ["mlartifacts", "mlruns"]
+TTL = float(os.environ.get("EMI_REGISTRY_TTL", 300))
+TIMEOUT = float(os.environ.get("EMI_REGISTRY_TIMEOUT", 3))
+
+# registered model -> (model_registry artifact, pinned artifact directory)
+PINNED_MODELS = {
+    "XGBoost_Classifier": ("classification_model", model_registry.CLASSIFIER_URI),
+    "XGBoost_Regressor": ("regression_model", model_registry.REGRESSOR_URI),
+}
+
+
+@dataclass
+class ProductionModel:
+    name: str
+    version: str
+    run_id: str
+    source: str
+    metrics: dict = field(default_factory=dict)
+    params: dict = field(default_factory=dict)
+    origin: str = "tracking server"
+
+
+# ------------------------
+# Lookups
+# ------------------------
+def fetch_production(name: str, tracking_uri: str = None):
+    from mlflow.tracking import MlflowClient
+
+    client = MlflowClient(tracking_uri)
+    versions = client.search_model_versions(f"name='{name}'")
+    prod_models = [v for v in versions if v.current_stage == "Production"]
+    if not prod_models:
+        return None
+
+    latest = max(prod_models, key=lambda v: int(v.version))
+    run = client.get_run(latest.run_id)
+    return ProductionModel(name, str(latest.version), latest.run_id, latest.source,
+                           dict(run.data.metrics), dict(run.data.params))
+
+
+def local_production(name: str, mlruns_dir: str = MLRUNS_DIR):
+    # Same answer from the file store: mlruns/models/<name>/version-N/meta.yaml and the run directory
+    import yaml
+
+    prod_models = []
+    for path in glob.glob(os.path.join(mlruns_dir, "models", name, "version-*", "meta.yaml")):
+        try:
+            with open(path) as f:
+                meta = yaml.safe_load(f)
+        except (OSError, yaml.YAMLError):
+            continue
+        if isinstance(meta, dict) and meta.get("current_stage") == "Production":
+            prod_models.append(meta)
+    if not prod_models:
+        return None
+
+    latest = max(prod_models, key=lambda meta: int(meta["version"]))
+    run_id = latest.get("run_id", "")
+    metrics, params = {}, {}
+    run_dirs = glob.glob(os.path.join(mlruns_dir, "*", run_id)) if run_id else []
+    if run_dirs:
+        experiment_id = os.path.basename(os.path.dirname(run_dirs[0]))
+        _, _, latest_metrics, run_params, _ = parse_run(run_id, experiment_id, run_dirs[0], "")
+        metrics = {key: value for _, key, value in latest_metrics}
+        params = {key: value for _, key, value in run_params}
+
+    return ProductionModel(name, str(latest["version"]), run_id, latest.get("source", ""),
+                           metrics, params, origin="local mlruns")
+
+
+def resolve_source(source: str):
+    # Local artifact directory for a model version's source URI, or None
+    if not source:
+        return None
+    if source.startswith("models:/m-"):
+        model_id = source[len("models:/"):].strip("/")
+        patterns = [os.path.join(root, "*", "models", model_id, "artifacts") for root in ARTIFACT_ROOTS]
+    elif source.startswith("runs:/"):
+        run_id, _, path = source[len("runs:/"):].partition("/")
+        patterns = [os.path.join(root, "*", run_id, "artifacts", path) for root in ARTIFACT_ROOTS]
+    elif source.startswith("mlflow-artifacts:/"):
+        patterns = [os.path.join("mlartifacts", source[len("mlflow-artifacts:/"):].lstrip("/"))]
+    else:
+        patterns = [source[len("file://"):] if source.startswith("file://") else source]
+
+    for pattern in patterns:
+        for path in glob.glob(pattern):
+            if os.path.exists(os.path.join(path, "MLmodel")):
+                return path
+    return None
+
+
+# ------------------------
+# Client
+# ------------------------
+class RegistryClient:
+    def __init__(self, tracking_uri: str = None, ttl: float = TTL, timeout: float = TIMEOUT,
+                 mlruns_dir: str = MLRUNS_DIR):
+        self.tracking_uri = tracking_uri
+        self.ttl = ttl
+        self.timeout = timeout
+        self.mlruns_dir = mlruns_dir
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="registry")
+        self._lock = threading.Lock()
+        self._cache = {}      # name -> (fetched_at, ProductionModel or None)
+        self._inflight = {}   # name -> Future, at most one lookup per model at a time
+
+    def _lookup(self, name: str):
+        try:
+            try:
+                with stage("registry.fetch"):
+                    model = fetch_production(name, self.tracking_uri)
+            except Exception:
+                count("registry.fetch_failed")
+                model = None
+            if model is None:
+                # Failed, or an empty store answered: the file store may still have the model
+                with stage("registry.local"):
+                    model = local_production(name, self.mlruns_dir)
+            with self._lock:
+                self._cache[name] = (time.monotonic(), model)
+            return model
+        finally:
+            with self._lock:
+                self._inflight.pop(name, None)
+
+    def _submit(self, name: str):
+        with self._lock:
+            future = self._inflight.get(name)
+            if future is None:
+                future = self._executor.submit(self._lookup, name)
+                self._inflight[name] = future
+            return future
+
+    def production(self, names):
+        # {name: ProductionModel or None}; waits at most `timeout` seconds in total
+        now = time.monotonic()
+        results, pending = {}, {}
+        with self._lock:
+            entries = {name: self._cache.get(name) for name in names}
+        for name, cached in entries.items():
+            if cached is None:
+                pending[name] = self._submit(name)
+                continue
+            results[name] = cached[1]
+            if now - cached[0] > self.ttl:
+                self._submit(name)  # stale: serve it, refresh in the background
+
+        if pending:
+            done, _ = wait(pending.values(), timeout=self.timeout)
+            for name, future in pending.items():
+                if future in done and future.exception() is None:
+                    results[name] = future.result()
+                else:
+                    # Tracking server too slow: answer from the files now; the lookup keeps
+                    # running and replaces this entry when it finishes
+                    count("registry.timeout_fallback")
+                    with stage("registry.local"):
+                        results[name] = local_production(name, self.mlruns_dir)
+                    with self._lock:
+                        self._cache.setdefault(name, (time.monotonic(), results[name]))
+        return results
+
+    def artifact_name(self, name: str):
+        # The model_registry entry the Production version loads under: the pinned artifact when
+        # the registry has no Production version, its files are not local, or it is the pinned one
+        artifact, pinned_path = PINNED_MODELS[name]
+        model = self.production([name])[name]
+        path = resolve_source(model.source) if model is not None else None
+        if path is None or os.path.realpath(path) == os.path.realpath(pinned_path):
+            return artifact, None
+        return f"{name} v{model.version}", path
+
+    def load_model(self, name: str):
+        # The Production version's model, through model_registry's cache
+        artifact, path = self.artifact_name(name)
+        if path is None:
+            return model_registry.get(artifact)
+        return model_registry.load(artifact, path, model_registry.load_pyfunc)
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_client():
+    # One client per process, shared by every page and session
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = RegistryClient()
+        return _default
@@ -0,0 +1,248 @@
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+# SQLite index over the file-based MLflow store (mlruns/<experiment_id>/<run_id>/...).
+# refresh() only stats each run (its directory, meta.yaml and the metrics/params/tags
+# directories) and re-parses the runs whose signature changed, plus runs still
+# RUNNING or SCHEDULED, whose metric files can grow without any directory changing. Big batches
+# of new runs are parsed in a process pool. The full metric history is stored, and
+# the value at the last step of each metric is kept in its own table for the page.
+
+MLRUNS_DIR = "mlruns"
+INDEX_PATH = os.path.join(".cache", "run_index.sqlite")
+PARALLEL_THRESHOLD = 64
+# mlflow.entities.RunStatus: RUNNING = 1, SCHEDULED = 2 (FINISHED, FAILED and KILLED are final);
+# statuses are stored as text
+RUNNING_STATUSES = {"1", "2", "RUNNING", "SCHEDULED"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY, experiment_id TEXT, run_name TEXT, status TEXT,
+    lifecycle_stage TEXT, start_time INTEGER, end_time INTEGER, signature TEXT
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id TEXT, key TEXT, value REAL, timestamp INTEGER, step INTEGER
+);
+CREATE TABLE IF NOT EXISTS latest_metrics (run_id TEXT, key TEXT, value REAL);
+CREATE TABLE IF NOT EXISTS params (run_id TEXT, key TEXT, value TEXT);
+CREATE TABLE IF NOT EXISTS tags (run_id TEXT, key TEXT, value TEXT);
+CREATE INDEX IF NOT EXISTS runs_experiment ON runs (experiment_id);
+CREATE INDEX IF NOT EXISTS metrics_run ON metrics (run_id, key);
+CREATE INDEX IF NOT EXISTS latest_metrics_run ON latest_metrics (run_id);
+CREATE INDEX IF NOT EXISTS params_run ON params (run_id);
+CREATE INDEX IF NOT EXISTS tags_run ON tags (run_id);
+"""
+
+_lock = threading.Lock()
+
+
+def connect(index_path: str = INDEX_PATH):
+    os.makedirs(os.path.dirname(index_path) or ".", exist_ok=True)
+    conn = sqlite3.connect(index_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+# ------------------------
+# Scanning
+# ------------------------
+def run_signature(run_path: str):
+    parts = []
+    for sub in ("", "meta.yaml", "metrics", "params", "tags"):
+        try:
+            stat = os.stat(os.path.join(run_path, sub))
+            parts.append(f"{stat.st_mtime_ns}:{stat.st_size}")
+        except FileNotFoundError:
+            parts.append("-")
+    return "|".join(parts)
+
+
+def scan(root: str = MLRUNS_DIR):
+    # {run_id: (experiment_id, run_path, signature)} for every run directory under root
+    runs = {}
+    if not os.path.isdir(root):
+        return runs
+    for experiment in os.scandir(root):
+        if not experiment.is_dir() or not os.path.exists(os.path.join(experiment.path, "meta.yaml")):
+            continue
+        for run in os.scandir(experiment.path):
+            # run directories are the ones with their own meta.yaml (skips models/, tags/)
+            if run.is_dir() and os.path.exists(os.path.join(run.path, "meta.yaml")):
+                runs[run.name] = (experiment.name, run.path, run_signature(run.path))
+    return runs
+
+
+# ------------------------
+# Parsing (one run)
+# ------------------------
+def _read_dir(path: str):
+    values = {}
+    if os.path.isdir(path):
+        for entry in os.scandir(path):
+            if entry.is_file():
+                with open(entry.path) as f:
+                    values[entry.name] = f.read()
+    return values
+
+
+def _load_yaml(path: str):
+    import yaml
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    try:
+        with open(path) as f:
+            meta = yaml.load(f, Loader=loader)
+    except (OSError, yaml.YAMLError):
+        return {}
+    return meta if isinstance(meta, dict) else {}
+
+
+def parse_run(run_id: str, experiment_id: str, run_path: str, signature: str):
+    meta = _load_yaml(os.path.join(run_path, "meta.yaml"))
+    tags = _read_dir(os.path.join(run_path, "tags"))
+    params = _read_dir(os.path.join(run_path, "params"))
+
+    metrics, latest = [], {}
+    for key, text in _read_dir(os.path.join(run_path, "metrics")).items():
+        # one "timestamp value [step]" line per logged value
+        for line in text.splitlines():
+            fields = line.split()
+            try:
+                timestamp, value = int(fields[0]), float(fields[1])
+                step = int(fields[2]) if len(fields) > 2 else 0
+            except (IndexError, ValueError):
+                continue
+            metrics.append((run_id, key, value, timestamp, step))
+            if key not in latest or (step, timestamp) >= latest[key][:2]:
+                latest[key] = (step, timestamp, value)
+
+    run = (
+        run_id, experiment_id,
+        meta.get("run_name") or tags.get("mlflow.runName") or run_id,
+        str(meta.get("status", "")), meta.get("lifecycle_stage"),
+        meta.get("start_time"), meta.get("end_time"), signature,
+    )
+    return (
+        run, metrics,
+        [(run_id, key, value) for key, (_, _, value) in latest.items()],
+        [(run_id, key, value) for key, value in params.items()],
+        [(run_id, key, value) for key, value in tags.items()],
+    )
+
+
+# ------------------------
+# Index maintenance
+# ------------------------
+def refresh(root: str = MLRUNS_DIR, index_path: str = INDEX_PATH, workers: int = None):
+    start = time.perf_counter()
+    with _lock:
+        conn = connect(index_path)
+        try:
+            on_disk = scan(root)
+            indexed = {run_id: (signature, status) for run_id, signature, status
+                       in conn.execute("SELECT run_id, signature, status FROM runs")}
+
+            stale = [
+                (run_id, experiment_id, path, signature)
+                for run_id, (experiment_id, path, signature) in on_disk.items()
+                if run_id not in indexed
+                or indexed[run_id][0] != signature
+                or indexed[run_id][1] in RUNNING_STATUSES
+            ]
+            removed = [run_id for run_id in indexed if run_id not in on_disk]
+
+            workers = workers or os.cpu_count() or 1
+            if workers > 1 and len(stale) >= PARALLEL_THRESHOLD:
+                # spawn: the dashboard process is multi-threaded, so avoid forking it
+                context = multiprocessing.get_context("spawn")
+                with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+                    parsed = list(executor.map(parse_run, *zip(*stale), chunksize=16))
+            else:
+                parsed = [parse_run(*args) for args in stale]
+
+            with conn:
+                for run_id in removed + [args[0] for args in stale]:
+                    for table in ("runs", "metrics", "latest_metrics", "params", "tags"):
+                        conn.execute(f"DELETE FROM {table} WHERE run_id = ?", (run_id,))
+                for run, metrics, latest, params, tags in parsed:
+                    conn.execute("INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?)", run)
+                    conn.executemany("INSERT INTO metrics VALUES (?, ?, ?, ?, ?)", metrics)
+                    conn.executemany("INSERT INTO latest_metrics VALUES (?, ?, ?)", latest)
+                    conn.executemany("INSERT INTO params VALUES (?, ?, ?)", params)
+                    conn.executemany("INSERT INTO tags VALUES (?, ?, ?)", tags)
+        finally:
+            conn.close()
+
+    return {"runs": len(on_disk), "parsed": len(stale), "removed": len(removed),
+            "seconds": time.perf_counter() - start}
+
+
+# ------------------------
+# Queries
+# ------------------------
+def query(sql: str, params=(), index_path: str = INDEX_PATH):
+    conn = connect(index_path)
+    try:
+        return pd.read_sql_query(sql, conn, params=params)
+    finally:
+        conn.close()
+
+
+def latest_metrics(experiment_id: str, index_path: str = INDEX_PATH):
+    # One row per run: Run ID, Model and the last logged value of each metric
+    df = query("""
+        SELECT r.run_id AS "Run ID", r.run_name AS Model, m.key, m.value
+        FROM runs r JOIN latest_metrics m ON m.run_id = r.run_id
+        WHERE r.experiment_id = ?
+    """, (str(experiment_id),), index_path)
+    if df.empty:
+        return pd.DataFrame()
+    wide = df.pivot(index=["Run ID", "Model"], columns="key", values="value")
+    wide.columns.name = None
+    return wide.reset_index()
+
+
+def metric_history(run_id: str, key: str, index_path: str = INDEX_PATH):
+    return query("SELECT step, timestamp, value FROM metrics WHERE run_id = ? AND key = ? "
+                 "ORDER BY step, timestamp", (run_id, key), index_path)
+
+
+def run_params(experiment_id: str, index_path: str = INDEX_PATH):
+    df = query("SELECT r.run_id AS \"Run ID\", p.key, p.value FROM runs r "
+               "JOIN params p ON p.run_id = r.run_id WHERE r.experiment_id = ?",
+               (str(experiment_id),), index_path)
+    if df.empty:
+        return pd.DataFrame()
+    wide = df.pivot(index="Run ID", columns="key", values="value")
+    wide.columns.name = None
+    return wide.reset_index()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or update the SQLite index of mlruns/")
+    parser.add_argument("--root", default=MLRUNS_DIR)
+    parser.add_argument("--index", default=INDEX_PATH)
+    parser.add_argument("--rebuild", action="store_true", help="delete the index and parse every run again")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.rebuild:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(args.index + suffix):
+                os.remove(args.index + suffix)
+
+    report = refresh(args.root, args.index, args.workers)
+    print(f"{report['runs']} runs, {report['parsed']} parsed, {report['removed']} removed "
+          f"in {report['seconds']:.2f}s -> {args.index}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import pandas as pd
+import numpy as np
+from dataclasses import dataclass
+
+from instrumentation import count, stage
+
+# Feature definitions live in features.py (shared with train_runner)
+from features import derive, one_hot, transform_for
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+
+@dataclass
+class ScoringArtifacts:
+    trained_features: list
+    scaler: object
+    label_encoder: object
+    classification_model: object
+    regression_model: object
+
+
+# ------------------------
+# Single-row path (form submit)
+# ------------------------
+def compute_features(user_input: dict):
+    # Raw inputs plus every engineered column, as a dict (one applicant, unscaled)
+    features = dict(user_input)
+    features.update(derive(user_input.get))
+    features.update(one_hot(user_input.get))
+    return features
+
+
+def prepare_single(user_input: dict, artifacts: ScoringArtifacts):
+    with stage("features.transform"):
+        return transform_for(artifacts).frame_one(user_input)
+
+
+# ------------------------
+# Vectorized batch path
+# ------------------------
+def prepare_batch(df: pd.DataFrame, artifacts: ScoringArtifacts):
+    with stage("batch.features.transform"):
+        return transform_for(artifacts).frame(df)
+
+
+def _to_frame(data):
+    # Arrow tables (and anything else exposing to_pandas) are converted once up front
+    if isinstance(data, pd.DataFrame):
+        return data
+    if hasattr(data, "to_pandas"):
+        return data.to_pandas()
+    return pd.DataFrame(data)
+
+
+def score_batch(data, artifacts: ScoringArtifacts, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    with stage("score_batch"):
+        return _score_batch(_to_frame(data), artifacts, chunk_size)
+
+
+def _score_batch(df: pd.DataFrame, artifacts: ScoringArtifacts, chunk_size: int):
+    results = []
+
+    for start in range(0, len(df), chunk_size):
+        chunk = df.iloc[start:start + chunk_size]
+        features_df = prepare_batch(chunk, artifacts)
+
+        with stage("batch.predict.classifier"):
+            pred_class_encoded = artifacts.classification_model.predict(features_df)
+        with stage("batch.predict.regressor"):
+            pred_emi = artifacts.regression_model.predict(features_df)
+        with stage("batch.predict.label_decode"):
+            pred_class = artifacts.label_encoder.inverse_transform(np.asarray(pred_class_encoded))
+
+        results.append(pd.DataFrame({
+            "emi_eligibility": pred_class,
+            "max_monthly_emi": np.asarray(pred_emi),
+        }, index=chunk.index))
+        count("rows_scored.batch", len(chunk))
+
+    if not results:
+        return pd.DataFrame({"emi_eligibility": [], "max_monthly_emi": []})
+    return pd.concat(results)
+
+
+def score_one(user_input: dict, artifacts: ScoringArtifacts):
+    with stage("score_one"):
+        features_df = prepare_single(user_input, artifacts)
+        with stage("predict.classifier"):
+            pred_class_encoded = artifacts.classification_model.predict(features_df)
+        with stage("predict.label_decode"):
+            pred_class = artifacts.label_encoder.inverse_transform(np.asarray(pred_class_encoded))
+        with stage("predict.regressor"):
+            pred_emi = artifacts.regression_model.predict(features_df)
+    count("rows_scored.single")
+    return pred_class[0], float(np.asarray(pred_emi)[0])
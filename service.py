@@ -0,0 +1,317 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import deque
+
+import numpy as np
+
+import instrumentation
+import model_registry
+import prediction_cache
+from features import CAT_COLS, transform_for
+
+# ------------------------
+# Configuration (env vars or CLI flags)
+# ------------------------
+MAX_BATCH_SIZE = int(os.environ.get("EMI_MAX_BATCH_SIZE", 64))
+MAX_WAIT_MS = float(os.environ.get("EMI_MAX_WAIT_MS", 2.0))
+LATENCY_WINDOW = 10_000
+
+
+# ------------------------
+# Latency and throughput counters
+# ------------------------
+class ServiceStats:
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.latencies_ms = deque(maxlen=window)
+        self.batch_sizes = deque(maxlen=window)
+        self.started_at = time.time()
+        self.requests = 0
+        self.rows = 0
+        self.batches = 0
+        self.errors = 0
+
+    def record_request(self, latency_ms: float, rows: int):
+        self.requests += 1
+        self.rows += rows
+        self.latencies_ms.append(latency_ms)
+
+    def record_batch(self, rows: int):
+        self.batches += 1
+        self.batch_sizes.append(rows)
+
+    def snapshot(self):
+        uptime = time.time() - self.started_at
+        latencies = np.fromiter(self.latencies_ms, dtype=float)
+        p50, p99 = np.percentile(latencies, [50, 99]) if len(latencies) else (0.0, 0.0)
+        return {
+            "uptime_seconds": uptime,
+            "requests": self.requests,
+            "rows": self.rows,
+            "batches": self.batches,
+            "errors": self.errors,
+            "requests_per_second": self.requests / uptime if uptime else 0.0,
+            "rows_per_second": self.rows / uptime if uptime else 0.0,
+            "latency_p50_ms": float(p50),
+            "latency_p99_ms": float(p99),
+            "mean_batch_size": float(np.mean(self.batch_sizes)) if self.batch_sizes else 0.0,
+        }
+
+
+# ------------------------
+# Scoring (runs in the executor)
+# ------------------------
+class InvalidRequest(ValueError):
+    # An applicant lacks fields the models read, or has one of the wrong type (answered with 422)
+    pass
+
+
+def field_problems(records: list, inputs: list):
+    # {applicant index: {"missing": [...], "invalid": [...]}}. Numeric inputs must be JSON
+    # numbers and categoricals strings: anything else would fail inside the transform
+    problems = {}
+    for i, record in enumerate(records):
+        missing, invalid = [], []
+        for name in inputs:
+            if name not in record:
+                missing.append(name)
+            elif name in CAT_COLS:
+                if not isinstance(record[name], str):
+                    invalid.append(name)
+            elif isinstance(record[name], bool) or not isinstance(record[name], (int, float)):
+                invalid.append(name)
+        if missing or invalid:
+            problems[i] = {key: names for key, names in (("missing", missing), ("invalid", invalid)) if names}
+    return problems
+
+
+def score_requests(requests: list):
+    # One batch of requests (each a list of applicants) against one set of artifacts. The lookup
+    # runs here, off the event loop, since a changed model file means a reload. A request with
+    # missing or malformed fields gets an InvalidRequest in its place; the others are scored
+    # together. Should that still fail, each request is scored alone, so the exception only
+    # reaches the request that raised it.
+    artifacts = model_registry.get_artifacts()
+    inputs = transform_for(artifacts).inputs
+    outcomes, valid = [], []
+    for records in requests:
+        problems = field_problems(records, inputs)
+        outcomes.append(InvalidRequest(problems) if problems else None)
+        if not problems:
+            valid.extend(records)
+    if not valid:
+        return outcomes
+
+    try:
+        results = iter(prediction_cache.score_records_cached(valid, artifacts))
+        return [outcome or [next(results) for _ in records] for outcome, records in zip(outcomes, requests)]
+    except Exception:
+        return [outcome or _score_alone(records, artifacts) for outcome, records in zip(outcomes, requests)]
+
+
+def _score_alone(records: list, artifacts):
+    try:
+        return prediction_cache.score_records_cached(records, artifacts)
+    except Exception as e:
+        return e
+
+
+# ------------------------
+# Micro-batching
+# ------------------------
+class MicroBatcher:
+    # Collects concurrent requests for up to max_wait_ms (or max_batch_size rows)
+    # and scores them with a single score_batch call (inputs seen before come from the
+    # prediction cache).
+
+    def __init__(self, stats: ServiceStats, max_batch_size: int = MAX_BATCH_SIZE,
+                 max_wait_ms: float = MAX_WAIT_MS):
+        self.stats = stats
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.queue = None
+        self.worker = None
+
+    def start(self):
+        self.queue = asyncio.Queue()
+        self.worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.worker is not None:
+            self.worker.cancel()
+
+    async def submit(self, records: list):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((records, future))
+        return await future
+
+    async def _collect(self):
+        pending = [await self.queue.get()]
+        rows = len(pending[0][0])
+        deadline = time.monotonic() + self.max_wait
+
+        while rows < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self.queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            pending.append(item)
+            rows += len(item[0])
+        return pending, rows
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending, rows = await self._collect()
+            try:
+                outcomes = await loop.run_in_executor(
+                    None, score_requests, [request_records for request_records, _ in pending]
+                )
+            except Exception as e:
+                self.stats.errors += len(pending)
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.stats.record_batch(rows)
+            for (_, future), outcome in zip(pending, outcomes):
+                if future.done():
+                    continue
+                if isinstance(outcome, Exception):
+                    if not isinstance(outcome, InvalidRequest):
+                        self.stats.errors += 1
+                    future.set_exception(outcome)
+                else:
+                    future.set_result([{"emi_eligibility": label, "max_monthly_emi": emi} for label, emi in outcome])
+
+
+# ------------------------
+# ASGI application
+# ------------------------
+class PredictionService:
+    def __init__(self, max_batch_size: int = MAX_BATCH_SIZE, max_wait_ms: float = MAX_WAIT_MS):
+        self.stats = ServiceStats()
+        self.batcher = MicroBatcher(self.stats, max_batch_size, max_wait_ms)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                # Load the artifacts before accepting traffic so the first request is not slow
+                await asyncio.get_running_loop().run_in_executor(None, model_registry.get_artifacts)
+                self.batcher.start()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.batcher.stop()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _http(self, scope, receive, send):
+        method, path = scope["method"], scope["path"].rstrip("/")
+
+        if method == "GET" and path == "/health":
+            return await _respond(send, 200, {"status": "ok"})
+        if method == "GET" and path == "/metrics":
+            return await _respond(send, 200, {**self.stats.snapshot(),
+                                              "prediction_cache": prediction_cache.default_cache().stats()})
+        if method == "GET" and path == "/metrics/prometheus":
+            return await _respond_text(send, 200, instrumentation.prometheus_text())
+        if method == "GET" and path == "/metrics/stages":
+            return await _respond(send, 200, instrumentation.snapshot())
+        if method != "POST" or path not in ("/predict", "/predict/batch"):
+            return await _respond(send, 404, {"error": f"no route for {method} {scope['path']}"})
+
+        start = time.perf_counter()
+        try:
+            payload = json.loads(await _read_body(receive) or b"null")
+        except ValueError as e:
+            return await _respond(send, 400, {"error": f"invalid JSON: {e}"})
+
+        if path == "/predict":
+            if not isinstance(payload, dict):
+                return await _respond(send, 400, {"error": "expected one applicant object"})
+            records = [payload]
+        else:
+            records = payload.get("applicants") if isinstance(payload, dict) else payload
+            if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+                return await _respond(send, 400, {"error": "expected a list of applicant objects"})
+            if not records:
+                return await _respond(send, 200, {"predictions": []})
+
+        try:
+            predictions = await self.batcher.submit(records)
+        except InvalidRequest as e:
+            problems = e.args[0]
+            if path == "/predict":
+                return await _respond(send, 422, {"error": "invalid applicant fields", **problems[0]})
+            return await _respond(send, 422, {"error": "invalid applicant fields",
+                                              "applicants": {str(i): fields for i, fields in problems.items()}})
+        except Exception as e:
+            return await _respond(send, 500, {"error": f"prediction failed: {e}"})
+
+        self.stats.record_request((time.perf_counter() - start) * 1000.0, len(records))
+        body = predictions[0] if path == "/predict" else {"predictions": predictions}
+        await _respond(send, 200, body)
+
+
+async def _read_body(receive):
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            return body
+
+
+async def _respond(send, status: int, payload):
+    body = json.dumps(payload).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _respond_text(send, status: int, text: str):
+    # Prometheus exposition format
+    body = text.encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"text/plain; version=0.0.4"),
+                    (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+app = PredictionService()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless EMI prediction service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-batch-size", type=int, default=MAX_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    args = parser.parse_args()
+
+    import uvicorn
+    service = PredictionService(args.max_batch_size, args.max_wait_ms)
+    uvicorn.run(service, host=args.host, port=args.port, lifespan="on", access_log=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import argparse
+import ast
+import glob
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+# Cold-start report for the Streamlit scripts. For home.py and every page, the script's
+# module-level imports are run in a fresh interpreter under `python -X importtime`, and the
+# time is broken down by package (self time summed over every submodule it pulls in, so mlflow
+# shows up even when only model_registry is imported) and by the script's own imports.
+# Interpreter start-up imports (site, encodings, ...) are excluded.
+#
+#   python startup_report.py                        # all scripts, best of 3 runs each
+#   python startup_report.py pages/eda.py --top 5
+#   python startup_report.py --json .cache/startup.json
+
+SCRIPTS = ["home.py", *sorted(glob.glob(os.path.join("pages", "*.py")))]
+DEFAULT_REPEATS = 3
+DEFAULT_TOP = 8
+
+# Packages a page should only pay for when it uses them
+HEAVY_PACKAGES = ["mlflow", "sklearn", "xgboost", "seaborn", "matplotlib", "scipy", "joblib", "yaml"]
+
+
+def script_imports(path: str):
+    # The import statements at module level (the ones run before anything is drawn)
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def _importtime(code: str):
+    # [(module, self_us, cumulative_us, depth)] in import order, and the process wall time
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True,
+                            text=True, env={**os.environ, "EMI_WARMUP": "0"})
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise ValueError(f"importing failed:\n{result.stderr.strip().splitlines()[-1]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        module = name.strip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((module, int(self_us), int(cumulative_us), depth))
+    return rows, wall
+
+
+def measure(path: str, repeats: int = DEFAULT_REPEATS):
+    imports = script_imports(path)
+    baseline = {module for module, *_ in _importtime("pass")[0]}
+
+    best = None
+    for _ in range(repeats):
+        rows, wall = _importtime("\n".join(imports))
+        rows = [row for row in rows if row[0] not in baseline]
+        total = sum(cumulative for _, _, cumulative, depth in rows if depth == 0)
+        if best is None or total < best["total_us"]:
+            best = {"rows": rows, "total_us": total, "wall": wall}
+
+    packages = defaultdict(int)
+    for module, self_us, _, _ in best["rows"]:
+        packages[module.split(".")[0]] += self_us
+    return {
+        "script": path,
+        "imports": imports,
+        "import_ms": best["total_us"] / 1000,
+        "process_ms": best["wall"] * 1000,
+        "modules": len(best["rows"]),
+        "packages_ms": {name: us / 1000 for name, us in sorted(packages.items(), key=lambda kv: -kv[1])},
+        "direct_ms": {module: cumulative / 1000 for module, _, cumulative, depth in best["rows"] if depth == 0},
+        "heavy": [name for name in HEAVY_PACKAGES if name in packages],
+    }
+
+
+def print_report(report: dict, top: int):
+    print(f"{report['script']}: {report['import_ms']:,.0f} ms in imports "
+          f"({report['modules']} modules; process {report['process_ms']:,.0f} ms)")
+    print(f"  heavy packages: {', '.join(report['heavy']) or 'none'}")
+    print("  by package (self time):")
+    for name, ms in list(report["packages_ms"].items())[:top]:
+        print(f"    {name:28s} {ms:9,.1f} ms")
+    print("  by import (cumulative):")
+    for module, ms in sorted(report["direct_ms"].items(), key=lambda kv: -kv[1])[:top]:
+        print(f"    {module:28s} {ms:9,.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time breakdown of home.py and the page scripts")
+    parser.add_argument("scripts", nargs="*", default=SCRIPTS)
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS, help="runs per script; the fastest is reported")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP)
+    parser.add_argument("--json", metavar="PATH", help="also write the reports as JSON")
+    args = parser.parse_args()
+
+    reports = []
+    for path in args.scripts:
+        report = measure(path, args.repeats)
+        print_report(report, args.top)
+        reports.append(report)
+
+    if args.json:
+        os.makedirs(os.path.dirname(args.json) or ".", exist_ok=True)
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=2)
+        print(f"Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
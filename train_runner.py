@@ -0,0 +1,375 @@
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from features import CAT_COLS, NUMERIC_COLS, engineer_features, validate
+
+# Command-line version of the training cells in main.ipynb.
+# The encoded + scaled matrix (and the balanced sets) is built once, written as .npy
+# files and memory-mapped by every job; jobs run in a spawn-based process pool
+# with a per-job thread limit and log to a local file-based MLflow store. Jobs
+# whose data and settings have not changed since their last run are skipped.
+# The balanced training sets come from rebalance.py unless --rebalancer smote is given.
+
+DATA_PATH = "emi_prediction_dataset_enhanced.csv"
+CACHE_DIR = os.path.join(".cache", "train_runner")
+MANIFEST_PATH = os.path.join(CACHE_DIR, "manifest.json")
+TRACKING_URI = "file:" + os.path.abspath("mlruns")
+
+CLASSIFICATION_EXPERIMENT = "emi_classification_experiment"
+REGRESSION_EXPERIMENT = "emi_regression_experiment"
+
+# Bump when prepare() changes so cached matrices are rebuilt
+PREPARE_VERSION = 3
+
+# Columns scaled with input_scaler.pkl (NUMERIC_COLS in features.py)
+INPUT_NUMERIC_COLS = NUMERIC_COLS
+
+# name -> settings; "train_set" picks the rows the model is fitted on
+JOBS = {
+    "RandomForest_Classifier": {
+        "task": "classification", "model_type": "RandomForest", "train_set": "smote_sample",
+        "params": {"n_estimators": 50, "random_state": 42},
+    },
+    "XGBoost_Classifier": {
+        "task": "classification", "model_type": "XGBoost", "train_set": "smote",
+        "params": {"random_state": 42, "eval_metric": "mlogloss"},
+    },
+    "GradientBoosting_Classifier": {
+        "task": "classification", "model_type": "GradientBoosting", "train_set": "smote_sample",
+        "params": {"n_estimators": 30, "max_depth": 3, "subsample": 0.8, "random_state": 42},
+    },
+    "RandomForest_Regressor": {
+        "task": "regression", "model_type": "RandomForest", "train_set": "reg_sample",
+        "params": {"n_estimators": 50, "max_depth": 10, "random_state": 42},
+    },
+    "XGBoost_Regressor": {
+        "task": "regression", "model_type": "XGBoost", "train_set": "reg",
+        "params": {"random_state": 42},
+    },
+    "GradientBoosting_Regressor": {
+        "task": "regression", "model_type": "GradientBoosting", "train_set": "reg_sample",
+        "params": {"random_state": 42},
+    },
+}
+
+SMOTE_SAMPLE_SIZE = 100_000
+REG_SAMPLE_SIZE = 50_000
+
+
+# ------------------------
+# Shared preprocessing (built once, memory-mapped by the jobs)
+# ------------------------
+def file_fingerprint(path: str, rebalancer: str):
+    stat = os.stat(path)
+    key = f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}:{rebalancer}:{PREPARE_VERSION}"
+    return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+
+def save_array(data_dir: str, name: str, array):
+    # Written under a temporary name and renamed, so a reader (or a concurrent writer of the
+    # same array) never sees a partial file
+    path = os.path.join(data_dir, f"{name}.npy")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, np.ascontiguousarray(array))
+    os.replace(tmp_path, path)
+
+
+def encode(data_path: str = DATA_PATH):
+    from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+    df = engineer_features(pd.read_csv(data_path))
+    df_encoded = pd.get_dummies(df, columns=CAT_COLS, drop_first=True)
+
+    scaler = StandardScaler()
+    df_encoded[INPUT_NUMERIC_COLS] = scaler.fit_transform(df_encoded[INPUT_NUMERIC_COLS])
+
+    X = df_encoded.drop(["emi_eligibility", "max_monthly_emi"], axis=1)
+    features = validate(X.columns.tolist(), scaler)
+    X = X.to_numpy(dtype=np.float64)
+
+    label_encoder = LabelEncoder()
+    y_class = label_encoder.fit_transform(df_encoded["emi_eligibility"])
+    y_reg = df_encoded["max_monthly_emi"].to_numpy(dtype=np.float64)
+    return X, y_class, y_reg, features, scaler, label_encoder
+
+
+def split(X, y_class):
+    # Same splits as the notebook
+    from sklearn.model_selection import train_test_split
+
+    rows = np.arange(len(X))
+    train_c, test_c = train_test_split(rows, stratify=y_class, test_size=0.2, random_state=42)
+    train_r, test_r = train_test_split(rows, test_size=0.2, random_state=42)
+    return train_c, test_c, train_r, test_r
+
+
+def balance(X_train, y_train, rebalancer: str = "partitioned"):
+    # Returns the fully balanced set (XGBoost) and the 100k balanced sample (RandomForest/GradientBoosting)
+    if rebalancer == "smote":
+        from imblearn.over_sampling import SMOTE
+
+        X_smote, y_smote = SMOTE(random_state=42).fit_resample(X_train, y_train)
+        sample = pd.Series(np.arange(len(X_smote))).sample(
+            min(SMOTE_SAMPLE_SIZE, len(X_smote)), random_state=42).to_numpy()
+        return X_smote, y_smote, X_smote[sample], y_smote[sample]
+
+    from rebalance import rebalance
+
+    X_smote, y_smote = rebalance(X_train, y_train)
+    n_samples = min(SMOTE_SAMPLE_SIZE, len(X_smote))
+    X_sample, y_sample = rebalance(X_train, y_train, n_samples=n_samples)
+    return X_smote, y_smote, X_sample, y_sample
+
+
+def prepare(data_path: str = DATA_PATH, cache_dir: str = CACHE_DIR, rebalancer: str = "partitioned"):
+    import joblib
+
+    fingerprint = file_fingerprint(data_path, rebalancer)
+    data_dir = os.path.join(cache_dir, fingerprint)
+    if os.path.exists(os.path.join(data_dir, "features.json")):
+        return data_dir, fingerprint
+
+    tmp_dir = data_dir + ".tmp"
+    os.makedirs(tmp_dir, exist_ok=True)
+
+    X, y_class, y_reg, features, scaler, label_encoder = encode(data_path)
+    train_c, test_c, train_r, test_r = split(X, y_class)
+
+    X_smote, y_smote, X_smote_sample, y_smote_sample = balance(X[train_c], y_class[train_c], rebalancer)
+    reg_sample = train_r[np.random.default_rng(42).choice(
+        len(train_r), size=min(REG_SAMPLE_SIZE, len(train_r)), replace=False)]
+
+    for name, array in [
+        ("X", X), ("y_class", y_class), ("y_reg", y_reg),
+        ("train_c", train_c), ("test_c", test_c), ("train_r", train_r), ("test_r", test_r),
+        ("X_smote", X_smote), ("y_smote", y_smote),
+        ("X_smote_sample", X_smote_sample), ("y_smote_sample", y_smote_sample),
+        ("reg_sample", reg_sample),
+    ]:
+        save_array(tmp_dir, name, array)
+
+    joblib.dump(scaler, os.path.join(tmp_dir, "input_scaler.pkl"))
+    joblib.dump(label_encoder, os.path.join(tmp_dir, "label_encoder.pkl"))
+    with open(os.path.join(tmp_dir, "features.json"), "w") as f:
+        json.dump(features, f)
+
+    os.replace(tmp_dir, data_dir)
+    return data_dir, fingerprint
+
+
+def load_arrays(data_dir: str):
+    arrays = {}
+    for fname in os.listdir(data_dir):
+        if fname.endswith(".npy"):
+            arrays[fname[:-4]] = np.load(os.path.join(data_dir, fname), mmap_mode="r")
+    return arrays
+
+
+def training_rows(arrays: dict, train_set: str):
+    if train_set == "smote":
+        return arrays["X_smote"], arrays["y_smote"]
+    if train_set == "smote_sample":
+        return arrays["X_smote_sample"], arrays["y_smote_sample"]
+    if train_set == "reg":
+        rows = arrays["train_r"]
+    elif train_set == "reg_sample":
+        rows = arrays["reg_sample"]
+    else:
+        raise ValueError(f"Unknown train_set: {train_set}")
+    return arrays["X"][rows], arrays["y_reg"][rows]
+
+
+# ------------------------
+# Jobs
+# ------------------------
+def build_model(job: dict, threads: int):
+    params = dict(job["params"])
+    key = (job["task"], job["model_type"])
+
+    if key == ("classification", "RandomForest"):
+        from sklearn.ensemble import RandomForestClassifier
+        return RandomForestClassifier(n_jobs=threads, **params)
+    if key == ("classification", "XGBoost"):
+        from xgboost import XGBClassifier
+        return XGBClassifier(n_jobs=threads, **params)
+    if key == ("classification", "GradientBoosting"):
+        from sklearn.ensemble import GradientBoostingClassifier
+        return GradientBoostingClassifier(**params)
+    if key == ("regression", "RandomForest"):
+        from sklearn.ensemble import RandomForestRegressor
+        return RandomForestRegressor(n_jobs=threads, **params)
+    if key == ("regression", "XGBoost"):
+        from xgboost import XGBRegressor
+        return XGBRegressor(n_jobs=threads, **params)
+    if key == ("regression", "GradientBoosting"):
+        from sklearn.ensemble import GradientBoostingRegressor
+        return GradientBoostingRegressor(**params)
+    raise ValueError(f"Unknown job: {key}")
+
+
+def evaluate(job: dict, model, arrays: dict):
+    from sklearn import metrics as m
+
+    if job["task"] == "classification":
+        X_test, y_test = arrays["X"][arrays["test_c"]], arrays["y_class"][arrays["test_c"]]
+        y_pred = model.predict(X_test)
+        y_pred_proba = model.predict_proba(X_test)
+        return {
+            "accuracy": m.accuracy_score(y_test, y_pred),
+            "precision": m.precision_score(y_test, y_pred, average="macro"),
+            "recall": m.recall_score(y_test, y_pred, average="macro"),
+            "f1_score": m.f1_score(y_test, y_pred, average="macro"),
+            "roc_auc": m.roc_auc_score(y_test, y_pred_proba, multi_class="ovr", average="macro"),
+        }
+
+    X_test, y_test = arrays["X"][arrays["test_r"]], arrays["y_reg"][arrays["test_r"]]
+    y_pred = model.predict(X_test)
+    mse = m.mean_squared_error(y_test, y_pred)
+    return {
+        "mse": mse,
+        "rmse": np.sqrt(mse),
+        "mae": m.mean_absolute_error(y_test, y_pred),
+        "r2": m.r2_score(y_test, y_pred),
+        "mape": np.mean(np.abs((y_test - y_pred) / y_test)) * 100,
+    }
+
+
+def _limit_threads(threads: int):
+    # Runs in each spawned worker after it has imported this module, so numpy's BLAS is already
+    # loaded and has sized its pool: resize the loaded pools with threadpoolctl. The env vars
+    # only reach libraries loaded later (xgboost's and sklearn's OpenMP, in run_job).
+    from threadpoolctl import threadpool_limits
+
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "NUMEXPR_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    threadpool_limits(threads)
+    # MLflow 3 only writes to the file-based store (the repo's mlruns/) when allowed explicitly
+    os.environ.setdefault("MLFLOW_ALLOW_FILE_STORE", "true")
+
+
+def run_job(name: str, job: dict, data_dir: str, tracking_uri: str, threads: int):
+    import mlflow
+
+    start = time.perf_counter()
+    arrays = load_arrays(data_dir)
+    X_train, y_train = training_rows(arrays, job["train_set"])
+
+    model = build_model(job, threads)
+    model.fit(X_train, y_train)
+    metrics = evaluate(job, model, arrays)
+
+    mlflow.set_tracking_uri(tracking_uri)
+    experiment = CLASSIFICATION_EXPERIMENT if job["task"] == "classification" else REGRESSION_EXPERIMENT
+    mlflow.set_experiment(experiment)
+    with mlflow.start_run(run_name=name) as run:
+        mlflow.set_tag("task", job["task"])
+        mlflow.set_tag("model_type", job["model_type"])
+        mlflow.set_tag("train_set", job["train_set"])
+        mlflow.log_params(job["params"])
+        mlflow.log_metrics({key: float(value) for key, value in metrics.items()})
+        if job["model_type"] == "XGBoost":
+            import mlflow.xgboost
+            mlflow.xgboost.log_model(model, name=name)
+        else:
+            import mlflow.sklearn
+            # model.pkl, like the sklearn models already in mlartifacts/
+            mlflow.sklearn.log_model(model, name=name, serialization_format="cloudpickle")
+        run_id = run.info.run_id
+
+    return {"run_id": run_id, "metrics": metrics, "seconds": time.perf_counter() - start}
+
+
+# ------------------------
+# Driver
+# ------------------------
+def job_key(name: str, job: dict, fingerprint: str):
+    return hashlib.sha1(json.dumps([name, job, fingerprint], sort_keys=True).encode()).hexdigest()
+
+
+def load_manifest():
+    if os.path.exists(MANIFEST_PATH):
+        with open(MANIFEST_PATH) as f:
+            return json.load(f)
+    return {}
+
+
+def save_manifest(manifest: dict):
+    os.makedirs(os.path.dirname(MANIFEST_PATH), exist_ok=True)
+    with open(MANIFEST_PATH + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(MANIFEST_PATH + ".tmp", MANIFEST_PATH)
+
+
+def run(job_names=None, data_path: str = DATA_PATH, workers: int = None, threads_per_job: int = None,
+        tracking_uri: str = TRACKING_URI, force: bool = False, rebalancer: str = "partitioned"):
+    job_names = job_names or list(JOBS)
+    workers = workers or min(len(job_names), os.cpu_count())
+    threads_per_job = threads_per_job or max(os.cpu_count() // workers, 1)
+
+    start = time.perf_counter()
+    data_dir, fingerprint = prepare(data_path, rebalancer=rebalancer)
+    print(f"Prepared data in {time.perf_counter() - start:.1f}s -> {data_dir}")
+
+    manifest = load_manifest()
+    todo = []
+    for name in job_names:
+        key = job_key(name, JOBS[name], fingerprint)
+        if not force and manifest.get(name, {}).get("key") == key:
+            print(f"{name}: unchanged, skipping (run {manifest[name]['run_id']})")
+        else:
+            todo.append((name, key))
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_limit_threads, initargs=(threads_per_job,)) as executor:
+        futures = {
+            executor.submit(run_job, name, JOBS[name], data_dir, tracking_uri, threads_per_job): (name, key)
+            for name, key in todo
+        }
+        for future in as_completed(futures):
+            name, key = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"{name}: failed: {e}")
+                continue
+            manifest[name] = {"key": key, "run_id": result["run_id"], "metrics": result["metrics"]}
+            save_manifest(manifest)
+            summary = ", ".join(f"{k}={v:.4f}" for k, v in result["metrics"].items())
+            print(f"{name}: {result['seconds']:.1f}s, run {result['run_id']} | {summary}")
+
+    print(f"Total {time.perf_counter() - start:.1f}s")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the EMI candidate models in parallel")
+    parser.add_argument("jobs", nargs="*", help=f"jobs to run (default: all of {', '.join(JOBS)})")
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--threads-per-job", type=int, default=None)
+    parser.add_argument("--tracking-uri", default=TRACKING_URI)
+    parser.add_argument("--force", action="store_true", help="rerun jobs even if their inputs are unchanged")
+    parser.add_argument("--rebalancer", choices=["partitioned", "smote"], default="partitioned",
+                        help="partitioned: rebalance.py (default); smote: imblearn SMOTE as in the notebook")
+    args = parser.parse_args()
+
+    unknown = set(args.jobs) - set(JOBS)
+    if unknown:
+        parser.error(f"unknown job(s): {', '.join(sorted(unknown))}")
+
+    run(args.jobs, args.data, args.workers, args.threads_per_job, args.tracking_uri, args.force,
+        args.rebalancer)
+
+
+if __name__ == "__main__":
+    main()
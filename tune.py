@@ -0,0 +1,346 @@
+import argparse
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+import train_runner
+from train_runner import CLASSIFICATION_EXPERIMENT, DATA_PATH, REGRESSION_EXPERIMENT, TRACKING_URI
+
+# Budgeted hyperparameter search for the two production XGBoost models, by successive
+# halving: each bracket samples configurations, trains them on a small row subsample, keeps
+# the best 1/eta and retrains those on eta times more rows, until the survivors train on the
+# whole training set. Brackets repeat with fresh configurations until the time budget is
+# spent. Every trial stops boosting once its validation metric stops improving (XGBoost's
+# early stopping on an eval set) or the budget runs out, and trials of a rung run in parallel
+# in the same spawn-based pool train_runner uses. Data comes from train_runner.prepare(), so
+# the matrices are shared (memory-mapped) with the regular training jobs.
+#
+# Trials are logged to the local mlruns store as child runs of one run per search, in separate
+# *_tuning experiments so they do not crowd the candidates on the Model Training page. Trials on
+# the full training set are also scored on the test split and keep their model, so the best
+# of them is directly comparable with (and replaceable for) the train_runner job.
+
+TASKS = {
+    "classification": {"train_set": "smote", "eval_metric": "mlogloss",
+                       "experiment": f"{CLASSIFICATION_EXPERIMENT}_tuning", "job": "XGBoost_Classifier"},
+    "regression": {"train_set": "reg", "eval_metric": "rmse",
+                   "experiment": f"{REGRESSION_EXPERIMENT}_tuning", "job": "XGBoost_Regressor"},
+}
+
+# name -> (low, high, scale); "log" samples uniformly in log space, "int" draws integers
+SEARCH_SPACE = {
+    "learning_rate": (0.01, 0.3, "log"),
+    "max_depth": (3, 10, "int"),
+    "min_child_weight": (1.0, 20.0, "log"),
+    "subsample": (0.5, 1.0, "linear"),
+    "colsample_bytree": (0.4, 1.0, "linear"),
+    "reg_lambda": (1e-3, 10.0, "log"),
+    "gamma": (0.0, 2.0, "linear"),
+}
+
+BUDGET_SECONDS = 1800
+CONFIGS_PER_BRACKET = 27
+ETA = 3
+MIN_ROWS = 20_000
+VALIDATION_ROWS = 50_000
+MAX_ROUNDS = 2000
+EARLY_STOPPING_ROUNDS = 50
+
+
+# ------------------------
+# Configurations
+# ------------------------
+def sample_config(rng):
+    config = {}
+    for name, (low, high, scale) in SEARCH_SPACE.items():
+        if scale == "int":
+            config[name] = int(rng.integers(low, high + 1))
+        elif scale == "log":
+            config[name] = float(math.exp(rng.uniform(math.log(low), math.log(high))))
+        else:
+            config[name] = float(rng.uniform(low, high))
+    return config
+
+
+def rung_rows(pool_rows: int, min_rows: int, eta: int):
+    # Row counts per rung: min_rows, min_rows * eta, ... and the whole pool last
+    rows = []
+    size = min(min_rows, pool_rows)
+    while size < pool_rows:
+        rows.append(size)
+        size *= eta
+    rows.append(pool_rows)
+    return rows
+
+
+# ------------------------
+# Validation split
+# ------------------------
+def _holdout_prefix(validation_rows: int, seed: int):
+    return f"tune_c{validation_rows}_s{seed}_"
+
+
+def classification_holdout(data_dir: str, validation_rows: int, seed: int):
+    # The classifier trains on the rebalanced set, whose synthetic rows are interpolated from
+    # the real ones, so its validation rows cannot come from X_smote. They are drawn from the
+    # original training rows (train_c), and the trial pool is rebalanced from the remaining
+    # ones only. Run once in the driver; stored next to the prepared arrays for the workers.
+    prefix = _holdout_prefix(validation_rows, seed)
+    if os.path.exists(os.path.join(data_dir, f"{prefix}validation.npy")):
+        return prefix
+    from rebalance import rebalance
+
+    arrays = train_runner.load_arrays(data_dir)
+    train_c = np.asarray(arrays["train_c"])
+    if validation_rows >= len(train_c):
+        raise ValueError(f"validation_rows={validation_rows} leaves no training rows")
+    shuffled = train_c[np.random.default_rng(seed).permutation(len(train_c))]
+    rest = np.sort(shuffled[validation_rows:])
+    X_pool, y_pool = rebalance(arrays["X"][rest], arrays["y_class"][rest])
+    train_runner.save_array(data_dir, f"{prefix}X", X_pool)
+    train_runner.save_array(data_dir, f"{prefix}y", y_pool)
+    # Written last: its presence marks a complete split
+    train_runner.save_array(data_dir, f"{prefix}validation", np.sort(shuffled[:validation_rows]))
+    return prefix
+
+
+# ------------------------
+# Trials (run in the pool workers)
+# ------------------------
+_splits = {}
+
+
+def _split(data_dir: str, task: str, validation_rows: int, seed: int):
+    # (arrays, X, y, training rows in subsample order, X_val, y_val); nested subsamples are
+    # prefixes of one seeded permutation, so a larger rung contains every smaller one
+    key = (data_dir, task, validation_rows, seed)
+    if key not in _splits:
+        arrays = train_runner.load_arrays(data_dir)
+        rng = np.random.default_rng(seed)
+        if task == "classification":
+            prefix = _holdout_prefix(validation_rows, seed)
+            X, y = arrays[f"{prefix}X"], arrays[f"{prefix}y"]
+            validation = arrays[f"{prefix}validation"]
+            X_val, y_val = arrays["X"][validation], arrays["y_class"][validation]
+            order = rng.permutation(len(X))
+        else:
+            X, y = arrays["X"], arrays["y_reg"]
+            pool = np.asarray(arrays["train_r"])
+            pool = pool[rng.permutation(len(pool))]
+            validation = np.sort(pool[:validation_rows])
+            X_val, y_val = X[validation], y[validation]
+            order = pool[validation_rows:]
+        _splits.clear()
+        _splits[key] = (arrays, X, y, order, X_val, y_val)
+    return _splits[key]
+
+
+def _deadline_callback(deadline: float):
+    from xgboost.callback import TrainingCallback
+
+    class Deadline(TrainingCallback):
+        # Ends boosting when the search budget runs out; the rounds so far still count
+        def after_iteration(self, model, epoch, evals_log):
+            return time.time() >= deadline
+
+    return Deadline()
+
+
+def run_trial(trial: dict, settings: dict, data_dir: str, tracking_uri: str, parent_run_id: str,
+              threads: int, deadline: float):
+    import mlflow
+    from xgboost import XGBClassifier, XGBRegressor
+
+    if time.time() >= deadline:
+        return None   # queued behind the budget
+    start = time.perf_counter()
+    task = settings["task"]
+    arrays, X, y, order, X_val, y_val = _split(data_dir, task, settings["validation_rows"], settings["seed"])
+    rows = np.sort(order[:trial["rows"]])
+
+    model_class = XGBClassifier if task == "classification" else XGBRegressor
+    model = model_class(
+        n_estimators=settings["max_rounds"], early_stopping_rounds=settings["early_stopping_rounds"],
+        eval_metric=TASKS[task]["eval_metric"], random_state=42, n_jobs=threads,
+        callbacks=[_deadline_callback(deadline)], **trial["config"],
+    )
+    model.fit(X[rows], y[rows], eval_set=[(X_val, y_val)], verbose=False)
+
+    # From the history rather than best_score: the deadline can end boosting before
+    # early stopping has recorded anything
+    history = model.evals_result()["validation_0"][TASKS[task]["eval_metric"]]
+    result = {
+        **trial,
+        "score": float(np.min(history)),
+        "best_iteration": int(np.argmin(history)),
+        "rounds": len(history),
+        "truncated": time.time() >= deadline,
+        "seconds": time.perf_counter() - start,
+        "metrics": {},
+    }
+    final = trial["rows"] == len(order)
+    if final:
+        # Test-split metrics, as train_runner reports them (best iteration only)
+        job = {"task": task}
+        result["metrics"] = {k: float(v) for k, v in train_runner.evaluate(job, model, arrays).items()}
+
+    mlflow.set_tracking_uri(tracking_uri)
+    mlflow.set_experiment(TASKS[task]["experiment"])
+    run_name = f"{TASKS[task]['job']}_trial_{trial['bracket']}.{trial['config_id']}_rung{trial['rung']}"
+    with mlflow.start_run(run_name=run_name, tags={"mlflow.parentRunId": parent_run_id}) as run:
+        mlflow.set_tags({"task": task, "model_type": "XGBoost", "train_set": TASKS[task]["train_set"],
+                         "tuning.bracket": trial["bracket"], "tuning.rung": trial["rung"],
+                         "tuning.truncated": result["truncated"]})
+        mlflow.log_params({**trial["config"], "rows": trial["rows"], "random_state": 42})
+        mlflow.log_metrics({f"val_{TASKS[task]['eval_metric']}": result["score"],
+                            "best_iteration": result["best_iteration"], "seconds": result["seconds"],
+                            **result["metrics"]})
+        if final:
+            import mlflow.xgboost
+            mlflow.xgboost.log_model(model, name=TASKS[task]["job"])
+        result["run_id"] = run.info.run_id
+    return result
+
+
+# ------------------------
+# Driver
+# ------------------------
+def search(task: str, data_dir: str, budget: float = BUDGET_SECONDS, configs: int = CONFIGS_PER_BRACKET,
+           eta: int = ETA, min_rows: int = MIN_ROWS, validation_rows: int = VALIDATION_ROWS,
+           max_rounds: int = MAX_ROUNDS, early_stopping_rounds: int = EARLY_STOPPING_ROUNDS,
+           workers: int = None, threads_per_trial: int = None, tracking_uri: str = TRACKING_URI,
+           seed: int = 0):
+    import mlflow
+
+    workers = workers or os.cpu_count() or 1
+    threads_per_trial = threads_per_trial or max((os.cpu_count() or 1) // workers, 1)
+    deadline = time.time() + budget
+    rng = np.random.default_rng(seed)
+    settings = {"task": task, "validation_rows": validation_rows, "seed": seed,
+                "max_rounds": max_rounds, "early_stopping_rounds": early_stopping_rounds}
+
+    # Pool size without materializing anything in the driver
+    if task == "classification":
+        prefix = classification_holdout(data_dir, validation_rows, seed)
+        pool_rows = len(train_runner.load_arrays(data_dir)[f"{prefix}y"])
+    else:
+        pool_rows = len(train_runner.load_arrays(data_dir)["train_r"]) - validation_rows
+    if pool_rows <= 0:
+        raise ValueError(f"validation_rows={validation_rows} leaves no training rows")
+    rungs = rung_rows(pool_rows, min_rows, eta)
+
+    os.environ.setdefault("MLFLOW_ALLOW_FILE_STORE", "true")
+    mlflow.set_tracking_uri(tracking_uri)
+    mlflow.set_experiment(TASKS[task]["experiment"])
+    parent = mlflow.start_run(run_name=f"{TASKS[task]['job']}_tuning")
+    mlflow.set_tags({"task": task, "model_type": "XGBoost", "tuning": "successive_halving"})
+    mlflow.log_params({"budget_seconds": budget, "configs_per_bracket": configs, "eta": eta,
+                       "min_rows": min_rows, "validation_rows": validation_rows, "max_rounds": max_rounds,
+                       "early_stopping_rounds": early_stopping_rounds, "seed": seed})
+
+    results, finalists = [], []
+    cpu_seconds = 0.0
+    context = multiprocessing.get_context("spawn")
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=train_runner._limit_threads,
+                                 initargs=(threads_per_trial,)) as executor:
+            bracket = 0
+            while time.time() < deadline:
+                # The first bracket also tries the current defaults, so tuning never loses to them
+                candidates = [{} if bracket == 0 and i == 0 else sample_config(rng) for i in range(configs)]
+                survivors = list(enumerate(candidates))
+                for rung, rows in enumerate(rungs):
+                    if time.time() >= deadline or not survivors:
+                        break
+                    trials = [{"bracket": bracket, "config_id": config_id, "rung": rung, "rows": rows,
+                               "config": config} for config_id, config in survivors]
+                    futures = [executor.submit(run_trial, trial, settings, data_dir, tracking_uri,
+                                               parent.info.run_id, threads_per_trial, deadline)
+                               for trial in trials]
+                    scored = []
+                    for future in as_completed(futures):
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            print(f"trial failed: {e}")
+                            continue
+                        if result is None:
+                            continue
+                        cpu_seconds += result["seconds"] * threads_per_trial
+                        results.append(result)
+                        scored.append(result)
+                        print(f"bracket {bracket} rung {rung} ({rows:,} rows) config {result['config_id']}: "
+                              f"{TASKS[task]['eval_metric']}={result['score']:.5f} after "
+                              f"{result['rounds']} rounds, {result['seconds']:.1f}s"
+                              f"{' (budget)' if result['truncated'] else ''}")
+
+                    # Lower is better for both mlogloss and rmse
+                    scored.sort(key=lambda r: r["score"])
+                    if rows == pool_rows:
+                        finalists.extend(scored)
+                        break
+                    keep = max(1, len(scored) // eta)
+                    survivors = [(r["config_id"], r["config"]) for r in scored[:keep]]
+                bracket += 1
+
+        best = min(finalists, key=lambda r: r["score"]) if finalists else None
+        mlflow.log_metrics({"trials": len(results), "brackets": bracket, "cpu_seconds": cpu_seconds})
+        if best is not None:
+            mlflow.set_tag("tuning.best_run_id", best["run_id"])
+            mlflow.log_params({f"best_{k}": v for k, v in best["config"].items()})
+            mlflow.log_metrics({f"best_{k}": v for k, v in best["metrics"].items()})
+    finally:
+        mlflow.end_run()
+
+    return {"best": best, "trials": results, "cpu_seconds": cpu_seconds, "run_id": parent.info.run_id}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Budgeted successive-halving search for the XGBoost models")
+    parser.add_argument("tasks", nargs="*", help=f"tasks to tune (default: {', '.join(TASKS)})")
+    parser.add_argument("--budget", type=float, default=BUDGET_SECONDS, help="seconds per task")
+    parser.add_argument("--configs", type=int, default=CONFIGS_PER_BRACKET, help="configurations per bracket")
+    parser.add_argument("--eta", type=int, default=ETA, help="keep 1/eta of the trials per rung, eta x the rows")
+    parser.add_argument("--min-rows", type=int, default=MIN_ROWS)
+    parser.add_argument("--validation-rows", type=int, default=VALIDATION_ROWS)
+    parser.add_argument("--max-rounds", type=int, default=MAX_ROUNDS)
+    parser.add_argument("--early-stopping-rounds", type=int, default=EARLY_STOPPING_ROUNDS)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--threads-per-trial", type=int, default=None)
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--rebalancer", choices=["partitioned", "smote"], default="partitioned")
+    parser.add_argument("--tracking-uri", default=TRACKING_URI)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    unknown = set(args.tasks) - set(TASKS)
+    if unknown:
+        parser.error(f"unknown task(s): {', '.join(sorted(unknown))}")
+
+    data_dir, _ = train_runner.prepare(args.data, rebalancer=args.rebalancer)
+    baseline = train_runner.load_manifest()
+    for task in args.tasks or list(TASKS):
+        start = time.perf_counter()
+        outcome = search(task, data_dir, args.budget, args.configs, args.eta, args.min_rows,
+                         args.validation_rows, args.max_rounds, args.early_stopping_rounds,
+                         args.workers, args.threads_per_trial, args.tracking_uri, args.seed)
+        best = outcome["best"]
+        print(f"{task}: {len(outcome['trials'])} trials in {time.perf_counter() - start:.0f}s "
+              f"({outcome['cpu_seconds'] / 3600:.2f} CPU-hours), search run {outcome['run_id']}")
+        if best is None:
+            print("  no configuration reached the full training set within the budget")
+            continue
+        print(f"  best: run {best['run_id']}, {best['config'] or 'defaults'}, "
+              f"{best['best_iteration'] + 1} rounds")
+        default = baseline.get(TASKS[task]["job"], {}).get("metrics", {})
+        for name, value in best["metrics"].items():
+            reference = f" (train_runner {default[name]:.4f})" if name in default else ""
+            print(f"    {name:10s} {value:.4f}{reference}")
+
+
+if __name__ == "__main__":
+    main()
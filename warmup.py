@@ -0,0 +1,114 @@
+import importlib
+import os
+import threading
+import time
+
+from instrumentation import stage
+
+# Background warm-up for the Streamlit app. The first script run (home.py or any page) calls
+# start(), which loads in a daemon thread what the pages would otherwise load on first visit:
+# the models and explain boosters, the plotting libraries, the memory-mapped datasets, the EDA
+# aggregates and the mlruns index. Every step goes through the same caches the pages use, so a
+# page visited after its step finished finds everything loaded (one visited earlier waits on the
+# model / aggregate cache locks rather than loading twice). Failures are recorded, not raised.
+#
+#   EMI_WARMUP=0        disable (e.g. for one-off scripts that import the page modules)
+
+ENABLED = os.environ.get("EMI_WARMUP", "1").lower() not in ("0", "false", "no")
+
+PLOT_MODULES = ["matplotlib.pyplot", "seaborn"]
+DATASETS = ["raw", "clean", "final", "smote"]
+
+_lock = threading.Lock()
+_thread = None
+_status = {}   # step -> {"seconds": float, "error": str or None}
+
+
+# ------------------------
+# Steps (in the order they run: the prediction page's models first)
+# ------------------------
+def _artifacts():
+    import model_registry
+    model_registry.get_artifacts()
+
+
+def _boosters():
+    import explain
+    for kind in explain.BOOSTERS:
+        explain.get_booster(kind)
+
+
+def _plotting():
+    for module in PLOT_MODULES:
+        importlib.import_module(module)
+
+
+def _datasets():
+    # Maps the Arrow files (columns load lazily from the page cache); CSV-only datasets are
+    # left to the pages, where only the needed columns are read
+    import dataset_store
+    for name in DATASETS:
+        if dataset_store.is_fresh(name):
+            dataset_store.columns_of(name)
+
+
+def _eda():
+    import eda_aggregates
+    eda_aggregates.get_aggregates("final")
+
+
+def _run_index():
+    import run_index
+    run_index.refresh()
+
+
+STEPS = {
+    "artifacts": _artifacts,
+    "boosters": _boosters,
+    "plotting": _plotting,
+    "datasets": _datasets,
+    "eda": _eda,
+    "run_index": _run_index,
+}
+
+
+def _run(steps):
+    for name in steps:
+        start = time.perf_counter()
+        error = None
+        try:
+            with stage(f"warmup.{name}"):
+                STEPS[name]()
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        with _lock:
+            _status[name] = {"seconds": time.perf_counter() - start, "error": error}
+
+
+# ------------------------
+# API
+# ------------------------
+def start(steps=None):
+    # Idempotent: the first call per process starts the thread, later calls return it
+    global _thread
+    if not ENABLED:
+        return None
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_run, args=(list(steps or STEPS),),
+                                       name="emi-warmup", daemon=True)
+            _thread.start()
+        return _thread
+
+
+def wait(timeout: float = None):
+    thread = _thread
+    if thread is not None:
+        thread.join(timeout)
+    return status()
+
+
+def status():
+    with _lock:
+        running = _thread is not None and _thread.is_alive()
+        return {"running": running, "steps": {name: dict(s) for name, s in _status.items()}}
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+from features import CATEGORICAL_MAP, derive, transform_for
+
+# What-if sweeps for one applicant: every combination of requested amount, tenure and EMI
+# scenario, scored in one batch. The applicant's feature row is built once and repeated; only
+# the columns a variant changes are rewritten (requested_amount, affordability_ratio,
+# requested_tenure and the emi_scenario one-hots), each scaled once per distinct value.
+
+SAFE_LABELS = ("Eligible",)
+DEFAULT_TENURES = list(range(6, 121, 6))
+DEFAULT_AMOUNT_STEPS = 40
+
+
+def amount_range(low: float, high: float, steps: int = DEFAULT_AMOUNT_STEPS):
+    return np.unique(np.round(np.linspace(low, high, steps), -2))
+
+
+def monthly_instalment(amount, tenure, annual_rate: float = 0.0):
+    # Standard reducing-balance EMI; principal / tenure at a zero rate
+    amount, tenure = np.asarray(amount, dtype=float), np.asarray(tenure, dtype=float)
+    if annual_rate == 0:
+        return amount / tenure
+    r = annual_rate / 12
+    growth = (1 + r) ** tenure
+    return amount * r * growth / (growth - 1)
+
+
+def prepare_grid(user_input: dict, artifacts, amounts, tenures, scenarios):
+    # (grid with the varied inputs, model-ready features in trained_features order)
+    amounts = np.asarray(amounts, dtype=float)
+    tenures = np.asarray(tenures, dtype=float)
+    scenarios = list(scenarios)
+
+    grid = pd.MultiIndex.from_product(
+        [scenarios, tenures, amounts], names=["emi_scenario", "requested_tenure", "requested_amount"]
+    ).to_frame(index=False)
+    n = len(grid)
+    scenario_idx = np.repeat(np.arange(len(scenarios)), len(tenures) * len(amounts))
+    tenure_idx = np.tile(np.repeat(np.arange(len(tenures)), len(amounts)), len(scenarios))
+    amount_idx = np.tile(np.arange(len(amounts)), len(scenarios) * len(tenures))
+
+    transform = transform_for(artifacts)
+    position = transform.position
+    matrix = np.repeat(transform.matrix_one(user_input), n, axis=0)
+
+    # requested_amount and the ratio that depends on it, then the tenure
+    def with_amounts(name, default):
+        return amounts if name == "requested_amount" else user_input.get(name, default)
+
+    ratios = derive(with_amounts)["affordability_ratio"]
+    matrix[:, position["requested_amount"]] = transform.scale_column("requested_amount", amounts)[amount_idx]
+    matrix[:, position["affordability_ratio"]] = transform.scale_column("affordability_ratio", ratios)[amount_idx]
+    matrix[:, position["requested_tenure"]] = transform.scale_column("requested_tenure", tenures)[tenure_idx]
+
+    # emi_scenario one-hots (drop_first baseline is all zeros)
+    for value in CATEGORICAL_MAP["emi_scenario"]:
+        hot = np.array([scenario == value for scenario in scenarios])
+        matrix[:, position[f"emi_scenario_{value}"]] = hot[scenario_idx]
+
+    return grid, pd.DataFrame(matrix, columns=transform.trained_features, copy=False)
+
+
+def sweep(user_input: dict, artifacts, amounts, tenures, scenarios=None, annual_rate: float = 0.0):
+    # One row per (scenario, tenure, amount): predicted eligibility and max EMI, the instalment
+    # the loan would need, and whether it is safe (eligible and instalment within the max EMI)
+    scenarios = scenarios or [user_input.get("emi_scenario")]
+    grid, features = prepare_grid(user_input, artifacts, amounts, tenures, scenarios)
+
+    pred_class = artifacts.classification_model.predict(features)
+    pred_emi = np.asarray(artifacts.regression_model.predict(features), dtype=float)
+    grid["emi_eligibility"] = artifacts.label_encoder.inverse_transform(np.asarray(pred_class))
+    grid["max_monthly_emi"] = pred_emi
+    grid["instalment"] = monthly_instalment(grid["requested_amount"], grid["requested_tenure"], annual_rate)
+    grid["safe"] = grid["emi_eligibility"].isin(SAFE_LABELS) & (grid["instalment"] <= grid["max_monthly_emi"])
+    return grid
+
+
+def frontier(grid: pd.DataFrame):
+    # Per scenario and tenure: the largest amount up to which every smaller amount in the grid is
+    # safe (model outputs need not be monotonic in the amount, so the first unsafe point stops it)
+    keys = ["emi_scenario", "requested_tenure"]
+    grid = grid.sort_values([*keys, "requested_amount"])
+    prefix_safe = grid["safe"].astype(int).groupby([grid[key] for key in keys]).cummin().astype(bool)
+    return (grid["requested_amount"].where(prefix_safe)
+                .groupby([grid[key] for key in keys]).max()
+                .rename("max_safe_amount")
+                .reset_index())